@@ -1,10 +1,14 @@
 from typing import TypedDict, Annotated, Sequence, Any
+import json
 import operator
+import time
 from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, AIMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
-from langchain_google_genai import ChatGoogleGenerativeAI
 from app.config import get_settings
+from app.core.llm import classify_error, get_chat_model
+from app.core.metrics import LLM_FALLBACKS
+from app.core.model_router import ATTEMPT_TAG_PREFIX, get_model_router, validate_response
 
 settings = get_settings()
 
@@ -13,10 +17,12 @@ settings = get_settings()
 from app.agent.tools.dummy import dummy_tools # Fallback
 from app.agent.tools.gmail import GmailTool
 from app.agent.tools.calendar import CalendarTool
-from app.agent.tools.tasks import TaskTool
+from app.agent.tools.tasks import TaskTool, make_task_tools
 from app.models import User
 from app.database import AsyncSessionLocal
-from app.services.google_svc import get_google_service
+from app.services.calendar_svc import availability, calendar_reads
+from app.services.event_cache import event_cache
+from app.services.prefetch import Prefetch, last_user_text
 
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
@@ -27,7 +33,7 @@ def get_model():
     if not settings.GOOGLE_API_KEY:
         raise ValueError("GOOGLE_API_KEY is not set")
     
-    return ChatGoogleGenerativeAI(
+    return get_chat_model(
         model="gemini-pro",
         google_api_key=settings.GOOGLE_API_KEY,
         temperature=0.7
@@ -47,6 +53,16 @@ async def agent_node(state: AgentState):
     Process the user input and generate a response using the selected model.
     Includes fallback logic if the primary model fails.
     """
+    user_context = state.get("user_context", {})
+    # WebSocket chat sessions hand in the Calendar service they built at connect time
+    prefetch = Prefetch(user_context.get("email"), user_context.get("calendar_service"))
+    try:
+        return await _agent_turn(state, prefetch)
+    finally:
+        await prefetch.close()
+
+
+async def _agent_turn(state: AgentState, prefetch: Prefetch):
     # Context Extraction
     user_context = state.get("user_context", {})
     user_email = user_context.get("email")
@@ -57,20 +73,34 @@ async def agent_node(state: AgentState):
         if not user_email:
             return "Error: User email not found. Cannot access calendar."
             
-        async with AsyncSessionLocal() as db:
-            try:
-                service = await get_google_service(user_email, db, "calendar", "v3")
-                event_body = {
-                    'summary': summary,
-                    'description': description,
-                    'start': {'dateTime': start_time, 'timeZone': 'UTC'}, 
-                    'end': {'dateTime': end_time, 'timeZone': 'UTC'},
-                }
-                res = service.events().insert(calendarId='primary', body=event_body).execute()
-                link = res.get('htmlLink')
-                return f"Event created successfully! Link: {link}"
-            except Exception as e:
-                return f"Failed to create event: {str(e)}"
+        try:
+            service = await prefetch.calendar_service()
+            event_body = {
+                'summary': summary,
+                'description': description,
+                'start': {'dateTime': start_time, 'timeZone': 'UTC'}, 
+                'end': {'dateTime': end_time, 'timeZone': 'UTC'},
+            }
+            res = service.events().insert(calendarId='primary', body=event_body).execute()
+            # All of the user's calendars: selected ones are cached under their real ids, not 'primary'
+            event_cache.invalidate(user_email)
+            calendar_reads.invalidate(user_email)
+            prefetch.invalidate("calendar_events")
+            link = res.get('htmlLink')
+            return f"Event created successfully! Link: {link}"
+        except Exception as e:
+            return f"Failed to create event: {str(e)}"
+
+    async def check_availability(time_min: str, time_max: str):
+        """Returns busy and free periods across all of the user's calendars. Times must be ISO 8601 strings with timezone (e.g. 2024-01-01T09:00:00Z)."""
+        if not user_email:
+            return "Error: User email not found. Cannot access calendar."
+
+        try:
+            events = await prefetch.calendar_events(time_min, time_max)
+            return json.dumps(availability(events, time_min, time_max))
+        except Exception as e:
+            return f"Failed to check availability: {str(e)}"
 
     # Dynamic Configuration
     settings_manager = get_settings_manager()
@@ -82,69 +112,104 @@ async def agent_node(state: AgentState):
     
     # Base Instruction
     base_instruction = config.system_instruction or "You are Aura, a helpful agent."
-    time_instruction = f"\nCurrent Time: {current_time}. If asked to schedule, use `create_event` with ISO 8601 times."
-    
-    messages = [SystemMessage(content=base_instruction + time_instruction)] + state["messages"]
+    time_instruction = (
+        f"\nCurrent Time: {current_time}. If asked to schedule, use `create_event` with ISO 8601 times;"
+        " to see when the user is free, use `check_availability`."
+    )
+    if user_email:
+        time_instruction += " Manage to-dos with the task tools; batch many tasks into a single call."
     
-    # Primary Model Selection
-    primary_id = settings_manager.get_active_model_resolved_id()
+    # Excerpts recalled from the user's other threads, if any (app/services/memory.py)
+    memories = user_context.get("memories", "")
+    messages = [SystemMessage(content=base_instruction + time_instruction + memories)] + state["messages"]
     
-    # Candidate Models (Primary -> Fallback)
-    candidate_models = [primary_id]
+    # Candidate Keys (Active -> Others)
+    snapshot = settings_manager.get_snapshot()
+    candidate_keys = snapshot.key_candidates
+    if not candidate_keys:
+        return {"messages": [AIMessage(content="<System>: No API Keys configured.")]}
+
+    # Candidate Models: the cascade starts on the smallest adequate model and
+    # climbs to the active (primary) one, then the fallback below
+    primary_id = snapshot.active_model_resolved_id
+    router = get_model_router()
+    candidate_models = router.route(state["messages"], snapshot).ladder
     
     # Smart Fallback Logic
     # User requested: Base=2.5-lite, Fallback=2.5-flash.
     # If primary is 2.5-flash-lite, add 2.5-flash as fallback
-    if "lite" in primary_id and "gemini-2.5-flash" != primary_id:
+    if "lite" in primary_id and "gemini-2.5-flash" not in candidate_models:
         candidate_models.append("gemini-2.5-flash")
     elif "flash" in primary_id and "gemini-1.5-flash" != primary_id:
         # If user selected 2.5-flash, maybe add 1.5 as last resort? 
         # User explicitly said "1.5 models are out of service", so we SKIP 1.5.
         pass
 
-    # Candidate Keys (Active -> Others)
-    candidate_keys = settings_manager.get_all_api_keys()
-    if not candidate_keys:
-        return {"messages": [AIMessage(content="<System>: No API Keys configured.")]}
+    # Tools (task tools need a user to scope to)
+    tools = [create_event, check_availability]
+    if user_email:
+        tools.extend(make_task_tools(user_email, prefetch))
+    tool_map = {t.__name__: t for t in tools}
+
+    # Fetch the context the tools will likely want while the model decides
+    prefetch.start(last_user_text(state["messages"]))
 
     errors = []
+    attempt = 0
     
-    for model_name in candidate_models:
+    for rung, model_name in enumerate(candidate_models):
+        # The primary's reply is taken as is, like the last model's; rungs below it must
+        # validate. Models after the primary (the fallback) are only reached if it errors.
+        last_rung = rung == len(candidate_models) - 1 or model_name == primary_id
         for i, api_key in enumerate(candidate_keys):
+            started = time.perf_counter()
+            # Streamed chunks carry the tag, so a new attempt's output can replace a rejected one's
+            call_config = {"tags": [f"{ATTEMPT_TAG_PREFIX}{attempt}"]}
+            attempt += 1
             try:
                 # logger.info(f"Attempting: Model={model_name}, KeyIndex={i}")
-                model = ChatGoogleGenerativeAI(
+                model = get_chat_model(
                     model=model_name, 
                     google_api_key=api_key,
                     temperature=0
                 )
                 
                 # Bind Tools
-                tools = [create_event]
                 model_with_tools = model.bind_tools(tools)
                 
-                response = await model_with_tools.ainvoke(messages)
-                
+                response = await model_with_tools.ainvoke(messages, config=call_config)
+
+                # Checked before any tool runs, so escalating repeats no side effects
+                problem = None if last_rung else validate_response(response, tool_map)
+                if problem:
+                    router.record(model_name, problem, time.perf_counter() - started)
+                    errors.append(f"[{model_name}]: escalated ({problem})")
+                    break  # Another key won't make this model adequate
+
                 # Tool Execution Loop (Simple Single-Turn)
                 if response.tool_calls:
                     tool_results = []
                     for call in response.tool_calls:
-                        if call['name'] == 'create_event':
-                            logger.info(f"Executing create_event: {call['args']}")
-                            res = await create_event(**call['args'])
+                        if call['name'] in tool_map:
+                            logger.info(f"Executing {call['name']}: {call['args']}")
+                            res = await tool_map[call['name']](**call['args'])
                             tool_results.append(ToolMessage(tool_call_id=call['id'], content=str(res), name=call['name']))
                     
                     if tool_results:
                         messages.append(response)
                         messages.extend(tool_results)
-                        final_response = await model_with_tools.ainvoke(messages)
+                        final_response = await model_with_tools.ainvoke(messages, config=call_config)
+                        router.record(model_name, "ok", time.perf_counter() - started)
                         return {"messages": [response, *tool_results, final_response]}
                 
+                router.record(model_name, "ok", time.perf_counter() - started)
                 return {"messages": [response]}
                 
             except Exception as e:
                 err_str = str(e)
                 logger.error(f"Failed: Model={model_name} KeyIndex={i} Error={err_str}")
+                LLM_FALLBACKS.labels(model_name, snapshot.key_ids.get(api_key, "env"), classify_error(e)).inc()
+                router.record(model_name, "error", time.perf_counter() - started)
                 
                 if "429" in err_str:
                     # Rate Limit -> Try next key immediately
@@ -1,31 +1,45 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 import logging
 from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from googleapiclient.errors import HttpError
+from app.services.google_svc import google_client_kwargs
+from app.services.recurrence import expand_events
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CalendarTool:
     def __init__(self, creds: Credentials):
-        self.service = build('calendar', 'v3', credentials=creds)
+        self.service = build('calendar', 'v3', credentials=creds, **google_client_kwargs())
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
         retry=retry_if_exception_type(HttpError)
     )
-    def fetch_upcoming_events(self, max_results=5):
+    def fetch_upcoming_events(self, max_results=5, lookahead_days=30):
         try:
-            now = datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
-            events_result = self.service.events().list(
-                calendarId='primary', timeMin=now,
-                maxResults=max_results, singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            return events_result.get('items', [])
+            now = datetime.now(timezone.utc)
+            horizon = now + timedelta(days=lookahead_days)
+            # Series are listed once and expanded locally (in start order, so no orderBy);
+            # maxResults would cap masters rather than occurrences, so read every page
+            items = []
+            page_token = None
+            while True:
+                page = self.service.events().list(
+                    calendarId='primary',
+                    timeMin=now.isoformat().replace('+00:00', 'Z'),
+                    timeMax=horizon.isoformat().replace('+00:00', 'Z'),
+                    singleEvents=False, showDeleted=True,
+                    pageToken=page_token
+                ).execute()
+                items.extend(page.get('items', []))
+                page_token = page.get('nextPageToken')
+                if not page_token:
+                    break
+            return list(islice(expand_events(items, now, horizon), max_results))
         except Exception as e:
             logger.error(f"Error fetching events: {e}")
             raise
@@ -4,13 +4,13 @@ from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from googleapiclient.errors import HttpError
+from app.services.google_svc import google_client_kwargs
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class GmailTool:
     def __init__(self, creds: Credentials):
-        self.service = build('gmail', 'v1', credentials=creds)
+        self.service = build('gmail', 'v1', credentials=creds, **google_client_kwargs())
 
     @retry(
         stop=stop_after_attempt(3),
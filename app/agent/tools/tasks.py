@@ -1,32 +1,222 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import and_, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from app.database import AsyncSessionLocal
 from app.models import Task, User
 
+# Columns callers may set through bulk add/update
+TASK_FIELDS = {"title", "description", "status", "due_date", "duration_minutes", "priority"}
+TASK_STATUSES = ("pending", "completed")
+TaskStatus = Literal["pending", "completed"]
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """`tasks.due_date` is a naive UTC column; normalise aware inputs before they reach it."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _clean(values: Dict[str, Any]) -> Dict[str, Any]:
+    cleaned = {k: v for k, v in values.items() if k in TASK_FIELDS}
+    if cleaned.get("status") is not None and cleaned["status"] not in TASK_STATUSES:
+        raise ValueError(f"Invalid status {cleaned['status']!r}; expected one of {', '.join(TASK_STATUSES)}")
+    if "due_date" in cleaned:
+        cleaned["due_date"] = naive_utc(cleaned["due_date"])
+    return cleaned
+
+
+def encode_cursor(task: Task) -> str:
+    payload = {"d": task.due_date.isoformat() if task.due_date else None, "i": task.id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        due = datetime.fromisoformat(payload["d"]) if payload["d"] else None
+        return due, int(payload["i"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
 class TaskTool:
+    """
+    Task store scoped to one user. Every bulk method is a single statement in a
+    single transaction, so an agent can touch hundreds of tasks in one round trip.
+    """
+
     def __init__(self, db: AsyncSession, user: User):
         self.db = db
         self.user = user
 
-    async def list_tasks(self, status: str = None):
+    async def list_tasks(
+        self,
+        status: str = None,
+        due_before: Optional[datetime] = None,
+        due_after: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Task]:
+        """
+        Tasks ordered by (due_date NULLS LAST, id). `cursor` continues after the
+        row it was encoded from (keyset pagination, no OFFSET scans).
+        """
         query = select(Task).where(Task.owner_id == self.user.id)
         if status:
             query = query.where(Task.status == status)
+        if due_before:
+            query = query.where(Task.due_date < naive_utc(due_before))
+        if due_after:
+            query = query.where(Task.due_date >= naive_utc(due_after))
+
+        if cursor:
+            last_due, last_id = decode_cursor(cursor)
+            if last_due is None:
+                query = query.where(Task.due_date.is_(None), Task.id > last_id)
+            else:
+                query = query.where(or_(
+                    Task.due_date > last_due,
+                    and_(Task.due_date == last_due, Task.id > last_id),
+                    Task.due_date.is_(None)
+                ))
+
+        query = query.order_by(Task.due_date.asc().nulls_last(), Task.id.asc())
+        if limit:
+            query = query.limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def add_task(self, title: str, description: str = None):
-        new_task = Task(title=title, description=description, owner_id=self.user.id)
-        self.db.add(new_task)
+    async def add_task(self, title: str, description: str = None, due_date: Optional[datetime] = None, **fields):
+        tasks = await self.add_tasks([{"title": title, "description": description, "due_date": due_date, **fields}])
+        return tasks[0]
+
+    async def add_tasks(self, items: List[Dict[str, Any]]) -> List[Task]:
+        """Insert many tasks with one multi-row INSERT ... RETURNING."""
+        if not items:
+            return []
+        rows = [{**_clean(item), "owner_id": self.user.id} for item in items]
+        for row in rows:
+            row.setdefault("status", "pending")
+            if row.get("priority") is None:
+                row["priority"] = 0
+        result = await self.db.scalars(insert(Task).returning(Task), rows)
+        tasks = result.all()
         await self.db.commit()
-        await self.db.refresh(new_task)
-        return new_task
+        return tasks
 
     async def complete_task(self, task_id: int):
-        query = select(Task).where(Task.id == task_id, Task.owner_id == self.user.id)
-        result = await self.db.execute(query)
-        task = result.scalars().first()
-        if task:
-            task.status = "completed"
-            await self.db.commit()
-            return task
-        return None
+        completed = await self.complete_tasks([task_id])
+        if not completed:
+            return None
+        result = await self.db.execute(select(Task).where(Task.id == task_id))
+        return result.scalars().first()
+
+    async def complete_tasks(self, task_ids: List[int]) -> List[int]:
+        return await self.update_tasks(task_ids, {"status": "completed"})
+
+    async def update_tasks(self, task_ids: List[int], changes: Dict[str, Any]) -> List[int]:
+        """Apply the same changes to many tasks; returns the ids that were actually updated."""
+        changes = _clean(changes)
+        if not task_ids or not changes:
+            return []
+        result = await self.db.execute(
+            update(Task)
+            .where(Task.owner_id == self.user.id, Task.id.in_(task_ids))
+            .values(**changes)
+            .returning(Task.id)
+        )
+        updated = [row[0] for row in result.all()]
+        await self.db.commit()
+        return updated
+
+
+class NewTask(BaseModel):
+    title: str
+    description: Optional[str] = None
+    due_date: Optional[str] = None  # ISO 8601
+    duration_minutes: Optional[int] = None
+    priority: Optional[int] = None
+
+
+def make_task_tools(user_email: str, prefetch=None):
+    """
+    LLM-callable wrappers around TaskTool for `user_email`. Each call opens its
+    own session, so the functions can be bound to any model. With a Prefetch
+    (app/services/prefetch.py), the default listing can be fetched during the
+    model call and is served from it.
+    """
+    async def _with_store(fn):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User).where(User.email == user_email))
+            user = result.scalars().first()
+            if not user:
+                return "Error: User not found. Cannot access tasks."
+            try:
+                return await fn(TaskTool(db, user))
+            except Exception as e:
+                return f"Task operation failed: {str(e)}"
+
+    def _changed():
+        if prefetch is not None:
+            prefetch.invalidate("tasks")
+
+    def _parse_due(value):
+        return datetime.fromisoformat(value) if value else None
+
+    async def _list(status: str, limit: int):
+        async def run(store: TaskTool):
+            tasks = await store.list_tasks(status=status, limit=limit)
+            return json.dumps([
+                {"id": t.id, "title": t.title, "status": t.status, "due_date": t.due_date.isoformat() if t.due_date else None}
+                for t in tasks
+            ])
+        return await _with_store(run)
+
+    async def list_tasks(status: TaskStatus = "pending", limit: int = 200):
+        """Lists the user's tasks (id, title, status, due date), soonest due first. Status is 'pending' or 'completed'."""
+        if prefetch is not None and (status, limit) == ("pending", 200):
+            return await prefetch.get("tasks", lambda: _list(status, limit))
+        return await _list(status, limit)
+
+    async def add_tasks(tasks: List[NewTask]):
+        """Creates many tasks at once. Use a single call for all new tasks instead of one call per task."""
+        async def run(store: TaskTool):
+            items = []
+            for t in tasks:
+                t = t if isinstance(t, dict) else t.model_dump()
+                items.append({**t, "due_date": _parse_due(t.get("due_date"))})
+            created = await store.add_tasks(items)
+            _changed()
+            return f"Created {len(created)} tasks: {[t.id for t in created]}"
+        return await _with_store(run)
+
+    async def complete_tasks(task_ids: List[int]):
+        """Marks many tasks as completed in one call."""
+        async def run(store: TaskTool):
+            done = await store.complete_tasks(task_ids)
+            _changed()
+            return f"Completed {len(done)} tasks: {done}"
+        return await _with_store(run)
+
+    async def update_tasks(task_ids: List[int], title: str = None, status: TaskStatus = None, due_date: str = None):
+        """Applies the same change (title, status or ISO 8601 due date) to many tasks in one call."""
+        changes = {"title": title, "status": status}
+        changes = {k: v for k, v in changes.items() if v is not None}
+        if due_date:
+            changes["due_date"] = _parse_due(due_date)
+
+        async def run(store: TaskTool):
+            updated = await store.update_tasks(task_ids, changes)
+            _changed()
+            return f"Updated {len(updated)} tasks: {updated}"
+        return await _with_store(run)
+
+    if prefetch is not None:
+        prefetch.register("tasks", lambda: _list("pending", 200))
+    return [list_tasks, add_tasks, complete_tasks, update_tasks]
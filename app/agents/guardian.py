@@ -1,13 +1,16 @@
+import logging
 from langchain_core.messages import AIMessage
 from app.agents.common import AgentState
 
+logger = logging.getLogger(__name__)
+
 def guardian_node(state: AgentState):
     """
     Worker: Guardian.
     Responsibilities: Psychology, Health, & Veto.
     """
     # Placeholder Logic
-    print("--- GUARDIAN: Checking Wellbeing ---")
+    logger.debug("Checking Wellbeing")
     return {
         "messages": [AIMessage(content="[Guardian] User preference: 'No high-energy tasks after 4 PM'. The 2 PM slot is approved.")],
         "audit_log": [{"role": "Guardian", "action": "Health Check", "status": "Approved"}]
@@ -1,14 +1,98 @@
+import logging
+from datetime import datetime, timedelta, timezone
 from langchain_core.messages import AIMessage
+from sqlalchemy import select
 from app.agents.common import AgentState
+from app.agent.tools.tasks import TaskTool
+from app.core.settings_manager import get_settings_manager
+from app.database import AsyncSessionLocal
+from app.models import User
+from app.services.google_svc import get_google_service
+from app.services.calendar_svc import get_user_calendar_ids, list_merged_events, busy_intervals
+from app.services.scheduler import (
+    SchedulableTask, schedule_tasks, parse_preferences, DEFAULT_DURATION_MINUTES
+)
 
-def strategist_node(state: AgentState):
+logger = logging.getLogger(__name__)
+
+PLANNING_HORIZON_DAYS = 7
+MAX_PLANNED_TASKS = 1000
+
+def _to_schedulable(task) -> SchedulableTask:
+    due = task.due_date.replace(tzinfo=timezone.utc) if task.due_date else None
+    return SchedulableTask(
+        id=task.id,
+        title=task.title,
+        duration=timedelta(minutes=task.duration_minutes or DEFAULT_DURATION_MINUTES),
+        due=due,
+        priority=task.priority or 0
+    )
+
+async def strategist_node(state: AgentState):
     """
     Worker: Strategist.
     Responsibilities: Task breakdown and planning.
+    Time-blocks the user's pending tasks into free calendar time with the
+    deterministic scheduler (no LLM call) and stores it as `proposed_plan`.
+    With no model here to call tools, bulk task changes go through the task
+    tools bound in agent_node (make_task_tools); this node only reads.
     """
-    # Placeholder Logic
-    print("--- STRATEGIST: Optimizing Plan ---")
+    logger.debug("Optimizing plan")
+    user_email = state.get("user_context", {}).get("email")
+    if not user_email:
+        return {
+            "messages": [AIMessage(content="[Strategist] I can't plan without knowing who you are. Please log in first.")],
+            "audit_log": [{"role": "Strategist", "action": "Created Plan", "status": "Failed", "reason": "No Email"}]
+        }
+
+    window_start = datetime.now(timezone.utc)
+    window_end = window_start + timedelta(days=PLANNING_HORIZON_DAYS)
+    audit = []
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).where(User.email == user_email))
+        user = result.scalars().first()
+        if not user:
+            return {
+                "messages": [AIMessage(content="[Strategist] I couldn't find your account.")],
+                "audit_log": [{"role": "Strategist", "action": "Created Plan", "status": "Failed", "reason": "Unknown User"}]
+            }
+        tasks = await TaskTool(db, user).list_tasks(status="pending", limit=MAX_PLANNED_TASKS)
+
+        busy = []
+        try:
+            calendar_ids = await get_user_calendar_ids(user_email, db)
+            service = await get_google_service(user_email, db, "calendar", "v3")
+            events = await list_merged_events(
+                service, calendar_ids,
+                window_start.isoformat(), window_end.isoformat(),
+                user_email
+            )
+            busy = busy_intervals(events)
+        except Exception as e:
+            # Plan against working hours alone rather than failing outright
+            audit.append({"role": "Strategist", "action": "Read Calendar", "status": "Skipped", "reason": str(e)})
+
+    prefs = parse_preferences(get_settings_manager().get_user_preferences())
+    plan = schedule_tasks([_to_schedulable(t) for t in tasks], busy, window_start, window_end, prefs)
+    stats = plan["stats"]
+
+    if not tasks:
+        summary = "[Strategist] You have no pending tasks to plan."
+    else:
+        summary = (
+            f"[Strategist] Planned {stats['scheduled']} of {stats['tasks']} pending tasks "
+            f"over the next {PLANNING_HORIZON_DAYS} days"
+        )
+        if stats["late"]:
+            summary += f"; {stats['late']} will finish after their due date"
+        if plan["unscheduled"]:
+            summary += f"; {len(plan['unscheduled'])} did not fit"
+        summary += "."
+
+    audit.append({"role": "Strategist", "action": "Created Plan", "status": "Optimized", "stats": stats})
     return {
-        "messages": [AIMessage(content="[Strategist] Breaking this down: We need 2 focused hours. I recommend the Pomodoro technique.")],
-        "audit_log": [{"role": "Strategist", "action": "Created Plan", "status": "Optimized"}]
+        "messages": [AIMessage(content=summary)],
+        "proposed_plan": plan,
+        "audit_log": audit
     }
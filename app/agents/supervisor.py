@@ -1,6 +1,8 @@
 from typing import Literal
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.core.llm import get_chat_model
+from app.core.model_router import get_model_router
+from app.core.settings_manager import get_settings_manager
 from app.agents.common import AgentState
 from pydantic import BaseModel
 import os
@@ -29,10 +31,14 @@ class RouteResponse(BaseModel):
 def supervisor_node(state: AgentState):
     """
     The orchestrator node. Decides which agent acts next.
+    Routing is a one-word classification, so it runs on the cheapest model
+    in the cascade rather than the active one.
     """
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-flash-latest",
-        google_api_key=os.getenv("GOOGLE_API_KEY"),
+    snapshot = get_settings_manager().get_snapshot()
+    _, model = get_model_router().rungs(snapshot)[0]
+    llm = get_chat_model(
+        model=model,
+        google_api_key=snapshot.active_key or os.getenv("GOOGLE_API_KEY"),
         temperature=0
     )
     
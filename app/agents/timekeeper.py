@@ -1,8 +1,9 @@
 from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
 from app.agents.common import AgentState
-from app.services.google_svc import get_google_service
-from app.database import AsyncSessionLocal
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.services.calendar_svc import availability, calendar_reads
+from app.services.event_cache import event_cache
+from app.services.prefetch import Prefetch
+from app.core.llm import get_chat_model
 from datetime import datetime
 import json
 
@@ -20,32 +21,54 @@ async def timekeeper_node(state: AgentState):
             "audit_log": [{"role": "Timekeeper", "status": "Failed", "reason": "No Email"}]
         }
 
+    # Every Timekeeper turn is about the calendar: fetch it while the model decides
+    prefetch = Prefetch(user_email)
+    prefetch.start_calendar()
+    try:
+        return await _timekeeper_turn(state, user_email, prefetch)
+    finally:
+        await prefetch.close()
+
+
+async def _timekeeper_turn(state: AgentState, user_email: str, prefetch: Prefetch):
     # Internal Tool Definition
     async def create_event(summary: str, start_time: str, end_time: str, description: str = ""):
         """Creates a Google Calendar event. Times must be ISO 8601 strings."""
-        async with AsyncSessionLocal() as db:
-            try:
-                service = await get_google_service(user_email, db, "calendar", "v3")
-                event_body = {
-                    'summary': summary,
-                    'description': description,
-                    'start': {'dateTime': start_time, 'timeZone': 'UTC'}, 
-                    'end': {'dateTime': end_time, 'timeZone': 'UTC'},
-                }
-                # Check current time context to infer dates if needed? 
-                # The LLM should handle ISO conversion ideally.
-                
-                res = service.events().insert(calendarId='primary', body=event_body).execute()
-                link = res.get('htmlLink')
-                return f"Event created successfully! Link: {link}"
-            except Exception as e:
-                return f"Failed to create event: {str(e)}"
+        try:
+            service = await prefetch.calendar_service()
+            event_body = {
+                'summary': summary,
+                'description': description,
+                'start': {'dateTime': start_time, 'timeZone': 'UTC'}, 
+                'end': {'dateTime': end_time, 'timeZone': 'UTC'},
+            }
+            # Check current time context to infer dates if needed? 
+            # The LLM should handle ISO conversion ideally.
+            
+            res = service.events().insert(calendarId='primary', body=event_body).execute()
+            # All of the user's calendars: selected ones are cached under their real ids, not 'primary'
+            event_cache.invalidate(user_email)
+            calendar_reads.invalidate(user_email)
+            prefetch.invalidate("calendar_events")
+            link = res.get('htmlLink')
+            return f"Event created successfully! Link: {link}"
+        except Exception as e:
+            return f"Failed to create event: {str(e)}"
+
+    async def check_availability(time_min: str, time_max: str):
+        """Returns busy and free periods across all of the user's calendars. Times must be ISO 8601 strings with timezone (e.g. 2024-01-01T09:00:00Z)."""
+        try:
+            events = await prefetch.calendar_events(time_min, time_max)
+            return json.dumps(availability(events, time_min, time_max))
+        except Exception as e:
+            return f"Failed to check availability: {str(e)}"
 
     # LLM Setup
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0)
+    llm = get_chat_model(model="gemini-1.5-flash", temperature=0)
     
     # We define tools interface for binding
-    tools = [create_event]
+    tools = [create_event, check_availability]
+    tool_map = {t.__name__: t for t in tools}
     llm_with_tools = llm.bind_tools(tools)
     
     # Contextualize
@@ -54,6 +77,7 @@ async def timekeeper_node(state: AgentState):
     Current Time: {current_time}.
     Your task is to EXECUTE calendar actions requested by the user or supervisor.
     If asked to add an event, USE the `create_event` tool.
+    If asked whether the user is free, USE the `check_availability` tool (it covers all of their calendars).
     Input times should be converted to absolute ISO 8601 format (YYYY-MM-DDTHH:MM:SS) based on the current time.
     For "today 3pm", calculate the date relative to {current_time}.
     """
@@ -73,12 +97,12 @@ async def timekeeper_node(state: AgentState):
     # Execute Tool Calls
     if response.tool_calls:
         for call in response.tool_calls:
-            if call['name'] == 'create_event':
+            if call['name'] in tool_map:
                 args = call['args']
-                audit_events.append({"role": "Timekeeper", "action": "Calling Tool", "tool": "create_event", "args": args})
+                audit_events.append({"role": "Timekeeper", "action": "Calling Tool", "tool": call['name'], "args": args})
                 
                 # Execute
-                tool_result = await create_event(**args)
+                tool_result = await tool_map[call['name']](**args)
                 
                 final_response_text = f"Action Taken: {tool_result}"
                 audit_events.append({"role": "Timekeeper", "action": "Tool Result", "result": tool_result})
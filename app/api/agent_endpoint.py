@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException
+import logging
+
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from langchain_core.messages import HumanMessage
-from app.agents.graph import graph
+
+from app.core.admission import client_key, get_admission_controller
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -10,10 +14,20 @@ class AgentRequest(BaseModel):
     user_context: dict = {}
 
 @router.post("/run")
-async def run_agent(request: AgentRequest):
+async def run_agent(request: AgentRequest, http_request: Request):
     """
     Triggers the Multi-Agent System with a user query.
     """
+    user = client_key(request.user_context.get("email"), http_request)
+    async with get_admission_controller().slot(user):
+        return await _run_agent(request)
+
+async def _run_agent(request: AgentRequest):
+    # Loaded on first use; importing and compiling the graph is slow
+    from langchain_core.messages import HumanMessage
+    from app.agents.graph import get_graph
+    graph = get_graph()
+
     try:
         # Initialize State
         initial_state = {
@@ -40,6 +54,5 @@ async def run_agent(request: AgentRequest):
         }
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Agent run failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -5,11 +5,13 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models import User
 from app.config import get_settings
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
+from app.services.google_svc import google_services
 import json
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 settings = get_settings()
 
@@ -28,6 +30,7 @@ os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 os.environ['OAUTHLIB_RELAX_TOKEN_SCOPE'] = '1'
 
 def create_flow(request: Request = None):
+    from google_auth_oauthlib.flow import Flow # Heavy; only needed for the OAuth routes
     # Construct config from env vars/settings
     # Note: google-auth-oauthlib expects a client_config dictionary or file
     client_config = {
@@ -103,6 +106,7 @@ async def auth_callback(request: Request, db: AsyncSession = Depends(get_db)):
         
         await db.commit()
         await db.refresh(user)
+        google_services.invalidate(email) # Drop services built with the old tokens
         
         # Return to Frontend
         # Set a simple cookie for now to indicate "logged in"
@@ -114,6 +118,5 @@ async def auth_callback(request: Request, db: AsyncSession = Depends(get_db)):
         return response
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Google OAuth callback failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.responses import json_with_etag
 from app.database import get_db
 from app.services.google_svc import get_google_service
+from app.services.event_cache import event_cache
+from app.services.calendar_svc import (
+    calendar_reads, get_user_calendar_ids, set_user_calendar_ids, list_merged_events,
+    busy_intervals, free_slots, parse_window_bound
+)
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class CalendarEvent(BaseModel):
@@ -15,42 +24,120 @@ class CalendarEvent(BaseModel):
     end_time: str   # ISO format
     location: Optional[str] = None
 
+class CalendarSelection(BaseModel):
+    calendar_ids: List[str]
+
+def _default_window(time_min: Optional[str], time_max: Optional[str]):
+    # Defaults to current month if not provided. Bounds are whole hours so
+    # repeated default requests ask for the same window (and can share a read).
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    if not time_min:
+        time_min = now.replace(day=1, hour=0).isoformat() + 'Z'
+    if not time_max:
+         # Next month roughly
+         time_max = (now + timedelta(days=30, hours=1)).isoformat() + 'Z'
+    return time_min, time_max
+
+async def _merged_events(user_email: str, db: AsyncSession, calendar_ids: List[str], time_min: str, time_max: str):
+    """list_merged_events for the user, coalesced with identical concurrent reads."""
+    async def fetch():
+        service = await get_google_service(user_email, db, "calendar", "v3")
+        return await list_merged_events(service, calendar_ids, time_min, time_max, user_email)
+
+    # Keyed on the parsed bounds, so '...Z' and '...+00:00' spellings coalesce
+    key = (user_email, "events", tuple(calendar_ids), parse_window_bound(time_min), parse_window_bound(time_max))
+    return await calendar_reads.do(key, fetch)
+
 @router.get("/events")
 async def list_events(
+    request: Request,
     user_email: str, # We'll pass this from frontend for now (in prod -> Auth header)
     time_min: Optional[str] = None, 
     time_max: Optional[str] = None,
+    calendar_ids: Optional[List[str]] = Query(None), # Overrides the user's saved selection
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        # Defaults to current month if not provided
+        time_min, time_max = _default_window(time_min, time_max)
+        if not calendar_ids:
+            calendar_ids = await get_user_calendar_ids(user_email, db)
+
+        # Each event carries a `calendarId` so the client can target update/delete
+        events = await _merged_events(user_email, db, calendar_ids, time_min, time_max)
+        # Raw Google payloads: serialized by orjson, 304 if the window is unchanged
+        return json_with_etag(request, events)
+
+    except Exception as e:
+        logger.warning(f"Calendar error for {user_email}: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/availability")
+async def get_availability(
+    user_email: str,
+    time_min: Optional[str] = None,
+    time_max: Optional[str] = None,
+    min_minutes: int = 15,
+    db: AsyncSession = Depends(get_db)
+):
+    """Busy blocks and free slots across all of the user's selected calendars."""
+    try:
+        # Minute precision, so concurrent default requests coalesce
+        now = datetime.utcnow().replace(second=0, microsecond=0)
         if not time_min:
-            time_min = datetime.utcnow().replace(day=1).isoformat() + 'Z'
+            time_min = now.isoformat() + 'Z'
         if not time_max:
-             # Next month roughly
-             time_max = (datetime.utcnow() + timedelta(days=30)).isoformat() + 'Z'
+            time_max = (now + timedelta(days=7)).isoformat() + 'Z'
+
+        calendar_ids = await get_user_calendar_ids(user_email, db)
+        events = await _merged_events(user_email, db, calendar_ids, time_min, time_max)
 
+        busy = busy_intervals(events)
+        free = free_slots(busy, parse_window_bound(time_min), parse_window_bound(time_max), min_minutes)
+        return {
+            "calendar_ids": calendar_ids,
+            "busy": [{"start": s.isoformat(), "end": e.isoformat()} for s, e in busy],
+            "free": [{"start": s.isoformat(), "end": e.isoformat()} for s, e in free],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/calendars")
+async def list_calendars(user_email: str, db: AsyncSession = Depends(get_db)):
+    """Calendars the user can see, plus the ones selected for the aggregated view."""
+    async def fetch_available():
         service = await get_google_service(user_email, db, "calendar", "v3")
-        
-        events_result = service.events().list(
-            calendarId='primary', 
-            timeMin=time_min, 
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        return events
+        result = service.calendarList().list().execute()
+        return [
+            {"id": c["id"], "summary": c.get("summary"), "primary": c.get("primary", False)}
+            for c in result.get('items', [])
+        ]
 
+    try:
+        available = await calendar_reads.do((user_email, "calendars"), fetch_available)
+        selected = await get_user_calendar_ids(user_email, db)
+        return {"selected": selected, "available": available}
     except Exception as e:
-        print(f"Calendar Error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.put("/calendars")
+async def update_calendars(
+    user_email: str,
+    selection: CalendarSelection,
+    db: AsyncSession = Depends(get_db)
+):
+    if not selection.calendar_ids:
+        raise HTTPException(status_code=400, detail="At least one calendar must be selected")
+    try:
+        selected = await set_user_calendar_ids(user_email, selection.calendar_ids, db)
+        return {"selected": selected}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.post("/events")
 async def create_event(
     user_email: str,
     event: CalendarEvent,
+    calendar_id: str = 'primary',
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -64,7 +151,9 @@ async def create_event(
             'end': {'dateTime': event.end_time, 'timeZone': 'UTC'},
         }
         
-        created_event = service.events().insert(calendarId='primary', body=event_body).execute()
+        created_event = service.events().insert(calendarId=calendar_id, body=event_body).execute()
+        event_cache.invalidate(user_email, calendar_id)
+        calendar_reads.invalidate(user_email)
         return created_event
 
     except Exception as e:
@@ -74,11 +163,14 @@ async def create_event(
 async def delete_event(
     event_id: str,
     user_email: str,
+    calendar_id: str = 'primary',
     db: AsyncSession = Depends(get_db)
 ):
     try:
         service = await get_google_service(user_email, db, "calendar", "v3")
-        service.events().delete(calendarId='primary', eventId=event_id).execute()
+        service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+        event_cache.invalidate(user_email, calendar_id)
+        calendar_reads.invalidate(user_email)
         return {"status": "deleted", "id": event_id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -88,6 +180,7 @@ async def update_event(
     event_id: str,
     user_email: str,
     event: CalendarEvent,
+    calendar_id: str = 'primary',
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -107,7 +200,9 @@ async def update_event(
         # Filter None
         event_body = {k: v for k, v in event_body.items() if v is not None}
 
-        updated_event = service.events().patch(calendarId='primary', eventId=event_id, body=event_body).execute()
+        updated_event = service.events().patch(calendarId=calendar_id, eventId=event_id, body=event_body).execute()
+        event_cache.invalidate(user_email, calendar_id)
+        calendar_reads.invalidate(user_email)
         return updated_event
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,167 @@
+"""
+WebSocket chat: WS /api/v1/chat/ws?user_email=...&thread_id=...
+
+The thread, its history, the compiled graph and the user's Calendar service
+are set up once per connection (see ChatSession), so each turn only costs
+the model call and two inserts.
+
+Client -> server:
+    {"type": "message", "content": "..."}   one chat turn
+    {"type": "pong"}                        optional heartbeat reply
+Server -> client:
+    {"type": "session", "thread_id": ...}   once the session is open (thread_id is null until the first turn)
+    {"type": "token", "text": "..."}        streamed reply text
+    {"type": "reset"}                       discard this turn's tokens so far (the model was escalated
+                                            or fell back); the tokens that follow replace them
+    {"type": "done", "response": "...", "thread_id": ...}   reply of record for the turn
+    {"type": "error", "detail": "...", "retry_after"?: n}
+    {"type": "ping"}                        every WS_HEARTBEAT_SECONDS
+
+Backpressure: turns run one at a time and at most WS_MAX_PENDING_TURNS wait
+behind the current one; more are refused with an error. Outgoing tokens
+queue in an Outbox that merges consecutive tokens, so a slow client gets
+fewer, larger frames instead of stalling the model stream or growing an
+unbounded queue.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.config import get_settings
+from app.core.admission import AdmissionRejected, client_key, get_admission_controller
+from app.core.metrics import WS_SESSIONS
+from app.services.chat_session import ChatSession
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class Outbox:
+    """Ordered outgoing frames, sent by one writer task; adjacent tokens are merged."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._frames: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def put(self, frame: Dict[str, Any]):
+        if frame["type"] == "reset":
+            # Tokens still queued are void too: no need to send them
+            while self._frames and self._frames[-1]["type"] == "token":
+                self._frames.pop()
+        last = self._frames[-1] if self._frames else None
+        if frame["type"] == "token" and last is not None and last["type"] == "token":
+            last["text"] += frame["text"]
+        elif frame["type"] == "ping" and any(f["type"] == "ping" for f in self._frames):
+            return  # One unsent heartbeat is enough
+        else:
+            self._frames.append(frame)
+        self._ready.set()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def run(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._frames:
+                await self.websocket.send_json(self._frames.popleft())
+            if self._closed:
+                return
+
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket, user_email: Optional[str] = None, thread_id: Optional[str] = None):
+    settings = get_settings()
+    await websocket.accept()
+
+    session = ChatSession(user_email, thread_id)
+    try:
+        await session.open()
+    except LookupError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=4404)
+        return
+
+    outbox = Outbox(websocket)
+    turns: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_MAX_PENDING_TURNS)
+    last_seen = time.monotonic()
+    busy = False
+    admission_key = client_key(user_email, websocket)
+    outbox.put({"type": "session", "thread_id": session.thread_id})
+
+    async def read_frames():
+        nonlocal last_seen
+        while True:
+            raw = await websocket.receive_text()
+            last_seen = time.monotonic()
+            try:
+                frame = json.loads(raw)
+            except ValueError:
+                outbox.put({"type": "error", "detail": "Frames must be JSON"})
+                continue
+            if not isinstance(frame, dict) or frame.get("type") != "message":
+                continue
+            content = frame.get("content")
+            if not isinstance(content, str) or not content.strip():
+                outbox.put({"type": "error", "detail": "Empty message"})
+            elif turns.full():
+                outbox.put({"type": "error", "detail": "Too many pending messages; wait for the current reply"})
+            else:
+                turns.put_nowait(content)
+
+    async def send_token(text: str):
+        outbox.put({"type": "token", "text": text})
+
+    async def send_reset():
+        outbox.put({"type": "reset"})
+
+    async def run_turns():
+        nonlocal busy
+        while True:
+            content = await turns.get()
+            busy = True
+            try:
+                async with get_admission_controller().slot(admission_key):
+                    reply = await session.run_turn(content, send_token, send_reset)
+                outbox.put({"type": "done", "response": reply, "thread_id": session.thread_id})
+            except AdmissionRejected as e:
+                outbox.put({"type": "error", "detail": f"Too many requests ({e.reason})", "retry_after": e.retry_after})
+            except Exception as e:
+                logger.exception(f"Chat turn failed for thread {session.thread_id}")
+                outbox.put({"type": "error", "detail": str(e)})
+            finally:
+                busy = False
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_SECONDS)
+            if time.monotonic() - last_seen > settings.WS_IDLE_TIMEOUT_SECONDS and not busy and turns.empty():
+                await websocket.close(code=1001, reason="Idle timeout")
+                return
+            outbox.put({"type": "ping"})
+
+    WS_SESSIONS.inc()
+    tasks = [asyncio.create_task(t) for t in (read_frames(), run_turns(), heartbeat(), outbox.run())]
+    try:
+        # Any task ending (client gone, idle close, send failure) ends the session
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.warning(f"Chat socket closed: {task.exception()!r}")
+    finally:
+        WS_SESSIONS.dec()
+        outbox.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
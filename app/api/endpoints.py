@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
+from app.core.admission import client_key, get_admission_controller
+from app.core.logs import bind_thread_id
+from app.config import get_settings
 from app.models import User
-from app.agent.graph import create_agent_graph
-from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 from typing import Optional
+import logging
 
 from app.api.auth import router as auth_router
-from app.api import agent_endpoint, calendar
+from app.api import agent_endpoint, calendar, chat_ws, tasks
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter()
 router.include_router(auth_router, prefix="/auth", tags=["auth"])
 router.include_router(agent_endpoint.router, prefix="/agent", tags=["agent"])
 router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
+router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+router.include_router(chat_ws.router, prefix="/chat", tags=["chat"])
 
 class ChatRequest(BaseModel):
     message: str
@@ -22,9 +29,15 @@ class ChatRequest(BaseModel):
     user_email: Optional[str] = None
 
 @router.post("/chat")
-async def chat_endpoint(request: ChatRequest, db: AsyncSession = Depends(get_db)):
-    print(f"DEBUG CHAT REQUEST: Email={request.user_email}, Message={request.message}")
-    # Initialize graph
+async def chat_endpoint(request: ChatRequest, http_request: Request, db: AsyncSession = Depends(get_db)):
+    # Admitted before anything is persisted, so a rejected message leaves no trace
+    async with get_admission_controller().slot(client_key(request.user_email, http_request)):
+        return await _chat(request, db)
+
+async def _chat(request: ChatRequest, db: AsyncSession):
+    logger.debug(f"Chat request: Email={request.user_email}, Thread={request.thread_id}, Chars={len(request.message)}")
+    # Initialize graph (imported here: LangGraph and the Gemini SDK are heavy)
+    from app.agent.graph import create_agent_graph
     app = create_agent_graph()
     
     # Extract values
@@ -42,21 +55,25 @@ async def chat_endpoint(request: ChatRequest, db: AsyncSession = Depends(get_db)
         new_thread = Thread(id=thread_id, title=title)
         db.add(new_thread)
         await db.commit()
+    bind_thread_id(thread_id)
     
     # Persist User Message
     from app.models import Message
-    user_msg = Message(thread_id=thread_id, role="user", content=message)
-    db.add(user_msg)
+    from app.services.messages import record_message
+    from app.services.memory import format_memories, recall, remember
+    user_message = await record_message(db, thread_id, "user", message)
     await db.commit()
 
-    # Retrieve history? 
-    # Ideally, we should fetch previous messages from DB and pass to agent.
-    # For now, we will just pass the current message, assuming the agent/graph works statelessly per request 
-    # unless we rebuild history here.
-    # Let's rebuild history for context!
+    # Rebuild history for context: with long-term memory on, only the most
+    # recent messages; older and cross-thread context comes from recall
     from sqlalchemy import select
-    result = await db.execute(select(Message).where(Message.thread_id == thread_id).order_by(Message.created_at.asc()))
-    history = result.scalars().all()
+    query = select(Message).where(Message.thread_id == thread_id)
+    if settings.MEMORY_ENABLED:
+        query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(settings.MEMORY_RECENT_MESSAGES)
+        history = list(reversed((await db.execute(query)).scalars().all()))
+    else:
+        history = (await db.execute(query.order_by(Message.created_at.asc()))).scalars().all()
+    memories = await recall(db, request.user_email, message, exclude=[msg.content for msg in history])
     
     # Convert to LangChain messages
     from langchain_core.messages import HumanMessage, AIMessage
@@ -72,7 +89,7 @@ async def chat_endpoint(request: ChatRequest, db: AsyncSession = Depends(get_db)
     # If using a pre-built graph that expects full state, we pass it all.
     inputs = {
         "messages": langchain_messages,
-        "user_context": {"email": request.user_email}
+        "user_context": {"email": request.user_email, "memories": format_memories(memories)}
     } # This replaces state? depends on graph definition.
     # If graph uses 'messages' as Annotated[list, add_messages], passing full list might duplicate if we are not careful.
     # Since we are essentially "rehydrating" the state, passing full history is correct for a stateless REST API model.
@@ -84,9 +101,9 @@ async def chat_endpoint(request: ChatRequest, db: AsyncSession = Depends(get_db)
     last_message = result["messages"][-1]
     
     # Persist AI Response
-    ai_msg = Message(thread_id=thread_id, role="assistant", content=last_message.content)
-    db.add(ai_msg)
+    reply = await record_message(db, thread_id, "assistant", last_message.content)
     await db.commit()
+    await remember(request.user_email, [(user_message.id, message), (reply.id, last_message.content)])
     
     return {"response": last_message.content, "thread_id": thread_id}
 
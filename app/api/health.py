@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.health import get_health_monitor
+
+router = APIRouter()
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving. Never touches dependencies."""
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness from the cached background probes; 503 until the database is reachable."""
+    monitor = get_health_monitor()
+    return JSONResponse(status_code=200 if monitor.ready else 503, content=monitor.report())
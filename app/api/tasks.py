@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from datetime import datetime
+
+from app.database import get_db
+from app.models import User
+from app.agent.tools.tasks import TaskStatus, TaskTool, encode_cursor
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 200
+MAX_BULK_SIZE = 1000
+
+# Schema
+class TaskSchema(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    status: str
+    due_date: Optional[datetime] = None
+    duration_minutes: Optional[int] = None
+    priority: Optional[int] = 0
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class TaskPage(BaseModel):
+    items: List[TaskSchema]
+    next_cursor: Optional[str] = None
+
+class TaskCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    duration_minutes: Optional[int] = None
+    priority: int = 0
+
+class TaskChanges(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[TaskStatus] = None
+    due_date: Optional[datetime] = None
+    duration_minutes: Optional[int] = None
+    priority: Optional[int] = None
+
+    @field_validator("title", "status", "priority")
+    @classmethod
+    def not_null(cls, value):
+        # Optional only so they can be left out; the columns must not become NULL
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+class BulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., max_length=MAX_BULK_SIZE)
+
+class BulkComplete(BaseModel):
+    ids: List[int] = Field(..., max_length=MAX_BULK_SIZE)
+
+class BulkUpdate(BaseModel):
+    ids: List[int] = Field(..., max_length=MAX_BULK_SIZE)
+    changes: TaskChanges
+
+class BulkResult(BaseModel):
+    updated_ids: List[int]
+
+async def get_task_store(user_email: str, db: AsyncSession = Depends(get_db)) -> TaskTool:
+    result = await db.execute(select(User).where(User.email == user_email))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return TaskTool(db, user)
+
+@router.get("/", response_model=TaskPage)
+async def list_tasks(
+    status: Optional[str] = None,
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    store: TaskTool = Depends(get_task_store)
+):
+    """Keyset-paginated task list; pass `next_cursor` back as `cursor` for the next page."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        # Fetch one extra row to know whether another page exists
+        tasks = await store.list_tasks(
+            status=status, due_before=due_before, due_after=due_after, limit=limit + 1, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+    return TaskPage(items=tasks[:limit], next_cursor=next_cursor)
+
+@router.post("/", response_model=TaskSchema)
+async def create_task(task_in: TaskCreate, store: TaskTool = Depends(get_task_store)):
+    return await store.add_task(**task_in.model_dump())
+
+@router.post("/bulk", response_model=List[TaskSchema])
+async def bulk_create_tasks(payload: BulkCreate, store: TaskTool = Depends(get_task_store)):
+    return await store.add_tasks([t.model_dump() for t in payload.tasks])
+
+@router.post("/bulk/complete", response_model=BulkResult)
+async def bulk_complete_tasks(payload: BulkComplete, store: TaskTool = Depends(get_task_store)):
+    return BulkResult(updated_ids=await store.complete_tasks(payload.ids))
+
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_tasks(payload: BulkUpdate, store: TaskTool = Depends(get_task_store)):
+    changes = payload.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes provided")
+    return BulkResult(updated_ids=await store.update_tasks(payload.ids, changes))
@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
 import uuid
 
-from app.database import get_db
+from app.config import get_settings
+from app.core.responses import etag_matches, json_with_etag, make_etag, not_modified
+from app.database import get_db, get_read_db
 from app.models import Thread, Message
+from app.services.thread_purge import get_thread_purger
 
 router = APIRouter()
 
+MAX_BULK_DELETE = 1000
+
 # Schema
 class MessageSchema(BaseModel):
     id: int
@@ -31,24 +36,43 @@ class ThreadListSchema(BaseModel):
     title: Optional[str]
     created_at: datetime
     updated_at: Optional[datetime]
+    message_count: int = 0
+    last_message_preview: Optional[str] = None
+    last_activity_at: Optional[datetime] = None
     # No messages here to avoid lazy load issues
 
     class Config:
         from_attributes = True
 
+class BulkDelete(BaseModel):
+    ids: List[str] = Field(..., max_length=MAX_BULK_DELETE)
+
+class BulkDeleteResult(BaseModel):
+    deleted_ids: List[str]
+
 class ThreadDetailSchema(BaseModel):
     id: str
     title: Optional[str]
     created_at: datetime
     updated_at: Optional[datetime]
+    message_count: int = 0
+    last_message_preview: Optional[str] = None
+    last_activity_at: Optional[datetime] = None
     messages: List[MessageSchema] = []
 
     class Config:
         from_attributes = True
 
 @router.get("/", response_model=List[ThreadListSchema])
-async def list_threads(skip: int = 0, limit: int = 50, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Thread).order_by(Thread.updated_at.desc()).offset(skip).limit(limit))
+async def list_threads(skip: int = 0, limit: int = 50, db: AsyncSession = Depends(get_read_db)):
+    # Served by ix_threads_deleted_at_last_activity_at; never touches messages
+    result = await db.execute(
+        select(Thread)
+        .where(Thread.deleted_at.is_(None))
+        .order_by(Thread.last_activity_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
     threads = result.scalars().all()
     return threads
 
@@ -68,29 +92,78 @@ async def create_thread(thread_in: ThreadCreate, db: AsyncSession = Depends(get_
     new_thread_loaded = result.scalar_one()
     return new_thread_loaded
 
+THREAD_COLUMNS = (
+    Thread.id, Thread.title, Thread.created_at, Thread.updated_at,
+    Thread.message_count, Thread.last_message_preview, Thread.last_activity_at
+)
+MESSAGE_COLUMNS = (Message.id, Message.thread_id, Message.role, Message.content, Message.created_at)
+
 @router.get("/{thread_id}", response_model=ThreadDetailSchema)
-async def get_thread(thread_id: str, db: AsyncSession = Depends(get_db)):
-    # Use selectinload to eagerly load messages
+async def get_thread(thread_id: str, request: Request, db: AsyncSession = Depends(get_read_db)):
+    """
+    Thread with all of its messages, oldest first. Rows go straight from the
+    database to orjson (no ORM objects, no response_model validation). The
+    ETag comes from the thread's activity columns, so an unchanged thread
+    answers 304 without loading any messages.
+    """
     result = await db.execute(
-        select(Thread)
-        .options(selectinload(Thread.messages))
-        .where(Thread.id == thread_id)
+        select(*THREAD_COLUMNS).where(Thread.id == thread_id, Thread.deleted_at.is_(None))
     )
-    thread = result.scalar_one_or_none()
-    
+    thread = result.mappings().first()
     if not thread:
         raise HTTPException(status_code=404, detail="Thread not found")
-    
-    return thread
+
+    # record_message bumps message_count and last_activity_at with every message
+    etag = make_etag(repr(tuple(thread.values())).encode())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    result = await db.execute(
+        select(*MESSAGE_COLUMNS)
+        .where(Message.thread_id == thread_id)
+        .order_by(Message.created_at, Message.id) # ix_messages_thread_id_created_at
+    )
+    content = dict(thread)
+    content["messages"] = [dict(row) for row in result.mappings()]
+    return json_with_etag(request, content, etag)
 
 
 @router.delete("/{thread_id}")
 async def delete_thread(thread_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Thread).where(Thread.id == thread_id))
-    thread = result.scalar_one_or_none()
-    if not thread:
+    result = await db.execute(select(Thread.id).where(Thread.id == thread_id, Thread.deleted_at.is_(None)))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Thread not found")
-    
-    await db.delete(thread)
+
+    # Bounded probe: is there a message past the threshold? Never counts the whole thread
+    threshold = get_settings().THREAD_SOFT_DELETE_THRESHOLD
+    result = await db.execute(
+        select(Message.id).where(Message.thread_id == thread_id).offset(threshold).limit(1)
+    )
+    if result.first() is not None:
+        await db.execute(update(Thread).where(Thread.id == thread_id).values(deleted_at=datetime.now(timezone.utc)))
+        await db.commit()
+        get_thread_purger().wake()
+        return {"status": "success", "purge": "scheduled"}
+
+    # Small thread: messages go with it through ON DELETE CASCADE, nothing is loaded
+    await db.execute(delete(Thread).where(Thread.id == thread_id))
     await db.commit()
     return {"status": "success"}
+
+@router.post("/bulk/delete", response_model=BulkDeleteResult)
+async def bulk_delete_threads(payload: BulkDelete, db: AsyncSession = Depends(get_db)):
+    """
+    Soft-delete many threads in one statement; the purger removes them and
+    their messages in the background. Unknown or already deleted ids are skipped.
+    """
+    result = await db.execute(
+        update(Thread)
+        .where(Thread.id.in_(payload.ids), Thread.deleted_at.is_(None))
+        .values(deleted_at=datetime.now(timezone.utc))
+        .returning(Thread.id)
+    )
+    deleted_ids = result.scalars().all()
+    await db.commit()
+    if deleted_ids:
+        get_thread_purger().wake()
+    return BulkDeleteResult(deleted_ids=deleted_ids)
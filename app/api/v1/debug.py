@@ -1,11 +1,14 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
 import os
 import traceback
-from langchain_google_genai import ChatGoogleGenerativeAI
 from app.config import get_settings
+from app.core.admission import get_admission_controller
+from app.core.model_router import get_model_router
 from app.core.settings_manager import get_settings_manager
+from app.database import pool_stats
+from app.services.llm_bench import benchmark, best_pair
 
 router = APIRouter()
 
@@ -70,6 +73,7 @@ async def diagnose_system():
         )
 
     # 3. Test Model Connection (Standard Invoke)
+    from langchain_google_genai import ChatGoogleGenerativeAI
     try:
         resolved_model = settings_manager.get_active_model_resolved_id()
         log(f"Initialize Model ({resolved_model})", "START", "Attempting initialization...")
@@ -112,3 +116,73 @@ async def diagnose_system():
         logs=logs,
         success=logs[-1]["status"] == "SUCCESS" or logs[-2]["status"] == "SUCCESS" # Rough check
     )
+
+class BenchmarkRequest(BaseModel):
+    model_ids: Optional[List[str]] = None # ModelConfig ids; all configured models if omitted
+    key_ids: Optional[List[str]] = None   # ApiKeyConfig ids; all configured keys if omitted
+    samples: int = Field(3, ge=1, le=20)
+    concurrency: int = Field(4, ge=1, le=16)
+    timeout_seconds: float = Field(20.0, gt=0, le=120)
+    apply: bool = False # Make the best pair the active model/key
+
+class BenchmarkResponse(BaseModel):
+    results: List[Dict[str, Any]]
+    best: Optional[Dict[str, Any]] = None
+    applied: bool = False
+    elapsed_ms: float
+
+@router.post("/benchmark", response_model=BenchmarkResponse)
+async def benchmark_models(request: BenchmarkRequest):
+    """
+    Probe every configured model against every configured API key concurrently
+    and report latency percentiles, time to first token and error classes.
+    Spends real quota: samples x models x keys short generations.
+    """
+    import time
+    settings_manager = get_settings_manager()
+    config = settings_manager.get_config()
+
+    models = [m for m in config.models if request.model_ids is None or m.id in request.model_ids]
+    keys = [k for k in config.api_keys if request.key_ids is None or k.id in request.key_ids]
+    if not models or not keys:
+        raise HTTPException(status_code=400, detail="No matching models or API keys configured")
+
+    started = time.perf_counter()
+    results = await benchmark(
+        models, keys,
+        samples=request.samples,
+        concurrency=request.concurrency,
+        timeout=request.timeout_seconds
+    )
+    summaries = sorted(
+        (r.summary() for r in results),
+        key=lambda s: (-s["successes"], s["p50_ms"] if s["p50_ms"] is not None else float("inf"))
+    )
+
+    best = best_pair(results)
+    applied = False
+    if request.apply and best:
+        await settings_manager.update_config({"active_model_id": best.model_id, "active_api_key_id": best.key_id})
+        applied = True
+
+    return BenchmarkResponse(
+        results=summaries,
+        best=best.summary() if best else None,
+        applied=applied,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
+
+@router.get("/db/pool")
+async def db_pool_stats():
+    """Connection pool utilisation: checked out, overflow in use, checkout wait time."""
+    return pool_stats()
+
+@router.get("/admission")
+async def admission_stats():
+    """LLM admission control in this worker: slots in use, queue depth, tracked users."""
+    return get_admission_controller().stats()
+
+@router.get("/cascade")
+async def cascade_stats():
+    """Model cascade in this worker: per-model turns, success rate, escalation reasons, latency."""
+    return get_model_router().stats()
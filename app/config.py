@@ -13,16 +13,91 @@ class Settings(BaseSettings):
     GOOGLE_REDIRECT_URI: str | None = os.getenv("GOOGLE_REDIRECT_URI")
     GOOGLE_API_KEY: str | None = os.getenv("GOOGLE_API_KEY") # For Gemini
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash") # Default to user validated model
+    # Offline benchmarking seams; leave unset in production
+    CHAT_MODEL_CLASS: str | None = os.getenv("CHAT_MODEL_CLASS") # "module:Class" replacing ChatGoogleGenerativeAI
+    GOOGLE_API_ENDPOINT: str | None = os.getenv("GOOGLE_API_ENDPOINT") # Base URL overriding Calendar/Gmail API hosts
     
     # Database
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "postgres") # postgres | sqlite
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "./aura.db")
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "password")
     POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "db")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "aura")
+    POSTGRES_READ_SERVER: str | None = os.getenv("POSTGRES_READ_SERVER") # Optional read replica
+
+    # Connection pool (per engine, per worker)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")) # asyncpg prepared statements per connection; 0 behind pgbouncer
     
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
 
+    # Admission control for LLM-backed endpoints (per worker); excess requests get 429 + Retry-After
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_QUEUE_SIZE: int = int(os.getenv("LLM_QUEUE_SIZE", "32"))
+    LLM_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+    LLM_USER_RATE_PER_MINUTE: float = float(os.getenv("LLM_USER_RATE_PER_MINUTE", "20")) # 0 disables the per-user limit
+    LLM_USER_BURST: int = int(os.getenv("LLM_USER_BURST", "5"))
+
+    # Model cascade: cheap turns start on a smaller model than the active one (app/core/model_router.py)
+    MODEL_CASCADE_ENABLED: bool = os.getenv("MODEL_CASCADE_ENABLED", "true").lower() == "true"
+    MODEL_CASCADE_THRESHOLDS: str = os.getenv("MODEL_CASCADE_THRESHOLDS", "0.3,0.6") # Request score at which tiers 1 and 2 start
+    MODEL_CASCADE_MIN_SUCCESS: float = float(os.getenv("MODEL_CASCADE_MIN_SUCCESS", "0.7")) # Below this a tier is skipped
+    MODEL_CASCADE_EXPLORE_EVERY: int = int(os.getenv("MODEL_CASCADE_EXPLORE_EVERY", "20")) # ...except every Nth turn
+
+    # WebSocket chat (/api/v1/chat/ws)
+    WS_HEARTBEAT_SECONDS: float = float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+    WS_IDLE_TIMEOUT_SECONDS: float = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "600")) # No client frames for this long closes the socket
+    WS_MAX_PENDING_TURNS: int = int(os.getenv("WS_MAX_PENDING_TURNS", "4"))
+
+    # Responses at least this large are brotli/gzip compressed
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+    # Calendar
+    EVENT_CACHE_TTL_SECONDS: int = int(os.getenv("EVENT_CACHE_TTL_SECONDS", "60"))
+    EVENT_CACHE_MAX_ENTRIES: int = int(os.getenv("EVENT_CACHE_MAX_ENTRIES", "1024"))
+    # Identical concurrent reads share one call; results are then kept this long
+    CALENDAR_READ_CACHE_SECONDS: float = float(os.getenv("CALENDAR_READ_CACHE_SECONDS", "2"))
+    GOOGLE_SERVICE_CACHE_SECONDS: float = float(os.getenv("GOOGLE_SERVICE_CACHE_SECONDS", "30"))
+
+    # Settings (config.yaml) hot reload across workers
+    CONFIG_RELOAD_INTERVAL_SECONDS: float = float(os.getenv("CONFIG_RELOAD_INTERVAL_SECONDS", "1.0"))
+
+    # Thread deletion: threads with more messages are soft-deleted and purged in the background
+    THREAD_SOFT_DELETE_THRESHOLD: int = int(os.getenv("THREAD_SOFT_DELETE_THRESHOLD", "500"))
+    THREAD_PURGE_BATCH_SIZE: int = int(os.getenv("THREAD_PURGE_BATCH_SIZE", "1000"))
+    THREAD_PURGE_INTERVAL_SECONDS: float = float(os.getenv("THREAD_PURGE_INTERVAL_SECONDS", "300"))
+
+    # Long-term memory across a user's threads (app/services/memory.py)
+    MEMORY_ENABLED: bool = os.getenv("MEMORY_ENABLED", "true").lower() == "true"
+    MEMORY_DIR: str = os.getenv("MEMORY_DIR", "data/memory")
+    MEMORY_EMBEDDER: str = os.getenv("MEMORY_EMBEDDER", "hashing") # hashing, google or "module:Class"
+    MEMORY_DIM: int = int(os.getenv("MEMORY_DIM", "256")) # hashing embedder only
+    MEMORY_RECENT_MESSAGES: int = int(os.getenv("MEMORY_RECENT_MESSAGES", "12")) # Of the current thread, sent verbatim
+    MEMORY_TOP_K: int = int(os.getenv("MEMORY_TOP_K", "4"))
+    MEMORY_MIN_SCORE: float = float(os.getenv("MEMORY_MIN_SCORE", "0.25")) # Cosine similarity
+    MEMORY_SNIPPET_CHARS: int = int(os.getenv("MEMORY_SNIPPET_CHARS", "300"))
+    MEMORY_IVF_PROBES: int = int(os.getenv("MEMORY_IVF_PROBES", "8"))
+
+    # Speculative context prefetch during agent model calls (app/services/prefetch.py)
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_CALENDAR_DAYS: int = int(os.getenv("PREFETCH_CALENDAR_DAYS", "8")) # From the start of today (UTC)
+
+    # Logging (app/core/logs.py)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json") # json or text
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "") # e.g. "app.agents=0.1,app.api.endpoints=0.01"; DEBUG/INFO only
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000")) # Records beyond this are dropped, never waited on
+
+    # Health probes (/readyz)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "30"))
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "5"))
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,184 @@
+"""
+Admission control for LLM-backed endpoints (/chat, /agent/run).
+
+Each request can fan out into several Gemini calls and model x key retries,
+so a traffic spike becomes a 429 storm across every key. The controller
+bounds that per worker:
+
+- a per-user token bucket (steady rate plus a small burst);
+- a global limit on requests in flight;
+- a bounded FIFO queue of requests waiting for a slot, each with a deadline.
+
+Anything over those limits fails fast with AdmissionRejected, which main.py
+turns into 429 with a Retry-After header. Dropping part of a spike is
+cheaper than exhausting the key pool for everyone.
+
+State is per process: with N workers the effective global limit is N times
+LLM_MAX_CONCURRENCY. Everything runs on the event loop, so no locks.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from app.config import get_settings
+from app.core.metrics import ADMISSION_DECISIONS, ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_WAIT
+
+MAX_TRACKED_USERS = 10000  # Least recently seen buckets beyond this are dropped
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request rejected ({reason}); retry after {retry_after}s")
+        self.reason = reason  # "user_rate", "queue_full" or "queue_timeout"
+        self.retry_after = retry_after
+
+
+@dataclass
+class TokenBucket:
+    rate: float  # tokens per second
+    burst: float
+    tokens: float
+    updated: float
+
+    def take(self, now: float) -> float:
+        """Take a token. Returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int,
+        queue_size: int,
+        queue_timeout: float,
+        user_rate_per_minute: float,
+        user_burst: int
+    ):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.user_rate = user_rate_per_minute / 60
+        self.user_burst = user_burst
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._hold_avg = 1.0  # EWMA of seconds a request holds a slot, for Retry-After
+
+    @asynccontextmanager
+    async def slot(self, user: str):
+        """Hold one of the LLM slots for the duration of the block, or raise AdmissionRejected."""
+        self._check_user(user)
+        await self._acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - started
+            self._hold_avg = 0.9 * self._hold_avg + 0.1 * held
+            self._release()
+
+    def _reject(self, reason: str, retry_after: float):
+        ADMISSION_DECISIONS.labels(reason).inc()
+        raise AdmissionRejected(reason, max(1, math.ceil(retry_after)))
+
+    def _queue_retry_after(self) -> float:
+        # Roughly how long until the current queue drains
+        return self._hold_avg * (len(self._waiters) + 1) / self.max_concurrent
+
+    def _check_user(self, user: str):
+        if self.user_rate <= 0:
+            return
+        now = time.monotonic()
+        bucket = self._buckets.get(user)
+        if bucket is None:
+            bucket = TokenBucket(self.user_rate, self.user_burst, self.user_burst, now)
+            self._buckets[user] = bucket
+            if len(self._buckets) > MAX_TRACKED_USERS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user)
+        wait = bucket.take(now)
+        if wait:
+            self._reject("user_rate", wait)
+
+    async def _acquire(self):
+        if self._in_flight < self.max_concurrent and not self._waiters:
+            self._in_flight += 1
+            ADMISSION_IN_FLIGHT.inc()
+            ADMISSION_DECISIONS.labels("admitted").inc()
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full", self._queue_retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self._release()
+            elif waiter in self._waiters:
+                # _release() may already have popped it (it skips cancelled waiters)
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject("queue_timeout", self._queue_retry_after())
+        finally:
+            ADMISSION_QUEUE_WAIT.observe(time.monotonic() - started)
+        ADMISSION_DECISIONS.labels("admitted_after_wait").inc()
+
+    def _release(self):
+        # Hand the slot straight to the oldest waiter, so newcomers can't overtake the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+        ADMISSION_IN_FLIGHT.dec()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrent": self.max_concurrent,
+            "queued": len(self._waiters),
+            "queue_size": self.queue_size,
+            "tracked_users": len(self._buckets),
+            "avg_hold_seconds": round(self._hold_avg, 3),
+        }
+
+
+def client_key(user_email: Optional[str], request) -> str:
+    """Bucket key for a request: the user's email, else the client address."""
+    if user_email:
+        return user_email
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        settings = get_settings()
+        _controller = AdmissionController(
+            max_concurrent=settings.LLM_MAX_CONCURRENCY,
+            queue_size=settings.LLM_QUEUE_SIZE,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+            user_rate_per_minute=settings.LLM_USER_RATE_PER_MINUTE,
+            user_burst=settings.LLM_USER_BURST
+        )
+    return _controller
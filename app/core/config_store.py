@@ -0,0 +1,199 @@
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+FileSignature = Optional[Tuple[int, int, int]]
+
+
+
+def file_signature(path: Path) -> FileSignature:
+    """(inode, size, mtime_ns): changes whenever the file is replaced or rewritten."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Exclusive flock on `<path>.lock`, held by whichever worker is doing a
+    read-modify-write of `path`. A separate file, since `path` itself is
+    replaced on every write.
+    """
+    with open(path.with_name(path.name + ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_yaml(path: Path) -> Tuple[Dict[str, Any], str]:
+    """The file's data and a digest of its bytes."""
+    raw = path.read_bytes()
+    return yaml.safe_load(raw) or {}, hashlib.sha256(raw).hexdigest()
+
+
+def write_yaml_atomic(path: Path, data: Dict[str, Any]) -> str:
+    """Write to a temp file in the same directory, fsync, then rename over `path`. Returns the digest."""
+    text = yaml.dump(data, sort_keys=False, indent=2)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ConfigWriter:
+    """
+    Applies changes to a file from one background thread, in batches.
+
+    `submit()` queues a change and returns a Future right away, so request
+    handlers never write the file themselves. The thread takes everything
+    queued so far and, under file_lock, hands the batch to `commit`, which
+    re-reads the file, applies the changes on top of it and returns the data
+    to write (or None). One write then covers the batch, so a burst of
+    updates costs one fsync'd write, not one each; changes queued while a
+    write is in progress go into the next one. Each change's Future gets the
+    result (or the exception) `commit` returned for it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        commit: Callable[[List[Any]], Tuple[Optional[Dict[str, Any]], List[Any]]],
+        on_written: Optional[Callable[[FileSignature, str], None]] = None
+    ):
+        self.path = path
+        self.commit = commit
+        self.on_written = on_written
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Any, Future]] = []
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, change: Any) -> Future:
+        """Queue `change` for the next batch; the Future resolves once it is on disk."""
+        future: Future = Future()
+        with self._cond:
+            self._pending.append((change, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                batch, self._pending = self._pending, []
+                self._busy = True
+
+            try:
+                with file_lock(self.path):
+                    data, results = self.commit([change for change, _ in batch])
+                    if data is not None:
+                        digest = write_yaml_atomic(self.path, data)
+                        if self.on_written:
+                            self.on_written(file_signature(self.path), digest)
+                        logger.info(f"Settings saved to {self.path} (version {data.get('config_version')}, {len(batch)} changes)")
+                for (_, future), result in zip(batch, results):
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+            except Exception as e:
+                logger.error(f"Failed to save {self.path}: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+class ConfigWatcher:
+    """
+    Polls a file's stat signature from a background thread and calls
+    `on_change` when someone else (another worker) has rewritten it.
+    A stat per interval is all it costs while nothing changes.
+    """
+
+    def __init__(self, path: Path, on_change: Callable[[], None], interval_seconds: float = 1.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval_seconds = interval_seconds
+        self._known: FileSignature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def mark_known(self, signature: FileSignature):
+        """Record a state of the file we already have in memory (our own load or write)."""
+        with self._lock:
+            self._known = signature
+
+    def poll(self):
+        signature = file_signature(self.path)
+        with self._lock:
+            if signature is None or signature == self._known:
+                return
+            self._known = signature
+        self.on_change()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Config watcher failed: {e}")
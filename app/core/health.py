@@ -0,0 +1,149 @@
+"""
+Background dependency probing for /healthz and /readyz.
+
+Startup no longer waits on the database or the model provider: the lifespan
+starts a HealthMonitor that probes each dependency periodically, caching the
+last result. Readiness requests only read the cache. The schema is managed
+by Alembic (`alembic upgrade head`), not at startup.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.core.settings_manager import get_settings_manager
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    status: str  # "ok", "fail", "skipped" or "pending"
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None  # unix time
+    detail: str = ""
+
+
+async def probe_database():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def probe_model():
+    """
+    Fetch the active model's metadata. Proves the key and model id are valid
+    without generating tokens, so it costs no quota.
+    """
+    if get_settings().CHAT_MODEL_CLASS:
+        raise LookupError("Custom chat model class configured")
+
+    settings_manager = get_settings_manager()
+    api_key = settings_manager.get_active_key()
+    if not api_key:
+        raise LookupError("No API key configured")
+
+    model_id = settings_manager.get_active_model_resolved_id()
+    if not model_id.startswith("models/"):
+        model_id = f"models/{model_id}"
+
+    async with httpx.AsyncClient(timeout=get_settings().HEALTH_PROBE_TIMEOUT_SECONDS) as client:
+        response = await client.get(f"{GEMINI_API_BASE}/{model_id}", headers={"x-goog-api-key": api_key})
+    if response.status_code != 200:
+        raise RuntimeError(f"{model_id}: HTTP {response.status_code}")
+
+
+class HealthMonitor:
+    """
+    Runs every probe concurrently each `interval_seconds` and keeps the latest
+    results. `database` gates readiness; `model` is informational, since a
+    provider outage shouldn't take the whole API out of rotation.
+    """
+
+    REQUIRED = ("database",)
+
+    def __init__(self, interval_seconds: float = 30.0, timeout_seconds: float = 5.0):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.probes: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "database": probe_database,
+            "model": probe_model,
+        }
+        self.results: Dict[str, ProbeResult] = {name: ProbeResult("pending") for name in self.probes}
+        self.started_at = time.time()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return all(self.results[name].status == "ok" for name in self.REQUIRED)
+
+    async def _run_probe(self, name: str, probe: Callable[[], Awaitable[Any]]):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), self.timeout_seconds)
+            status, detail = "ok", ""
+        except LookupError as e:
+            status, detail = "skipped", str(e)
+        except asyncio.TimeoutError:
+            status, detail = "fail", f"timed out after {self.timeout_seconds}s"
+        except Exception as e:
+            status, detail = "fail", f"{type(e).__name__}: {e}"
+
+        previous = self.results.get(name)
+        if previous and previous.status != status:
+            log = logger.info if status == "ok" else logger.warning
+            log(f"Health probe '{name}': {previous.status} -> {status} {detail}".rstrip())
+
+        self.results[name] = ProbeResult(
+            status=status,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            checked_at=time.time(),
+            detail=detail
+        )
+
+    async def check_all(self):
+        await asyncio.gather(*(self._run_probe(name, probe) for name, probe in self.probes.items()))
+
+    async def _loop(self):
+        while True:
+            await self.check_all()
+            # Retry sooner while not ready, so a slow database doesn't delay readiness by a full interval
+            await asyncio.sleep(self.interval_seconds if self.ready else min(self.interval_seconds, 2.0))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="health-monitor")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "not_ready",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "checks": {name: asdict(result) for name, result in self.results.items()},
+        }
+
+
+_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    global _monitor
+    if _monitor is None:
+        settings = get_settings()
+        _monitor = HealthMonitor(settings.HEALTH_PROBE_INTERVAL_SECONDS, settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+    return _monitor
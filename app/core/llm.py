@@ -0,0 +1,57 @@
+"""
+Single place where chat models are constructed.
+
+Production always gets ChatGoogleGenerativeAI. Setting CHAT_MODEL_CLASS to
+"module:Class" swaps in any class with the same constructor arguments, which
+is how the offline load harness (benchmarks/harness/fake_llm.py) runs the
+agents without Gemini quota.
+"""
+import asyncio
+import importlib
+from functools import lru_cache
+
+from app.config import get_settings
+
+
+@lru_cache(maxsize=None)
+def _load_class(path: str):
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def chat_model_class():
+    path = get_settings().CHAT_MODEL_CLASS
+    if path:
+        return _load_class(path)
+    from langchain_google_genai import ChatGoogleGenerativeAI # Heavy; imported on first use
+    return ChatGoogleGenerativeAI
+
+
+def classify_error(e: BaseException) -> str:
+    if isinstance(e, asyncio.TimeoutError):
+        return "timeout"
+    text = f"{type(e).__name__} {e}".lower()
+    if "429" in text or "resource_exhausted" in text or "quota" in text:
+        return "quota"
+    if "401" in text or "403" in text or "api key not valid" in text or "permission" in text:
+        return "auth"
+    if "404" in text or "not_found" in text or "not found" in text:
+        return "not_found"
+    if "500" in text or "503" in text or "unavailable" in text:
+        return "server"
+    return "other"
+
+
+def get_chat_model(**kwargs):
+    """
+    Build the configured chat model; accepts ChatGoogleGenerativeAI's arguments.
+    Calls are recorded in the LLM metrics, labelled with the model and the
+    settings id of the API key (never the key itself).
+    """
+    from app.core.metrics import llm_metrics_handler
+    from app.core.settings_manager import get_settings_manager
+
+    key_id = get_settings_manager().get_snapshot().key_ids.get(kwargs.get("google_api_key"), "env")
+    handler = llm_metrics_handler(kwargs.get("model", "unknown"), key_id)
+    kwargs["callbacks"] = [*(kwargs.get("callbacks") or []), handler]
+    return chat_model_class()(**kwargs)
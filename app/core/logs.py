@@ -0,0 +1,198 @@
+"""
+Central logging setup: non-blocking, structured, sampled.
+
+configure_logging() (called once from app.main) replaces whatever handlers
+the root and uvicorn loggers had with a single QueueHandler. Emitting a
+record only filters it and puts it on a bounded in-memory queue; a
+QueueListener thread formats and writes it to stdout. If the queue is full
+(stdout stalled, log storm) records are dropped and counted rather than
+blocking the event loop.
+
+Records carry the request id (X-Request-ID, set by RequestContextMiddleware)
+and the chat thread id (bind_thread_id) from context variables, and are
+written as one JSON object per line (LOG_FORMAT=json) or as plain text.
+
+LOG_SAMPLING keeps only a fraction of a chatty logger's DEBUG/INFO records,
+e.g. "app.agents=0.1,app.api.endpoints=0.01". Warnings and errors are never
+sampled. A prefix also covers its child loggers.
+"""
+import atexit
+import contextvars
+import logging
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+import orjson
+
+from app.config import get_settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+thread_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("thread_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+def bind_thread_id(thread_id: Optional[str]):
+    """Tag this request's (or task's) further log records with a chat thread id."""
+    thread_id_var.set(thread_id)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the context ids onto the record; runs in the emitting task, before the queue."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.thread_id = thread_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix first, so "app.agents.scribe" wins over "app.agents"
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return random.random() < rate
+        return True
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in spec.split(","):
+        name, _, rate = part.strip().partition("=")
+        if name and rate:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: a full queue drops the record."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (args may not survive the
+        # thread hop), but leave the formatting itself to the listener
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "thread_id", None):
+            entry["thread_id"] = record.thread_id
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and key not in ("request_id", "thread_id"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(context)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        ids = [f"{k}={v}" for k in ("request_id", "thread_id") if (v := getattr(record, k, None))]
+        record.context = f" [{' '.join(ids)}]" if ids else ""
+        return super().format(record)
+
+
+def configure_logging():
+    """Install the queue pipeline on the root and uvicorn loggers. Safe to call twice."""
+    global _listener
+    if _listener is not None:
+        return
+    settings = get_settings()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    handler.addFilter(ContextFilter())
+    sampling = parse_sampling(settings.LOG_SAMPLING)
+    if sampling:
+        handler.addFilter(SamplingFilter(sampling))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # uvicorn installs its own (blocking) stream handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware giving every HTTP request and WebSocket an id:
+    the caller's X-Request-ID if sent, else a new one. It is bound for
+    logging and echoed back on HTTP responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        request_token = request_id_var.set(request_id)
+        thread_token = thread_id_var.set(None)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(request_token)
+            thread_id_var.reset(thread_token)
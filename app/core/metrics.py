@@ -0,0 +1,248 @@
+"""
+Prometheus metrics. Everything is recorded from middleware, SQLAlchemy
+events, LangChain callbacks and the googleapiclient request class, so call
+sites stay free of timing code. Scraped at GET /metrics.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory so /metrics aggregates across processes.
+"""
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict
+from uuid import UUID
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Buckets: fast local work (DB, pool) vs. network calls (Google, LLM)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+HTTP_LATENCY = Histogram(
+    "aura_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=SLOW_BUCKETS
+)
+LLM_LATENCY = Histogram(
+    "aura_llm_call_duration_seconds", "Chat model call latency",
+    ["model", "key_id", "outcome"], buckets=SLOW_BUCKETS
+)
+LLM_TOKENS = Counter("aura_llm_tokens_total", "Tokens reported by the model", ["model", "direction"])
+LLM_FALLBACKS = Counter(
+    "aura_llm_fallbacks_total", "Model/key attempts abandoned for the next candidate in agent_node",
+    ["model", "key_id", "reason"]
+)
+MODEL_ROUTES = Counter(
+    "aura_model_routes_total", "Cascade outcomes per model: ok, error, or the reason a turn escalated",
+    ["model", "outcome"]
+)
+GOOGLE_API_LATENCY = Histogram(
+    "aura_google_api_call_duration_seconds", "Google API call latency by API method",
+    ["method", "outcome"], buckets=SLOW_BUCKETS
+)
+DB_QUERY_LATENCY = Histogram(
+    "aura_db_query_duration_seconds", "Database statement latency", ["engine", "operation"], buckets=FAST_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    "aura_db_pool_wait_seconds", "Time to check a connection out of the pool", ["engine"], buckets=FAST_BUCKETS
+)
+CACHE_REQUESTS = Counter("aura_cache_requests_total", "Cache lookups by result", ["cache", "result"])
+ADMISSION_DECISIONS = Counter(
+    "aura_admission_decisions_total", "LLM endpoint admissions and rejections by reason", ["result"]
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "aura_admission_in_flight", "LLM-backed requests holding a slot", multiprocess_mode="livesum"
+)
+WS_SESSIONS = Gauge("aura_ws_chat_sessions", "Open WebSocket chat sessions", multiprocess_mode="livesum")
+ADMISSION_QUEUE_WAIT = Histogram(
+    "aura_admission_queue_wait_seconds", "Time LLM-backed requests spent queued for a slot", buckets=SLOW_BUCKETS
+)
+MEMORY_SEARCH_LATENCY = Histogram(
+    "aura_memory_search_seconds", "Long-term memory vector search time", buckets=(0.0001, 0.00025,) + FAST_BUCKETS
+)
+PREFETCH_RESULTS = Counter(
+    "aura_prefetch_total", "Speculative context prefetches by kind and result: hit, miss, failed, wasted",
+    ["kind", "result"]
+)
+LOG_RECORDS_DROPPED = Counter("aura_log_records_dropped_total", "Log records dropped because the log queue was full")
+
+
+# HTTP
+
+def _route_template(scope) -> str:
+    # Newer FastAPI resolves included routers lazily: scope["route"] then holds
+    # the path relative to its router, and the full template lives in the
+    # effective route context
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every request under its route template
+    (/api/v1/threads/{thread_id}), never the raw path, to keep label
+    cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_LATENCY.labels(scope["method"], _route_template(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+
+# LLM
+
+@lru_cache(maxsize=1)
+def _llm_handler_class():
+    # langchain_core is only imported once a model is built (see app/core/llm.py)
+    from langchain_core.callbacks import BaseCallbackHandler
+    from app.core.llm import classify_error
+
+    class LLMMetricsHandler(BaseCallbackHandler):
+        """LangChain callback recording latency, outcome and token usage of each model call."""
+
+        run_inline = True  # Record on the calling thread/loop instead of an executor
+
+        def __init__(self, model: str, key_id: str):
+            self.model = model
+            self.key_id = key_id
+            self._started: Dict[UUID, float] = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+            self._observe(run_id, "ok")
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        LLM_TOKENS.labels(self.model, "input").inc(usage.get("input_tokens", 0))
+                        LLM_TOKENS.labels(self.model, "output").inc(usage.get("output_tokens", 0))
+
+        def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+            self._observe(run_id, classify_error(error))
+
+        def _observe(self, run_id: UUID, outcome: str):
+            started = self._started.pop(run_id, None)
+            if started is not None:
+                LLM_LATENCY.labels(self.model, self.key_id, outcome).observe(time.perf_counter() - started)
+
+    return LLMMetricsHandler
+
+
+def llm_metrics_handler(model: str, key_id: str):
+    return _llm_handler_class()(model, key_id)
+
+
+# Google APIs
+
+@lru_cache(maxsize=1)
+def google_request_class():
+    """HttpRequest subclass for googleapiclient's `requestBuilder`, timing each execute()."""
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import HttpRequest
+
+    class TimedHttpRequest(HttpRequest):
+        def execute(self, *args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = super().execute(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except HttpError as e:
+                outcome = str(e.resp.status)
+                raise
+            finally:
+                GOOGLE_API_LATENCY.labels(self.methodId or "unknown", outcome).observe(time.perf_counter() - started)
+
+    return TimedHttpRequest
+
+
+# Database
+
+def instrument_engine(engine, name: str):
+    """Time every statement run through `engine` (an AsyncEngine)."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_LATENCY.labels(name, operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(context):
+        # The statement failed; drop its start time so the stack stays balanced
+        stack = context.connection.info.get("query_started") if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+
+class PoolCollector:
+    """Pool gauges read at scrape time from app.database.pool_stats()."""
+
+    def _families(self):
+        return {
+            "checked_out": GaugeMetricFamily("aura_db_pool_checked_out", "Connections in use", labels=["engine"]),
+            "overflow": GaugeMetricFamily("aura_db_pool_overflow", "Overflow connections open", labels=["engine"]),
+            "size": GaugeMetricFamily("aura_db_pool_size", "Configured pool size", labels=["engine"]),
+        }
+
+    def describe(self):
+        # Lets the registry check names without calling collect() (app.database may still be importing)
+        return list(self._families().values())
+
+    def collect(self):
+        from app.database import pool_stats
+
+        gauges = self._families()
+        for engine_name, stats in pool_stats().items():
+            if stats is None:
+                continue
+            for key, gauge in gauges.items():
+                gauge.add_metric([engine_name], stats[key])
+        yield from gauges.values()
+
+
+REGISTRY.register(PoolCollector())
+
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
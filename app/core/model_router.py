@@ -0,0 +1,234 @@
+"""
+Cascade routing: the smallest adequate model for each chat turn.
+
+Every turn used to go to the active model. Most turns are short scheduling
+commands ("move my 3pm to Friday") that a lite model handles as well, faster
+and cheaper. The router scores the turn from cheap features of the request
+(length, reasoning/drafting vocabulary, number of asks, thread depth,
+whether it reads like a tool command) and starts the turn on the smallest
+configured model of the matching tier. Models are never placed above the
+active model: it is the ceiling, not the default.
+
+A rung below the top is only trusted if its reply validates: tool calls
+must name a bound tool with arguments that fit it, and a text reply must be
+non-empty and not a hedge ("I'm not sure", "I can't help with that").
+Otherwise the turn escalates to the next rung. Validation happens before
+any tool runs, so escalating never repeats a side effect.
+
+Per-model outcomes (success, escalation reason, latency) are kept in this
+worker for /api/v1/debug/cascade and in aura_model_routes_total; each
+decision is also logged with its features. A tier whose recent success rate
+falls below MODEL_CASCADE_MIN_SUCCESS is skipped, except for every
+MODEL_CASCADE_EXPLORE_EVERY-th turn, so it is tried again once it recovers.
+
+Model calls are tagged ATTEMPT_TAG_PREFIX + attempt number. Text streamed
+by a rung that is then rejected has already reached the client; when the
+tag changes mid-turn, ChatSession tells the client to discard it.
+
+Tiers: 0 lite, 1 standard, 2 large. ModelConfig.tier sets one explicitly;
+otherwise it is inferred from the model id ("lite"/"8b" -> 0, "pro"/"ultra" -> 2).
+"""
+import inspect
+import itertools
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import get_settings
+from app.core.metrics import MODEL_ROUTES
+
+logger = logging.getLogger(__name__)
+
+TIER_NAMES = ("lite", "standard", "large")
+EWMA_ALPHA = 0.05  # ~the last 20 turns
+# Callback tag on each (model, key) attempt of a turn, so streaming consumers can
+# tell when output starts over after an escalation or fallback
+ATTEMPT_TAG_PREFIX = "cascade_attempt:"
+
+# Lookbehinds: "gemini" must not read as "mini"
+_LITE = re.compile(r"lite|nano|-8b\b|(?<![a-z])mini\b")
+_LARGE = re.compile(r"(?<![a-z])pro\b|ultra|opus|large")
+_REASONING = re.compile(
+    r"\b(why|explain|compare|plan|strateg\w*|analy[sz]\w*|summari[sz]\w*|draft|write|rewrite|"
+    r"prioriti[sz]\w*|trade-?offs?|pros and cons|step by step|reflect|advise|recommend)\b",
+    re.IGNORECASE,
+)
+_COMMAND = re.compile(
+    r"\b(schedule|book|move|reschedule|cancel|remind|add|create|delete|remove|list|show|"
+    r"mark|complete|meeting|event|calendar|tasks?|to-?dos?|today|tomorrow|tonight|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|\d{1,2}(:\d{2})?\s?(am|pm))\b",
+    re.IGNORECASE,
+)
+_HEDGE = re.compile(
+    r"\b(i'?m not (sure|certain)|i am not (sure|certain)|i (can ?not|can'?t|am unable to|'m unable to) "
+    r"(help|do|determine|answer|complete)|i don'?t (know|have enough))\b",
+    re.IGNORECASE,
+)
+
+
+def model_tier(model_id: str, tier: Optional[int] = None) -> int:
+    if tier is not None:
+        return max(0, min(tier, len(TIER_NAMES) - 1))
+    name = model_id.lower()
+    if _LITE.search(name):
+        return 0
+    if _LARGE.search(name):
+        return 2
+    return 1
+
+
+@dataclass
+class RequestFeatures:
+    chars: int
+    thread_depth: int
+    asks: int
+    reasoning_terms: int
+    command_like: bool
+    score: float
+
+
+def extract_features(messages: Sequence[Any]) -> RequestFeatures:
+    """Features of the latest user message (plus the thread's length); no model calls."""
+    text = next((m.content for m in reversed(messages) if getattr(m, "type", "") == "human"), "")
+    if not isinstance(text, str):
+        text = str(text)
+    chars = len(text)
+    asks = text.count("?") + len(re.findall(r"[.!;\n]\s*(?:and |also |then )", text, re.IGNORECASE))
+    reasoning = len(_REASONING.findall(text))
+    command_like = bool(_COMMAND.search(text)) and chars <= 160 and reasoning == 0
+
+    score = 0.45 * min(chars / 600, 1.0)
+    score += 0.2 * min(len(messages) / 20, 1.0)
+    score += min(0.25 * reasoning, 0.45)
+    score += min(0.1 * max(asks - 1, 0), 0.2)
+    if command_like:
+        score -= 0.15
+    return RequestFeatures(chars, len(messages), asks, reasoning, command_like, round(max(score, 0.0), 3))
+
+
+def validate_response(response: Any, tools: Dict[str, Callable]) -> Optional[str]:
+    """Why a lower-rung reply should be escalated, or None if it can stand."""
+    if response.tool_calls:
+        for call in response.tool_calls:
+            tool = tools.get(call["name"])
+            if tool is None:
+                return "unknown_tool"
+            try:
+                inspect.signature(tool).bind(**(call.get("args") or {}))
+            except TypeError:
+                return "bad_tool_args"
+        return None
+    text = response.content if isinstance(response.content, str) else response.text()
+    if not text.strip():
+        return "empty"
+    if _HEDGE.search(text):
+        return "low_confidence"
+    return None
+
+
+@dataclass
+class ModelStats:
+    turns: int = 0
+    successes: int = 0
+    escalations: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+    success_rate: float = 1.0  # EWMA over adequacy outcomes (not transport errors)
+    latency_ms: Optional[float] = None  # EWMA of successful calls
+
+
+@dataclass
+class RouteDecision:
+    features: RequestFeatures
+    tier: int
+    ladder: List[str]
+
+
+class ModelRouter:
+    def __init__(self, enabled: bool, thresholds: Sequence[float], min_success: float, explore_every: int):
+        self.enabled = enabled
+        self.thresholds = tuple(thresholds)
+        self.min_success = min_success
+        self.explore_every = explore_every
+        self._stats: Dict[str, ModelStats] = {}
+        self._turns = itertools.count(1)
+
+    def _tier_for(self, score: float) -> int:
+        return min(sum(score >= t for t in self.thresholds), len(TIER_NAMES) - 1)
+
+    def rungs(self, snapshot) -> List[Tuple[int, str]]:
+        """(tier, model id): one model per tier up to the active model's tier, cheapest first."""
+        active = snapshot.active_model_resolved_id
+        active_config = next((m for m in snapshot.config.models if m.model_id == active), None)
+        ceiling = model_tier(active, getattr(active_config, "tier", None))
+        by_tier = {ceiling: active}
+        if self.enabled:
+            for m in snapshot.config.models:
+                tier = model_tier(m.model_id, m.tier)
+                if tier < ceiling:
+                    by_tier.setdefault(tier, m.model_id)
+        return sorted(by_tier.items())
+
+    def route(self, messages: Sequence[Any], snapshot) -> RouteDecision:
+        features = extract_features(messages)
+        rungs = self.rungs(snapshot)
+        tier = self._tier_for(features.score)
+
+        start = 0
+        while start < len(rungs) - 1 and rungs[start][0] < tier:
+            start += 1
+        # Skip rungs that have been failing lately, but keep sampling them
+        exploring = self.explore_every > 0 and next(self._turns) % self.explore_every == 0
+        while not exploring and start < len(rungs) - 1 and self.stats_for(rungs[start][1]).success_rate < self.min_success:
+            start += 1
+
+        decision = RouteDecision(features, tier, [model for _, model in rungs[start:]])
+        logger.info(
+            f"Routed to {decision.ladder[0]}",
+            extra={"route": {"tier": TIER_NAMES[tier], "ladder": decision.ladder, **asdict(features)}},
+        )
+        return decision
+
+    def stats_for(self, model: str) -> ModelStats:
+        return self._stats.setdefault(model, ModelStats())
+
+    def record(self, model: str, outcome: str, latency: float):
+        """outcome: "ok", "error" (transport/quota; says nothing about adequacy) or an escalation reason."""
+        stats = self.stats_for(model)
+        stats.turns += 1
+        if outcome == "error":
+            stats.errors += 1
+        else:
+            ok = outcome == "ok"
+            stats.success_rate += EWMA_ALPHA * ((1.0 if ok else 0.0) - stats.success_rate)
+            if ok:
+                stats.successes += 1
+                ms = latency * 1000
+                stats.latency_ms = ms if stats.latency_ms is None else stats.latency_ms + EWMA_ALPHA * (ms - stats.latency_ms)
+            else:
+                stats.escalations[outcome] = stats.escalations.get(outcome, 0) + 1
+        MODEL_ROUTES.labels(model, outcome).inc()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "thresholds": list(self.thresholds),
+            "min_success": self.min_success,
+            "models": {model: asdict(s) for model, s in self._stats.items()},
+        }
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    global _router
+    if _router is None:
+        settings = get_settings()
+        _router = ModelRouter(
+            enabled=settings.MODEL_CASCADE_ENABLED,
+            thresholds=[float(t) for t in settings.MODEL_CASCADE_THRESHOLDS.split(",")],
+            min_success=settings.MODEL_CASCADE_MIN_SUCCESS,
+            explore_every=settings.MODEL_CASCADE_EXPLORE_EVERY,
+        )
+    return _router
@@ -0,0 +1,150 @@
+"""
+Fast path for large JSON responses.
+
+- FastJSONResponse serializes with orjson. Routes return it directly when
+  they already hold plain data (trusted DB rows, Google payloads), which
+  also skips response_model validation.
+- json_with_etag/not_modified implement ETag + If-None-Match, so a client
+  re-polling an unchanged thread or event window gets a bodyless 304.
+- CompressionMiddleware brotli- or gzip-compresses buffered responses
+  above a size threshold.
+
+Routes with a response_model and no custom response class are already
+serialized by Pydantic straight to bytes; leave those alone.
+"""
+import gzip
+import hashlib
+from typing import Any, Optional
+
+import brotli
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+# Matches Pydantic's output for UTC datetimes ("...Z")
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+BROTLI_QUALITY = 4  # 11 is the default and far too slow per request
+GZIP_LEVEL = 5
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def make_etag(data: bytes) -> str:
+    # Weak: the same JSON is served gzip-, brotli- or un-encoded
+    return f'W/"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires
+    return etag.removeprefix("W/") in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def json_with_etag(request: Request, content: Any, etag: Optional[str] = None) -> Response:
+    """
+    FastJSONResponse carrying an ETag (a hash of the body unless given), or
+    a 304 when the client's If-None-Match already has it. no-cache makes
+    browsers revalidate instead of reusing a stale copy.
+    """
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    response = FastJSONResponse(content)
+    etag = etag or make_etag(response.body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _accepted_encoding(accept_encoding: str) -> Optional[str]:
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    for encoding in ("br", "gzip"):
+        if offered.get(encoding, 0) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing single-chunk responses of at least
+    `minimum_size` bytes with brotli (preferred) or gzip. Streamed
+    responses (chunked bodies, SSE) pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        encoding = _accepted_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                start = message  # Held until we know the body
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            response_headers = dict(start.get("headers", []))
+            content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in response_headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                return await send(message)
+
+            if encoding == "br":
+                compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+            else:
+                compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            raw = [(k, v) for k, v in start.get("headers", []) if k not in (b"content-length", b"vary")]
+            vary = response_headers.get(b"vary")
+            raw += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
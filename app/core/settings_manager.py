@@ -1,14 +1,25 @@
 
-import yaml
+import asyncio
+import copy
 import logging
+import threading
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, TypeAdapter
+from typing import Callable, List, Optional, Dict, Any, Sequence, Tuple, Union
+from app.config import get_settings
+from app.core.config_store import ConfigWriter, ConfigWatcher, file_signature, read_yaml
 
 logger = logging.getLogger(__name__)
 
 CONFIG_FILE = Path("config.yaml")
 
+DEFAULT_USER_PREFERENCES = {
+    "name": "User",
+    "theme": "dark",
+    "gym_schedule": "Mon, Wed, Fri at 7:00 AM" # Default example
+}
+
 class ModelConfig(BaseModel):
     id: str
     name: str
@@ -16,6 +27,7 @@ class ModelConfig(BaseModel):
     model_id: str = "models/gemini-1.5-flash"
     context_window: int = 1000000
     description: str = ""
+    tier: Optional[int] = None # Cascade tier: 0 lite, 1 standard, 2 large; inferred from model_id when unset
 
 class ApiKeyConfig(BaseModel):
     id: str
@@ -28,136 +40,286 @@ class AppConfig(BaseModel):
     active_model_id: str = "gemini-1.5-flash"
     active_api_key_id: Optional[str] = None
     system_instruction: str = "You are Aura."
-    
+
     api_keys: List[ApiKeyConfig] = []
     models: List[ModelConfig] = []
-    
+
     class Config:
-        frozen = False
+        # Shared by every request in the worker; changes build a new instance
+        frozen = True
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Everything a worker knows about the settings at one version. Snapshots are
+    never mutated: updates (local or from another worker) build a new one and
+    swap the reference, so readers need no locking.
+
+    Lookups the request path needs are precomputed once per version, so
+    resolving the active model or key never scans the lists.
+    """
+    version: int
+    config: AppConfig
+    raw_yaml: Dict[str, Any] # Full file contents, including sections we don't model; read-only
+
+    models_by_id: Dict[str, ModelConfig] = field(default_factory=dict)
+    keys_by_id: Dict[str, ApiKeyConfig] = field(default_factory=dict)
+    key_ids: Dict[str, str] = field(default_factory=dict) # Key value -> id, for labelling metrics
+    active_model_resolved_id: str = ""
+    active_key: Optional[str] = None
+    key_candidates: Tuple[str, ...] = () # Active key first, then the rest, without duplicates
+
+    @classmethod
+    def build(cls, version: int, config: AppConfig, raw_yaml: Dict[str, Any]) -> "ConfigSnapshot":
+        models_by_id = {m.id: m for m in config.models}
+        keys_by_id = {k.id: k for k in config.api_keys}
+
+        active_model = models_by_id.get(config.active_model_id)
+        # Fallback: Assume the active ID is the direct model ID if not found in list
+        resolved = active_model.model_id if active_model else config.active_model_id
+
+        active_key = None
+        if config.active_api_key_id and config.active_api_key_id in keys_by_id:
+            active_key = keys_by_id[config.active_api_key_id].key
+        elif config.api_keys:
+            active_key = config.api_keys[0].key
+
+        candidates = [active_key] if active_key else []
+        candidates.extend(k.key for k in config.api_keys if k.key != active_key)
+
+        return cls(
+            version=version,
+            config=config,
+            raw_yaml=raw_yaml,
+            models_by_id=models_by_id,
+            keys_by_id=keys_by_id,
+            key_ids={k.key: k.id for k in config.api_keys},
+            active_model_resolved_id=resolved,
+            active_key=active_key,
+            key_candidates=tuple(dict.fromkeys(candidates))
+        )
+
+# Per-field validators, so an update only re-validates the fields it touches
+_FIELD_ADAPTERS = {name: TypeAdapter(f.annotation) for name, f in AppConfig.model_fields.items()}
+
+def apply_updates(config: AppConfig, updates: Dict[str, Any]) -> AppConfig:
+    """
+    Return a copy of `config` with `updates` applied. Unknown keys are ignored
+    (as AppConfig(**data) did); already-built ModelConfig/ApiKeyConfig items
+    pass through validation without being rebuilt.
+    """
+    validated = {
+        name: _FIELD_ADAPTERS[name].validate_python(value)
+        for name, value in updates.items()
+        if name in _FIELD_ADAPTERS
+    }
+    return config.model_copy(update=validated)
+
+def _config_from_yaml(data: Dict[str, Any]) -> AppConfig:
+    # Map YAML structure to AppConfig Flat Structure
+    active = data.get("active_settings", {})
+
+    config_dict = {
+        "api_keys": data.get("api_keys", []),
+        "models": data.get("models", []),
+        "active_model_id": active.get("active_model_id", "gemini-1.5-flash"),
+        "active_api_key_id": active.get("active_api_key_id"),
+        "system_instruction": active.get("system_prompt", "")
+    }
+    return AppConfig(**config_dict)
+
+def _yaml_for(snapshot: ConfigSnapshot) -> Dict[str, Any]:
+    """The file contents for `snapshot`, preserving sections we don't model."""
+    current = snapshot.config.model_dump()
+
+    # Update specific sections on a copy; the snapshot's dict stays untouched
+    raw_yaml = copy.deepcopy(snapshot.raw_yaml)
+    if "active_settings" not in raw_yaml:
+        raw_yaml["active_settings"] = {}
+
+    raw_yaml["config_version"] = snapshot.version
+    raw_yaml["api_keys"] = current["api_keys"]
+    raw_yaml["models"] = current["models"]
+    raw_yaml["active_settings"]["active_model_id"] = current["active_model_id"]
+    raw_yaml["active_settings"]["active_api_key_id"] = current["active_api_key_id"]
+    raw_yaml["active_settings"]["system_prompt"] = current["system_instruction"]
+
+    # Note: user_preferences and other top-level keys in raw_yaml remain untouched!
+    return raw_yaml
 
 class SettingsManager:
     _instance = None
-    _config: AppConfig = AppConfig()
-    _raw_yaml: Dict[str, Any] = {} # Preservation storage
+    _snapshot: ConfigSnapshot = ConfigSnapshot.build(0, AppConfig(), {})
+    _digest: Optional[str] = None # Of the config.yaml bytes the snapshot came from (or we wrote)
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(SettingsManager, cls).__new__(cls)
+            # Serializes snapshot swaps in this process; file_lock does it across workers
+            cls._instance._lock = threading.RLock()
+            cls._instance._watcher = ConfigWatcher(
+                CONFIG_FILE, cls._instance._reload_if_changed, get_settings().CONFIG_RELOAD_INTERVAL_SECONDS
+            )
+            cls._instance._writer = ConfigWriter(CONFIG_FILE, cls._instance._commit, on_written=cls._instance._on_written)
             cls._instance.load()
         return cls._instance
 
+    @property
+    def version(self) -> int:
+        """Version of the active snapshot; shared across workers through config.yaml."""
+        return self._snapshot.version
+
+    @property
+    def _config(self) -> AppConfig:
+        return self._snapshot.config
+
     def load(self):
         """Load settings from config.yaml"""
         if CONFIG_FILE.exists():
             try:
-                with open(CONFIG_FILE, "r") as f:
-                    data = yaml.safe_load(f) or {}
-                    
-                    if not data:
-                        logger.info("config.yaml is empty. Populating defaults.")
-                        self._config = AppConfig()
-                        self._raw_yaml = {
-                            "user_preferences": {
-                                "name": "User",
-                                "theme": "dark",
-                                "gym_schedule": "Mon, Wed, Fri at 7:00 AM"
-                            }
-                        }
-                        self.save()
-                        return
-
-                    self._raw_yaml = data # Store for preservation
-                    
-                    # Map YAML structure to AppConfig Flat Structure
-                    active = data.get("active_settings", {})
-                    
-                    config_dict = {
-                        "api_keys": data.get("api_keys", []),
-                        "models": data.get("models", []),
-                        "active_model_id": active.get("active_model_id", "gemini-1.5-flash"),
-                        "active_api_key_id": active.get("active_api_key_id"),
-                        "system_instruction": active.get("system_prompt", "")
-                    }
-                    self._config = AppConfig(**config_dict)
+                signature = file_signature(CONFIG_FILE)
+                data, digest = read_yaml(CONFIG_FILE)
+
+                if not data:
+                    logger.info("config.yaml is empty. Populating defaults.")
+                    self._snapshot = ConfigSnapshot.build(0, AppConfig(), {"user_preferences": dict(DEFAULT_USER_PREFERENCES)})
+                    self.save()
+                    return
+
+                self._snapshot = ConfigSnapshot.build(data.get("config_version", 0), _config_from_yaml(data), data)
+                self._digest = digest
+                self._watcher.mark_known(signature)
                 logger.info("Settings loaded from config.yaml")
             except Exception as e:
                 logger.error(f"Failed to load config.yaml: {e}")
-                self._config = AppConfig()
+                self._snapshot = ConfigSnapshot.build(0, AppConfig(), {})
         else:
             logger.info("config.yaml not found. Creating default configuration.")
             # Initialize with default structure including user_preferences
-            self._config = AppConfig()
-            self._raw_yaml = {
-                "user_preferences": {
-                    "name": "User",
-                    "theme": "dark",
-                    "gym_schedule": "Mon, Wed, Fri at 7:00 AM" # Default example
-                }
-            }
+            self._snapshot = ConfigSnapshot.build(0, AppConfig(), {"user_preferences": dict(DEFAULT_USER_PREFERENCES)})
             self.save()
 
-    def save(self):
-        """Save current settings to config.yaml, preserving unknown fields"""
+    def _reload_from_disk(self) -> bool:
+        """
+        Swap in config.yaml if its contents differ from what the snapshot came
+        from. Any difference counts, not just a higher version: two workers can
+        have written the same version number. Caller holds self._lock.
+        """
+        signature = file_signature(CONFIG_FILE)
+        data, digest = read_yaml(CONFIG_FILE)
+        self._watcher.mark_known(signature)
+        if digest == self._digest or not data:
+            return False  # Unchanged, or a worker is still populating defaults
+        self._snapshot = ConfigSnapshot.build(data.get("config_version", 0), _config_from_yaml(data), data)
+        self._digest = digest
+        return True
+
+    def _reload_if_changed(self):
+        """
+        Called from the watcher thread when config.yaml changed on disk (usually
+        another worker saving). Parses off the request path, then swaps.
+        """
         try:
-            # Get current app config
-            current = self._config.dict()
-            
-            # Update specific sections in raw_yaml
-            if "active_settings" not in self._raw_yaml:
-                self._raw_yaml["active_settings"] = {}
-                
-            self._raw_yaml["api_keys"] = current["api_keys"]
-            self._raw_yaml["models"] = current["models"]
-            self._raw_yaml["active_settings"]["active_model_id"] = current["active_model_id"]
-            self._raw_yaml["active_settings"]["active_api_key_id"] = current["active_api_key_id"]
-            self._raw_yaml["active_settings"]["system_prompt"] = current["system_instruction"]
-            
-            # Note: user_preferences and other top-level keys in _raw_yaml remain untouched!
-            
-            with open(CONFIG_FILE, "w") as f:
-                yaml.dump(self._raw_yaml, f, sort_keys=False, indent=2)
-            logger.info("Settings saved to config.yaml")
+            with self._lock:
+                if self._reload_from_disk():
+                    logger.info(f"Settings reloaded from config.yaml (version {self._snapshot.version})")
         except Exception as e:
-            logger.error(f"Failed to save config.yaml: {e}")
+            logger.error(f"Failed to reload config.yaml: {e}")
+
+    def _on_written(self, signature, digest: str):
+        # From the writer thread, which holds file_lock: must not wait for self._lock
+        self._digest = digest
+        self._watcher.mark_known(signature)
+
+    def start_watching(self):
+        """Poll config.yaml for changes made by other workers."""
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._watcher.stop()
+
+    def save(self):
+        """
+        Queue current settings for writing to config.yaml, preserving unknown fields.
+        The write itself happens off the event loop, batched with any updates; see ConfigWriter.
+        """
+        self._writer.submit({})
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until pending settings are on disk (used at shutdown)."""
+        return self._writer.flush(timeout)
 
     def get_config(self) -> AppConfig:
         return self._config
 
+    def get_user_preferences(self) -> Dict[str, Any]:
+        """Free-form `user_preferences` section of config.yaml (gym schedule, work hours, ...)."""
+        return self._snapshot.raw_yaml.get("user_preferences") or {}
+
+    def get_snapshot(self) -> ConfigSnapshot:
+        """The current snapshot; hold on to it to read several values consistently."""
+        return self._snapshot
+
     def get_active_key(self) -> Optional[str]:
-        if self._config.active_api_key_id:
-            for k in self._config.api_keys:
-                if k.id == self._config.active_api_key_id:
-                    return k.key
-        if self._config.api_keys:
-            return self._config.api_keys[0].key
-        return None
-
-    def get_all_api_keys(self) -> List[str]:
-        """Return a list of all available API keys, starting with the active one if set."""
-        keys = []
-        active = self.get_active_key()
-        if active:
-            keys.append(active)
-        
-        # Add others, avoiding duplicates
-        for k in self._config.api_keys:
-            if k.key != active:
-                keys.append(k.key)
-        return keys
+        return self._snapshot.active_key
+
+    def get_all_api_keys(self) -> Sequence[str]:
+        """Return all available API keys, starting with the active one if set."""
+        return self._snapshot.key_candidates
+
+    def get_model(self, model_id: str) -> Optional[ModelConfig]:
+        return self._snapshot.models_by_id.get(model_id)
+
+    def get_api_key_config(self, key_id: str) -> Optional[ApiKeyConfig]:
+        return self._snapshot.keys_by_id.get(key_id)
 
     def get_active_model_resolved_id(self) -> str:
         """Resolve the active model ID to the actual provider model ID."""
-        active = self._config.active_model_id
-        for m in self._config.models:
-            if m.id == active:
-                return m.model_id
-        return active # Fallback: Assume the active ID is the direct model ID if not found in list
-
-    def update_config(self, updates: dict):
-        current_data = self._config.dict()
-        current_data.update(updates)
-        self._config = AppConfig(**current_data)
-        self.save()
+        return self._snapshot.active_model_resolved_id
+
+    async def update_config(self, change: Union[Dict[str, Any], Callable[[AppConfig], Dict[str, Any]]]):
+        """
+        Apply `change` and wait until it is in config.yaml. `change` is either
+        the updates, or a function from the current config to the updates;
+        use a function for anything computed from the current values (adding
+        to a list, checking an id exists), as it is called with the config as
+        re-read under file_lock, after every earlier update from any worker.
+        Whatever it raises (e.g. HTTPException) is raised here and nothing
+        from it is applied.
+        """
+        await asyncio.wrap_future(self._writer.submit(change))
+
+    def _commit(self, changes: List[Any]):
+        """
+        ConfigWriter's commit step, called with file_lock held: apply a batch
+        of changes on top of config.yaml as it is now. Returns the file
+        contents to write (None if nothing applied) and a result per change.
+        """
+        with self._lock:
+            if CONFIG_FILE.exists():
+                try:
+                    self._reload_from_disk()
+                except Exception as e:
+                    logger.error(f"Failed to read config.yaml before updating it: {e}")
+
+            snapshot = self._snapshot
+            config = snapshot.config
+            results, applied = [], False
+            for change in changes:
+                try:
+                    config = apply_updates(config, change(config) if callable(change) else change)
+                    results.append(None)
+                    applied = True
+                except Exception as e:
+                    results.append(e)
+            if not applied:
+                return None, results
+
+            snapshot = ConfigSnapshot.build(snapshot.version + 1, config, snapshot.raw_yaml)
+            snapshot = replace(snapshot, raw_yaml=_yaml_for(snapshot))
+            # Swapped before the write lands; _on_written then records the file as ours
+            self._snapshot = snapshot
+            return snapshot.raw_yaml, results
 
 def get_settings_manager() -> SettingsManager:
     return SettingsManager()
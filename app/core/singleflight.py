@@ -0,0 +1,76 @@
+"""
+Request coalescing ("single flight") for identical concurrent reads.
+
+The frontend and the agents often ask for the same thing at the same moment
+(the same user's event window, the same Google service). SingleFlight runs
+one call per key; concurrent callers with the same key await that call and
+share its result. Results can also be kept for a short TTL so a burst right
+after the call completes is served too. Errors are shared with the callers
+already waiting but never cached.
+
+Keys are tuples whose first element is the user, so `invalidate(user)`
+after a write drops that user's entries. Per process, on the event loop.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from app.core.metrics import CACHE_REQUESTS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str, ttl_seconds: float = 0.0, max_entries: int = 1024):
+        self.name = name  # Label in aura_cache_requests_total
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._results: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    async def do(self, key: Tuple, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return fn()'s result, sharing one call among concurrent callers with the same key."""
+        cached = self._results.get(key)
+        if cached is not None:
+            expires_at, value = cached
+            if time.monotonic() < expires_at:
+                CACHE_REQUESTS.labels(self.name, "hit").inc()
+                return value
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            CACHE_REQUESTS.labels(self.name, "coalesced").inc()
+        else:
+            CACHE_REQUESTS.labels(self.name, "miss").inc()
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        # Shielded: one caller going away (client disconnect) must not cancel the others' call
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Tuple, task: asyncio.Task):
+        # Retrieved here too, so a failure nobody is still awaiting isn't logged as unhandled
+        failed = task.cancelled() or task.exception() is not None
+        # Only the current call for a key may clear or cache it; see invalidate()
+        if self._inflight.get(key) is not task:
+            return
+        del self._inflight[key]
+        if self.ttl_seconds <= 0 or failed:
+            return
+        self._results[key] = (time.monotonic() + self.ttl_seconds, task.result())
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def invalidate(self, user: Any):
+        """
+        Forget `user`'s cached results. Calls still in flight keep running for
+        their current callers, but their (possibly stale) results are not
+        cached and new callers start a fresh call.
+        """
+        for key in [k for k in self._results if k[0] == user]:
+            del self._results[key]
+        for key in [k for k in self._inflight if k[0] == user]:
+            del self._inflight[key]
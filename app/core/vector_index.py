@@ -0,0 +1,288 @@
+"""
+Disk-backed vector index for long-term chat memory.
+
+Rows are (owner, key, unit vector) and live in three memory-mapped arrays in
+one directory, so the index survives restarts and is paged in on demand
+rather than loaded:
+
+    vectors.f32   float32 [capacity, dim]
+    keys.i64      int64   [capacity]      caller's id (a Message.id)
+    owners.i32    int32   [capacity]      index into meta.json "owners"
+    meta.json     row count, capacity, owner names, IVF version
+    ivf.npz       IVF centroids and the list of each row they were trained on
+
+Search is cosine similarity (vectors are normalized on insert), scoped to
+one owner:
+- An owner with few rows is scanned exactly.
+- Once the index has IVF_MIN_ROWS rows, train() builds a k-means coarse
+  quantizer (IVF); larger owners then only scan the rows of the `probes`
+  lists whose centroids are nearest the query (more for owners with a small
+  share of the index), plus the rows appended since
+  (assigned to lists in batches). needs_training turns true again when the
+  index has grown 4x since the last training.
+
+Appends take an flock on the directory, and every call first checks
+meta.json's mtime, so several workers can share one index.
+"""
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+IVF_MIN_ROWS = 4096
+EXACT_SEARCH_ROWS = 2048 # Owners with at most this many rows are always scanned exactly
+TRAIN_SAMPLE_ROWS = 20000
+TRAIN_ITERATIONS = 10
+ASSIGN_CHUNK_ROWS = 16384
+INITIAL_CAPACITY = 1024
+MIN_OWNER_CANDIDATES = 512
+UNINDEXED_TAIL_ROWS = 1024 # New rows are assigned to IVF lists in batches of this size
+
+
+class VectorIndex:
+    def __init__(self, path: str, dim: int, probes: int = 8):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.probes = probes
+        self._lock = threading.RLock()
+
+        self._count = 0
+        self._capacity = 0
+        self._owners: List[str] = []
+        self._owner_ids = {}
+        self._ivf_version = 0
+        self._trained_rows = 0
+        self._meta_mtime = None
+        self._maps = []
+        self._vectors = self._keys = self._owner_col = None
+        self._owner_counts = np.zeros(0, dtype=np.int64)
+
+        # IVF state, rebuilt in memory from centroids.npy
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._order = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        return self._count
+
+    # Storage
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.path / "lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _map(self, name: str, dtype, shape, capacity: int):
+        file = self.path / name
+        size = int(np.dtype(dtype).itemsize * capacity * int(np.prod(shape)))
+        with open(file, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(file, dtype=dtype, mode="r+", shape=(capacity, *shape))
+
+    def _flush(self):
+        for array in self._maps:
+            array.flush()
+
+    def _remap(self, capacity: int):
+        self._flush()
+        self._maps = [
+            self._map("vectors.f32", np.float32, (self.dim,), capacity),
+            self._map("keys.i64", np.int64, (), capacity),
+            self._map("owners.i32", np.int32, (), capacity),
+        ]
+        # Plain ndarray views of the same pages: np.memmap's own indexing is several times slower
+        self._vectors, self._keys, self._owner_col = (array.view(np.ndarray) for array in self._maps)
+        self._capacity = capacity
+
+    def _refresh(self):
+        """Pick up rows, owners and centroids written by this or another process."""
+        meta_file = self.path / "meta.json"
+        try:
+            mtime = meta_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            if self._vectors is None:
+                self._remap(INITIAL_CAPACITY)
+            return
+        if mtime == self._meta_mtime:
+            return
+
+        meta = json.loads(meta_file.read_text())
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Index at {self.path} has dim {meta['dim']}, expected {self.dim}")
+        if meta["capacity"] != self._capacity:
+            self._remap(meta["capacity"])
+        self._count = meta["count"]
+        self._owners = meta["owners"]
+        self._owner_ids = {owner: i for i, owner in enumerate(self._owners)}
+        self._trained_rows = meta.get("trained_rows", 0)
+        self._meta_mtime = mtime
+        self._owner_counts = np.bincount(self._owner_col[:self._count], minlength=len(self._owners))
+        if meta.get("ivf_version", 0) != self._ivf_version:
+            self._ivf_version = meta["ivf_version"]
+            with np.load(self.path / "ivf.npz") as ivf:
+                self._centroids = ivf["centroids"]
+                self._set_lists(ivf["assignments"])
+        self._maybe_extend_lists()
+
+    def _write_meta(self):
+        self._flush()
+        meta = {
+            "dim": self.dim, "count": self._count, "capacity": self._capacity, "owners": self._owners,
+            "ivf_version": self._ivf_version, "trained_rows": self._trained_rows,
+        }
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / "meta.json")
+        self._meta_mtime = (self.path / "meta.json").stat().st_mtime_ns
+
+    # IVF
+
+    def _assign(self, vectors: np.ndarray, start: int, stop: int, centroids: np.ndarray) -> np.ndarray:
+        parts = [np.empty(0, dtype=np.int32)]
+        for chunk_start in range(start, stop, ASSIGN_CHUNK_ROWS):
+            chunk = vectors[chunk_start:min(chunk_start + ASSIGN_CHUNK_ROWS, stop)]
+            parts.append(np.argmax(chunk @ centroids.T, axis=1).astype(np.int32))
+        return np.concatenate(parts)
+
+    def _set_lists(self, assignments: np.ndarray):
+        self._assignments = assignments
+        self._order = np.argsort(assignments, kind="stable")
+        self._offsets = np.searchsorted(assignments[self._order], np.arange(len(self._centroids) + 1))
+
+    def _maybe_extend_lists(self):
+        """Assign rows added since the lists were built, once enough have accumulated."""
+        if self._centroids is None:
+            return
+        indexed = len(self._assignments)
+        if self._count - indexed <= UNINDEXED_TAIL_ROWS:
+            return  # Few enough to scan exactly
+        new = self._assign(self._vectors, indexed, self._count, self._centroids)
+        self._set_lists(np.concatenate([self._assignments, new]))
+
+    @property
+    def needs_training(self) -> bool:
+        return self._count >= IVF_MIN_ROWS and self._count >= 4 * self._trained_rows
+
+    def train(self):
+        """
+        (Re)build the IVF centroids and lists from the current rows. Takes up
+        to seconds, so callers run it in a worker thread: searches and appends
+        carry on meanwhile, and the new lists are swapped in at the end.
+        """
+        with self._lock:
+            self._refresh()
+            # This view stays valid even if an append remaps the files meanwhile
+            n, vectors = self._count, self._vectors
+
+        rng = np.random.default_rng(0)
+        sample = vectors[np.sort(rng.choice(n, size=min(n, TRAIN_SAMPLE_ROWS), replace=False))]
+        nlist = int(np.clip(np.sqrt(n), 16, 1024))
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        # Spherical k-means: vectors and centroids are unit length
+        for _ in range(TRAIN_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+            norms[empty] = 1.0
+            centroids = (sums / norms[:, None]).astype(np.float32)
+        assignments = self._assign(vectors, 0, n, centroids)
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            # One file, so other processes never load centroids with another training's lists
+            with open(self.path / "ivf.tmp.npz", "wb") as f:
+                np.savez(f, centroids=centroids, assignments=assignments)
+            os.replace(self.path / "ivf.tmp.npz", self.path / "ivf.npz")
+            self._ivf_version = time.time_ns()  # Unique across processes
+            self._trained_rows = n
+            self._centroids = centroids
+            self._set_lists(assignments)
+            self._maybe_extend_lists()
+            self._write_meta()
+
+    # Public API
+
+    def add(self, owner: str, keys, vectors: np.ndarray):
+        """Append rows for `owner`; `vectors` is [n, dim] and is normalized here."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            needed = self._count + len(keys)
+            if needed > self._capacity:
+                capacity = max(self._capacity, INITIAL_CAPACITY)
+                while capacity < needed:
+                    capacity *= 2
+                self._remap(capacity)
+
+            owner_id = self._owner_ids.get(owner)
+            if owner_id is None:
+                owner_id = self._owner_ids[owner] = len(self._owners)
+                self._owners.append(owner)
+
+            rows = slice(self._count, needed)
+            self._vectors[rows] = vectors
+            self._keys[rows] = keys
+            self._owner_col[rows] = owner_id
+            self._count = needed
+            self._owner_counts = np.bincount(self._owner_col[:needed], minlength=len(self._owners))
+            self._maybe_extend_lists()
+            self._write_meta()
+
+    def search(self, owner: str, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Top-k (key, cosine similarity) among `owner`'s rows, best first."""
+        with self._lock:
+            self._refresh()
+            owner_id = self._owner_ids.get(owner)
+            if owner_id is None or k <= 0:
+                return []
+            query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return []
+            query = query / norm
+
+            n = self._count
+            if self._centroids is None or self._owner_counts[owner_id] <= EXACT_SEARCH_ROWS:
+                candidates = np.flatnonzero(self._owner_col[:n] == owner_id)
+            else:
+                # Smaller owners have fewer rows per list: probe enough lists to see about
+                # MIN_OWNER_CANDIDATES of theirs
+                nlist = len(self._centroids)
+                wanted = -(-MIN_OWNER_CANDIDATES * nlist // int(self._owner_counts[owner_id]))
+                probes = min(max(self.probes, wanted), nlist)
+                nearest = np.argpartition(-(self._centroids @ query), probes - 1)[:probes]
+                lists = [self._order[self._offsets[c]:self._offsets[c + 1]] for c in nearest]
+                lists.append(np.arange(len(self._assignments), n))  # Not yet in any list
+                candidates = np.concatenate(lists)
+                candidates = candidates[self._owner_col[candidates] == owner_id]
+
+            if len(candidates) == 0:
+                return []
+            scores = self._vectors[candidates] @ query
+            top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+            return [(int(self._keys[candidates[i]]), float(scores[i])) for i in top]
@@ -1,24 +1,134 @@
+import time
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import get_settings
+from app.core.metrics import DB_POOL_WAIT, instrument_engine
 
 settings = get_settings()
 
-SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+def _postgres_url(server: str) -> str:
+    return f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{server}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 
-# If running locally without docker for testing, you might fallback to sqlite
-# SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db" 
+def _sqlite_url(path: str) -> str:
+    return f"sqlite+aiosqlite:///{path}"
 
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    echo=False,
-    future=True
-)
+if settings.DB_BACKEND == "sqlite":
+    # Single-user/edge installs and local benchmarks: no database server needed
+    SQLALCHEMY_DATABASE_URL = _sqlite_url(settings.SQLITE_PATH)
+elif settings.DB_BACKEND == "postgres":
+    SQLALCHEMY_DATABASE_URL = _postgres_url(settings.POSTGRES_SERVER)
+else:
+    raise ValueError(f"Unknown DB_BACKEND: {settings.DB_BACKEND} (expected 'postgres' or 'sqlite')")
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer; synchronous=NORMAL is durable across app crashes in WAL mode
+# and only risks the last commits on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,  # ms to wait for the write lock instead of failing
+    "cache_size": -32000,  # KiB (negative) -> 32 MB page cache
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection
+    (including opening a new one when the pool grows into overflow).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = self._orig_logging_name or "default"
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            DB_POOL_WAIT.labels(self.name).observe(waited)
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            checkouts, wait_total, wait_max, timeouts = self.checkouts, self.wait_total, self.wait_max, self.timeouts
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": checkouts,
+            "checkout_timeouts": timeouts,
+            "wait_avg_ms": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+            "wait_max_ms": round(wait_max * 1000, 3),
+        }
+
+def make_engine(url: str, name: str = "primary"):
+    """
+    Async engine with the configured pool; SQLite URLs also get SQLITE_PRAGMAS.
+    `name` labels the engine's query and pool metrics.
+    """
+    sqlite = url.startswith("sqlite")
+    new_engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=TimedQueuePool,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING and not sqlite, # A local file can't drop the connection
+        connect_args={} if sqlite else {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    )
+    if sqlite:
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    instrument_engine(new_engine, name)
+    return new_engine
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+
+# Optional read replica for read-only routes; falls back to the primary
+if settings.DB_BACKEND == "postgres" and settings.POSTGRES_READ_SERVER:
+    read_engine = make_engine(_postgres_url(settings.POSTGRES_READ_SERVER), "replica")
+else:
+    read_engine = engine
 
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+AsyncReadSessionLocal = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 async def get_db():
@@ -28,9 +138,21 @@ async def get_db():
         finally:
             await session.close()
 
-async def init_db():
-    # Import models here to ensure they are registered with Base metadata
-    from app import models
-    async with engine.begin() as conn:
-        # await conn.run_sync(Base.metadata.drop_all) # Optional: Reset DB (commented out)
-        await conn.run_sync(Base.metadata.create_all)
+async def get_read_db():
+    """
+    Session on the read replica (or the primary if none is configured).
+    Only for routes that never write; replica lag means a just-committed
+    write may not be visible yet.
+    """
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+def pool_stats() -> Dict[str, Optional[Dict[str, Any]]]:
+    """Utilisation of the primary and (if separate) replica connection pools."""
+    return {
+        "primary": engine.pool.stats(),
+        "replica": read_engine.pool.stats() if read_engine is not engine else None,
+    }
@@ -1,9 +1,8 @@
 from contextlib import asynccontextmanager
-from langchain_core.messages import HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from app.config import get_settings
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Late imports to avoid circular deps if any, but clean design prefers top
@@ -11,54 +10,52 @@ from app.api.endpoints import router as api_router
 from app.api.settings import router as settings_router
 from app.api.threads import router as threads_router
 from app.api.v1.debug import router as debug_router
+from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
+from app.core.admission import AdmissionRejected
+from app.core.health import get_health_monitor
+from app.core.logs import RequestContextMiddleware, configure_logging, stop_logging
+from app.core.metrics import MetricsMiddleware
+from app.core.responses import CompressionMiddleware
 from app.core.settings_manager import get_settings_manager
-from app.database import init_db
+from app.services.thread_purge import get_thread_purger
+
+# Before anything logs: replaces the default handlers with the queued JSON pipeline
+configure_logging()
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize Database Tables
-    await init_db()
-    
-    # Startup validation
+    configure_logging() # No-op unless a previous shutdown stopped it
     settings_manager = get_settings_manager()
-    config = settings_manager.get_config()
-    
-    try:
-        logger.info(f"Performing startup health check for model: {config.active_model_id}...")
-        
-        # Determine API Key: Settings override > Env Var
-        api_key = settings_manager.get_active_key()
-        
-        if not api_key:
-            logger.warning("No Google API Key found in settings or environment. Chat may fail.")
-        
-        # Use a safe init that handles potential import/registry errors
-        resolved_model = settings_manager.get_active_model_resolved_id()
-        model = ChatGoogleGenerativeAI(
-            model=resolved_model, 
-            google_api_key=api_key,
-            temperature=0
-        )
-        # Verify connection with a minimal token generation. 
-        # Note: We use a try/except block around invocation specifically.
-        if api_key:
-             await model.ainvoke([HumanMessage(content="Hello")])
-             logger.info("Startup check PASSED: Gemini API is accessible.")
-        else:
-             logger.warning("Skipping startup connection check due to missing API Key.")
-             
-    except Exception as e:
-        logger.critical(f"Startup check FAILED: Could not access Gemini model. Error: {e}")
-        logger.warning(
-            "APPLICATION STARTING IN DEGRADED MODE. "
-            "Chat functionality may not work. Please check your GOOGLE_API_KEY and Model configuration."
-        )
-    
+    settings_manager.start_watching() # Pick up settings saved by other workers
+
+    if not settings_manager.get_active_key():
+        logger.warning("No Google API Key found in settings or environment. Chat may fail.")
+
+    # Dependency checks run in the background so the server
+    # accepts traffic immediately; see /readyz for their status
+    health_monitor = get_health_monitor()
+    health_monitor.start()
+
+    # Removes soft-deleted threads in batches
+    thread_purger = get_thread_purger()
+    thread_purger.start()
+
     yield
 
+    await thread_purger.stop()
+    await health_monitor.stop()
+
+    # Settings writes are queued; make sure the last one lands before exit
+    settings_manager.stop_watching()
+    settings_manager.flush(timeout=5)
+
+    # Last, so shutdown messages above are written too
+    stop_logging()
+
 app = FastAPI(
     title="Aura API",
     description="Backend API for Aura Personal Assistant",
@@ -66,6 +63,8 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -74,11 +73,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the latency includes CORS handling and error responses
+app.add_middleware(MetricsMiddleware)
+
+# Outside even metrics, so every log line of a request carries its id
+app.add_middleware(RequestContextMiddleware)
+
+app.include_router(health_router, tags=["health"])
+app.include_router(metrics_router, tags=["metrics"])
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(settings_router, prefix="/api/v1/settings", tags=["settings"])
 app.include_router(threads_router, prefix="/api/v1/threads", tags=["threads"])
 app.include_router(debug_router, prefix="/api/v1/debug", tags=["debug"])
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Too many requests ({exc.reason}), try again later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Aura Backend", "status": "online"}
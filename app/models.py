@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -16,9 +16,12 @@ class User(Base):
     google_refresh_token = Column(String, nullable=True)
     google_token_expiry = Column(DateTime, nullable=True)
     
+    # Calendars included in the aggregated view (None -> ["primary"])
+    calendar_ids = Column(JSON, nullable=True)
+    
     tasks = relationship("Task", back_populates="owner")
     # For Gmail history tracking
-    gmail_history_id = Column(String, nullable=True)
+    gmail_history_id = Column(String, nullable=True, index=True)
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -28,28 +31,53 @@ class Task(Base):
     description = Column(Text, nullable=True)
     status = Column(String, default="pending") # pending, completed
     due_date = Column(DateTime, nullable=True)
+    duration_minutes = Column(Integer, nullable=True) # Estimated effort, used by the scheduler
+    priority = Column(Integer, default=0) # Higher is more important
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     owner_id = Column(Integer, ForeignKey("users.id"))
 
     owner = relationship("User", back_populates="tasks")
 
+    __table_args__ = (
+        # Serves the per-user listing: filter by status, keyset on due_date
+        Index("ix_tasks_owner_status_due", "owner_id", "status", "due_date"),
+    )
+
 class Thread(Base):
     __tablename__ = "threads"
 
     id = Column(String, primary_key=True, index=True) # UUID
     title = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now(), index=True)
+    # Set when a large thread is deleted; the purger removes it in the background
+    deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    # Denormalized for the thread list; maintained by record_message in the same transaction
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_message_preview = Column(String, nullable=True)
+    last_activity_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    messages = relationship("Message", back_populates="thread", cascade="all, delete-orphan")
+    # passive_deletes: the database cascades to messages, they are never loaded just to be deleted
+    messages = relationship("Message", back_populates="thread", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Thread list: live threads (deleted_at IS NULL) by most recent activity
+        Index("ix_threads_deleted_at_last_activity_at", "deleted_at", "last_activity_at"),
+    )
 
 class Message(Base):
     __tablename__ = "messages"
 
     id = Column(Integer, primary_key=True, index=True)
-    thread_id = Column(String, ForeignKey("threads.id"))
+    thread_id = Column(String, ForeignKey("threads.id", ondelete="CASCADE"))
     role = Column(String) # user, assistant
     content = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     thread = relationship("Thread", back_populates="messages")
+
+    __table_args__ = (
+        # Thread history: all messages of a thread in order
+        Index("ix_messages_thread_id_created_at", "thread_id", "created_at"),
+    )
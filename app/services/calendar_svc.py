@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.singleflight import SingleFlight
+from app.models import User
+from app.services.event_cache import event_cache
+from app.services.recurrence import expand_events, parse_event_time, event_start, event_end
+
+DEFAULT_CALENDAR_IDS = ["primary"]
+
+# Identical concurrent reads (same user, operation and window) share one
+# Google round trip; results are shared read-only and kept very briefly.
+# Calendar writes (REST or agent tools) invalidate the user's entries.
+calendar_reads = SingleFlight("calendar_reads", ttl_seconds=get_settings().CALENDAR_READ_CACHE_SECONDS)
+
+
+async def get_user_calendar_ids(user_email: str, db: AsyncSession) -> List[str]:
+    """Return the calendars the user has selected for the aggregated view."""
+    result = await db.execute(select(User.calendar_ids).where(User.email == user_email))
+    calendar_ids = result.scalar_one_or_none()
+    return list(calendar_ids) if calendar_ids else list(DEFAULT_CALENDAR_IDS)
+
+
+async def set_user_calendar_ids(user_email: str, calendar_ids: List[str], db: AsyncSession) -> List[str]:
+    result = await db.execute(select(User).where(User.email == user_email))
+    user = result.scalars().first()
+    if not user:
+        raise ValueError("User not found")
+
+    # Keep the caller's order (it decides which copy wins on dedupe) but drop repeats
+    user.calendar_ids = list(dict.fromkeys(calendar_ids))
+    await db.commit()
+    return user.calendar_ids
+
+
+def _execute_isolated(request):
+    """
+    Execute a googleapiclient request on its own HTTP connection.
+    httplib2 is not thread-safe, so concurrent calls must not share the
+    service's connection object.
+    """
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.http import build_http
+
+    http = AuthorizedHttp(request.http.credentials, http=build_http())
+    return request.execute(http=http)
+
+
+def _fetch_calendar_sync(service, calendar_id: str, time_min: str, time_max: str) -> List[dict]:
+    # Recurring series come back once as a master (plus any exceptions) rather
+    # than once per occurrence; showDeleted surfaces cancelled occurrences.
+    items = []
+    page_token = None
+    while True:
+        request = service.events().list(
+            calendarId=calendar_id,
+            timeMin=time_min,
+            timeMax=time_max,
+            singleEvents=False,
+            showDeleted=True,
+            pageToken=page_token
+        )
+        page = _execute_isolated(request)
+        for item in page.get('items', []):
+            item["calendarId"] = calendar_id
+            items.append(item)
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            return items
+
+
+async def fetch_calendar_events(
+    service,
+    calendar_id: str,
+    time_min: str,
+    time_max: str,
+    user_email: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    One calendar's events for the window as a start-ordered stream. The compact
+    listing is cached per user, and recurring series are expanded lazily.
+    """
+    window_start, window_end = parse_window_bound(time_min), parse_window_bound(time_max)
+
+    items = event_cache.get(user_email, calendar_id, window_start, window_end) if user_email else None
+    if items is None:
+        items = await asyncio.to_thread(_fetch_calendar_sync, service, calendar_id, time_min, time_max)
+        if user_email:
+            event_cache.put(user_email, calendar_id, window_start, window_end, items)
+
+    return expand_events(items, window_start, window_end)
+
+
+def merge_event_streams(streams: Iterable[Iterable[dict]]) -> List[dict]:
+    """
+    K-way merge of per-calendar event streams that are already sorted by start.
+    Events shared between calendars carry the same iCalUID, so the first copy
+    (from the earliest calendar in `streams`) wins.
+    """
+    merged = []
+    seen = set()
+    for event in heapq.merge(*streams, key=event_start):
+        dedupe_key = (event.get("iCalUID") or event.get("id"), event_start(event))
+        if dedupe_key in seen:
+            continue
+        seen.add(dedupe_key)
+        merged.append(event)
+    return merged
+
+
+async def list_merged_events(
+    service,
+    calendar_ids: List[str],
+    time_min: str,
+    time_max: str,
+    user_email: Optional[str] = None
+) -> List[dict]:
+    """Fetch all calendars concurrently and return a single deduplicated, start-ordered view."""
+    streams = await asyncio.gather(*[
+        fetch_calendar_events(service, calendar_id, time_min, time_max, user_email)
+        for calendar_id in calendar_ids
+    ])
+    return merge_event_streams(streams)
+
+
+def busy_intervals(events: Iterable[dict]) -> List[Tuple[datetime, datetime]]:
+    """
+    Collapse start-ordered events into non-overlapping busy intervals.
+    Events marked as 'free' (transparent) or cancelled do not block time.
+    """
+    intervals: List[Tuple[datetime, datetime]] = []
+    for event in events:
+        if event.get("transparency") == "transparent" or event.get("status") == "cancelled":
+            continue
+        start, end = event_start(event), event_end(event)
+        if intervals and start <= intervals[-1][1]:
+            if end > intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], end)
+        else:
+            intervals.append((start, end))
+    return intervals
+
+
+def free_slots(
+    busy: List[Tuple[datetime, datetime]],
+    window_start: datetime,
+    window_end: datetime,
+    min_minutes: int = 0
+) -> List[Tuple[datetime, datetime]]:
+    """Invert merged busy intervals into free slots within the window."""
+    slots = []
+    cursor = window_start
+    for start, end in busy:
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if (start - cursor).total_seconds() >= max(min_minutes * 60, 1):
+            slots.append((cursor, start))
+        cursor = max(cursor, end)
+    if (window_end - cursor).total_seconds() >= max(min_minutes * 60, 1):
+        slots.append((cursor, window_end))
+    return slots
+
+
+def availability(events: Iterable[dict], time_min: str, time_max: str) -> dict:
+    """Busy and free periods of the window as ISO 8601 pairs, as the calendar tools report them."""
+    busy = busy_intervals(events)
+    free = free_slots(busy, parse_window_bound(time_min), parse_window_bound(time_max))
+    return {
+        "busy": [[s.isoformat(), e.isoformat()] for s, e in busy],
+        "free": [[s.isoformat(), e.isoformat()] for s, e in free],
+    }
+
+
+def parse_window_bound(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return parse_event_time({"dateTime": value})
@@ -0,0 +1,152 @@
+"""
+Per-connection chat session state for the WebSocket channel.
+
+POST /chat pays for everything on every turn: resolve the thread, re-read
+the whole history, compile the graph. A ChatSession does that once when the
+socket opens and keeps it for the connection: the thread id, the working
+history as LangChain messages, the compiled graph and the user's Calendar
+service. Each turn then only persists two messages and runs the model.
+
+The history is this connection's view: messages another client adds to the
+same thread meanwhile are picked up on the next connection, not mid-session.
+Database sessions are opened per turn, never held for the connection.
+With long-term memory on (app/services/memory.py), the working history is
+capped at MEMORY_RECENT_MESSAGES and each turn adds recalled excerpts.
+"""
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, List, Optional
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.core.logs import bind_thread_id
+from app.core.model_router import ATTEMPT_TAG_PREFIX
+from app.database import AsyncSessionLocal
+from app.models import Message, Thread
+from app.services.messages import record_message
+
+logger = logging.getLogger(__name__)
+
+
+def to_langchain_messages(rows) -> List[Any]:
+    """(role, content) rows -> LangChain messages; roles other than user/assistant are skipped."""
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    messages = []
+    for role, content in rows:
+        if role == "user":
+            messages.append(HumanMessage(content=content))
+        elif role == "assistant":
+            messages.append(AIMessage(content=content))
+    return messages
+
+
+class ChatSession:
+    def __init__(self, user_email: Optional[str], thread_id: Optional[str] = None):
+        self.user_email = user_email
+        self.thread_id = thread_id
+        self.history: List[Any] = []
+        self.turns = 0
+        self._graph = None
+        self._calendar_service = None
+        settings = get_settings()
+        self._recent_limit = settings.MEMORY_RECENT_MESSAGES if settings.MEMORY_ENABLED else None
+
+    async def open(self):
+        """Resolve the thread and load its history; raises LookupError for an unknown thread."""
+        # Heavy imports, as in the REST endpoint
+        from app.agent.graph import create_agent_graph
+
+        if self.thread_id:
+            bind_thread_id(self.thread_id)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Thread.id).where(Thread.id == self.thread_id, Thread.deleted_at.is_(None))
+                )
+                if result.scalar_one_or_none() is None:
+                    raise LookupError("Thread not found")
+                query = select(Message.role, Message.content).where(Message.thread_id == self.thread_id)
+                if self._recent_limit:
+                    query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(self._recent_limit)
+                    rows = list(reversed((await db.execute(query)).all()))
+                else:
+                    rows = (await db.execute(query.order_by(Message.created_at, Message.id))).all()
+                self.history = to_langchain_messages(rows)
+
+        self._graph = create_agent_graph()
+
+        if self.user_email:
+            # Best effort: without it, tools build the service on demand as before
+            from app.services.google_svc import get_google_service
+            try:
+                async with AsyncSessionLocal() as db:
+                    self._calendar_service = await get_google_service(self.user_email, db, "calendar", "v3")
+            except Exception as e:
+                logger.info(f"Chat session for {self.user_email} starts without a Calendar service: {e}")
+
+    async def run_turn(
+        self,
+        content: str,
+        on_token: Callable[[str], Awaitable[None]],
+        on_reset: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> str:
+        """
+        Persist the user message, run the graph over the working history and
+        persist the reply. Model tokens are passed to `on_token` as they arrive.
+        When agent_node moves on to another attempt after text has streamed (a
+        rung failed validation, or a model failed mid-reply), `on_reset` is
+        called before the new attempt's first token: what streamed so far is
+        void. The returned text is the reply of record either way.
+        """
+        from langchain_core.messages import AIMessage, HumanMessage
+        from app.services.memory import format_memories, recall, remember
+
+        async with AsyncSessionLocal() as db:
+            if not self.thread_id:
+                self.thread_id = str(uuid.uuid4())
+                title = content[:50] + "..." if len(content) > 50 else content
+                db.add(Thread(id=self.thread_id, title=title))
+                await db.flush()
+            bind_thread_id(self.thread_id)
+            user_row = await record_message(db, self.thread_id, "user", content)
+            await db.commit()
+            memories = await recall(db, self.user_email, content, exclude=[m.content for m in self.history] + [content])
+
+        user_message = HumanMessage(content=content)
+        inputs = {
+            "messages": [*self.history, user_message],
+            "user_context": {
+                "email": self.user_email, "calendar_service": self._calendar_service,
+                "memories": format_memories(memories),
+            },
+        }
+        final_state = None
+        streamed_attempt = None
+        # "messages" yields model output chunks as they stream; "values" the graph state after each step
+        async for mode, data in self._graph.astream(inputs, stream_mode=["messages", "values"]):
+            if mode == "messages":
+                chunk, metadata = data
+                text = chunk.text()
+                if not text:
+                    continue
+                attempt = next((t for t in metadata.get("tags", ()) if t.startswith(ATTEMPT_TAG_PREFIX)), None)
+                if streamed_attempt is not None and attempt != streamed_attempt and on_reset:
+                    await on_reset()
+                streamed_attempt = attempt
+                await on_token(text)
+            else:
+                final_state = data
+
+        reply = final_state["messages"][-1].content if final_state else ""
+
+        async with AsyncSessionLocal() as db:
+            reply_row = await record_message(db, self.thread_id, "assistant", reply)
+            await db.commit()
+        await remember(self.user_email, [(user_row.id, content), (reply_row.id, reply)])
+
+        self.history.extend([user_message, AIMessage(content=reply)])
+        if self._recent_limit:
+            self.history = self.history[-self._recent_limit:]
+        self.turns += 1
+        return reply
@@ -0,0 +1,82 @@
+"""
+Text embedders for the long-term memory (app/services/memory.py).
+
+MEMORY_EMBEDDER picks one:
+- "hashing" (default): local and deterministic. Word unigrams and bigrams
+  are hashed into MEMORY_DIM signed buckets. No model, no network, same
+  vectors in every process; good at lexical overlap, blind to synonyms.
+- "google": Gemini text embeddings with the active API key.
+- "module:Class": any class with `name`, `dim` and `embed(texts)`
+  (and optionally an async `aembed(texts)`), constructed without arguments.
+
+The index directory is named after the embedder and its dim, so switching
+embedders starts a fresh index instead of mixing incompatible vectors.
+"""
+import asyncio
+import importlib
+import re
+import zlib
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from app.config import get_settings
+
+_WORD = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = "hashing"
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not features:
+            return vector
+        # crc32, not hash(): must be stable across processes and restarts
+        hashes = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint32, count=len(features))
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+        np.add.at(vector, hashes % self.dim, signs)
+        return vector
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return np.stack([self._embed_one(text) for text in texts]) if texts else np.zeros((0, self.dim), np.float32)
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        return self.embed(texts)  # Microseconds; not worth a thread hop
+
+
+class GoogleEmbedder:
+    def __init__(self, model: str = "models/text-embedding-004"):
+        self.model = model
+        self.dim = 768
+        self.name = "google-" + model.rsplit("/", 1)[-1]
+
+    def _client(self):
+        # Heavy import, and the key can change at runtime
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        from app.core.settings_manager import get_settings_manager
+        key = get_settings_manager().get_active_key() or get_settings().GOOGLE_API_KEY
+        return GoogleGenerativeAIEmbeddings(model=self.model, google_api_key=key)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self._client().embed_documents(texts), dtype=np.float32).reshape(-1, self.dim)
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.to_thread(self.embed, texts)
+
+
+@lru_cache()
+def get_embedder():
+    settings = get_settings()
+    choice = settings.MEMORY_EMBEDDER
+    if choice == "hashing":
+        return HashingEmbedder(settings.MEMORY_DIM)
+    if choice == "google":
+        return GoogleEmbedder()
+    module_name, _, class_name = choice.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
@@ -0,0 +1,65 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from app.config import get_settings
+from app.core.metrics import CACHE_REQUESTS
+
+
+@dataclass
+class CachedCalendar:
+    window_start: datetime
+    window_end: datetime
+    items: List[dict]  # Raw singleEvents=False listing: masters, exceptions and one-offs
+    fetched_at: float
+
+
+class EventCache:
+    """
+    Per-process cache of compact calendar listings keyed on (user, calendar).
+    Series are stored unexpanded, so any window inside a cached one can be
+    served by local expansion without another Google round trip.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedCalendar]" = OrderedDict()
+
+    def get(self, user_email: str, calendar_id: str, window_start: datetime, window_end: datetime) -> Optional[List[dict]]:
+        key = (user_email, calendar_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            CACHE_REQUESTS.labels("calendar_events", "miss").inc()
+            return None
+        if time.monotonic() - entry.fetched_at > self.ttl_seconds:
+            del self._entries[key]
+            CACHE_REQUESTS.labels("calendar_events", "expired").inc()
+            return None
+        if window_start < entry.window_start or window_end > entry.window_end:
+            CACHE_REQUESTS.labels("calendar_events", "outside_window").inc()
+            return None
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS.labels("calendar_events", "hit").inc()
+        return entry.items
+
+    def put(self, user_email: str, calendar_id: str, window_start: datetime, window_end: datetime, items: List[dict]):
+        key = (user_email, calendar_id)
+        self._entries[key] = CachedCalendar(window_start, window_end, items, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_email: str, calendar_id: Optional[str] = None):
+        """Drop cached listings after a write; all of the user's calendars if none is given."""
+        if calendar_id is not None:
+            self._entries.pop((user_email, calendar_id), None)
+            return
+        for key in [k for k in self._entries if k[0] == user_email]:
+            del self._entries[key]
+
+
+_settings = get_settings()
+event_cache = EventCache(_settings.EVENT_CACHE_TTL_SECONDS, _settings.EVENT_CACHE_MAX_ENTRIES)
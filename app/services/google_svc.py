@@ -1,21 +1,62 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models import User
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from app.config import get_settings
+from app.core.singleflight import SingleFlight
+from app.database import AsyncSessionLocal
 import os
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
 
+def google_client_kwargs():
+    """
+    Extra arguments for googleapiclient's build(): point the APIs at
+    GOOGLE_API_ENDPOINT when set, and time every call for /metrics.
+    """
+    from app.core.metrics import google_request_class
+
+    endpoint = get_settings().GOOGLE_API_ENDPOINT
+    return {
+        "client_options": {"api_endpoint": endpoint} if endpoint else None,
+        "requestBuilder": google_request_class(),
+    }
+
+# Built services are shared for a few seconds (building parses the discovery
+# document and reads the user's tokens). Sharing is safe because requests run
+# either on the event loop thread or on their own connection
+# (calendar_svc._execute_isolated). Re-login invalidates the user's entries.
+google_services = SingleFlight("google_service", ttl_seconds=get_settings().GOOGLE_SERVICE_CACHE_SECONDS)
+
 async def get_google_service(user_email: str, db: AsyncSession, service_name: str, version: str):
     """
     Constructs a Google API Service Resource for the given user.
     Handles token refresh if necessary and updates the DB.
+
+    Concurrent calls for the same user and API share one build. The build
+    runs in its own session rather than `db`, so it never depends on the
+    session of whichever caller happened to start it.
     """
+    return await google_services.do(
+        (user_email, service_name, version),
+        lambda: _build_google_service(user_email, service_name, version)
+    )
+
+async def _build_google_service(user_email: str, service_name: str, version: str):
+    async with AsyncSessionLocal() as db:
+        return await _build_with_session(user_email, db, service_name, version)
+
+async def _build_with_session(user_email: str, db: AsyncSession, service_name: str, version: str):
+    # Google client libraries are imported on first use to keep startup fast
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+    from googleapiclient.discovery import build
+
     # 1. Fetch User credentials
     result = await db.execute(select(User).where(User.email == user_email))
     user = result.scalars().first()
@@ -43,11 +84,11 @@ async def get_google_service(user_email: str, db: AsyncSession, service_name: st
             user.google_access_token = creds.token
             # refresh_token usually stays the same unless revoked/rotated
             await db.commit()
-            print(f"Refreshed token for {user_email}")
+            logger.info(f"Refreshed token for {user_email}")
         except Exception as e:
-            print(f"Failed to refresh token: {e}")
+            logger.warning(f"Failed to refresh token for {user_email}: {e}")
             raise ValueError("Token expired and refresh failed")
 
     # 4. Build Service
-    service = build(service_name, version, credentials=creds)
+    service = build(service_name, version, credentials=creds, **google_client_kwargs())
     return service
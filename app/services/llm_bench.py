@@ -0,0 +1,114 @@
+"""
+Live latency benchmark across configured models and API keys.
+
+Every (ModelConfig, ApiKeyConfig) pair is sampled N times with a short
+streamed prompt, bounded by a semaphore so a large matrix doesn't trip rate
+limits on its own. Each sample records total latency, time to first token
+and, on failure, a coarse error class.
+"""
+import asyncio
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from app.core.llm import classify_error, get_chat_model
+from app.core.settings_manager import ApiKeyConfig, ModelConfig
+
+
+@dataclass
+class Sample:
+    latency_ms: Optional[float] = None
+    ttft_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class PairResult:
+    model_id: str  # ModelConfig.id
+    provider_model_id: str
+    key_id: str
+    key_name: str
+    samples: List[Sample] = field(default_factory=list)
+
+    @property
+    def ok(self) -> List[Sample]:
+        return [s for s in self.samples if s.error is None]
+
+    def summary(self) -> dict:
+        latencies = sorted(s.latency_ms for s in self.ok)
+        ttfts = sorted(s.ttft_ms for s in self.ok if s.ttft_ms is not None)
+        return {
+            "model_id": self.model_id,
+            "provider_model_id": self.provider_model_id,
+            "key_id": self.key_id,
+            "key_name": self.key_name,
+            "samples": len(self.samples),
+            "successes": len(latencies),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "ttft_p50_ms": percentile(ttfts, 50),
+            "ttft_p95_ms": percentile(ttfts, 95),
+            "errors": dict(Counter(s.error for s in self.samples if s.error)),
+        }
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return round(values[rank - 1], 1)
+
+
+async def _probe(model_id: str, api_key: str, prompt: str, timeout: float) -> Sample:
+    llm = get_chat_model(model=model_id, google_api_key=api_key, temperature=0, max_retries=0)
+    started = time.perf_counter()
+    ttft = None
+
+    async def consume():
+        nonlocal ttft
+        async for _ in llm.astream(prompt):
+            if ttft is None:
+                ttft = (time.perf_counter() - started) * 1000
+
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except Exception as e:
+        return Sample(error=classify_error(e))
+    return Sample(latency_ms=(time.perf_counter() - started) * 1000, ttft_ms=ttft)
+
+
+async def benchmark(
+    models: Sequence[ModelConfig],
+    keys: Sequence[ApiKeyConfig],
+    samples: int = 3,
+    concurrency: int = 4,
+    timeout: float = 20.0,
+    prompt: str = "Reply with the single word: pong"
+) -> List[PairResult]:
+    semaphore = asyncio.Semaphore(concurrency)
+    pairs: Dict[tuple, PairResult] = {
+        (m.id, k.id): PairResult(m.id, m.model_id, k.id, k.name) for m in models for k in keys
+    }
+
+    async def run(model: ModelConfig, key: ApiKeyConfig):
+        async with semaphore:
+            sample = await _probe(model.model_id, key.key, prompt, timeout)
+        pairs[(model.id, key.id)].samples.append(sample)
+
+    # Interleave samples so a slow minute doesn't land on a single pair
+    await asyncio.gather(*(run(m, k) for _ in range(samples) for m in models for k in keys))
+    return list(pairs.values())
+
+
+def best_pair(results: Sequence[PairResult]) -> Optional[PairResult]:
+    """Most reliable pair, then lowest p50 latency. None if nothing succeeded."""
+    candidates = [r for r in results if r.ok]
+    if not candidates:
+        return None
+    return min(
+        candidates,
+        key=lambda r: (-len(r.ok) / len(r.samples), percentile(sorted(s.latency_ms for s in r.ok), 50))
+    )
@@ -0,0 +1,155 @@
+"""
+Long-term memory across a user's threads.
+
+Chat turns used to send the model the whole current thread and nothing from
+any other. With MEMORY_ENABLED, a turn instead sends the last
+MEMORY_RECENT_MESSAGES of the thread, plus the MEMORY_TOP_K most similar
+earlier messages from any of the user's threads as context in the system
+prompt. Prompts stay bounded however long a thread grows, and relevant
+older conversations are no longer out of reach.
+
+Each persisted message with a known user is embedded (app/services/embeddings.py)
+and appended to a VectorIndex under MEMORY_DIR. Only message ids are stored
+there; the text is fetched from the database at recall, so deleted threads
+and messages drop out of recall with no index maintenance.
+
+Threads have no owner column, so anonymous turns (no user_email) are neither
+remembered nor given recall. Messages from before this was enabled are not
+indexed.
+"""
+import asyncio
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import MEMORY_SEARCH_LATENCY
+from app.core.vector_index import VectorIndex
+from app.models import Message, Thread
+from app.services.embeddings import get_embedder
+
+logger = logging.getLogger(__name__)
+
+_memory: Optional[VectorIndex] = None
+_memory_lock = threading.Lock() # First use may come from several worker threads at once
+_training: Optional[asyncio.Task] = None
+
+
+def get_memory_index() -> VectorIndex:
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            settings = get_settings()
+            embedder = get_embedder()
+            path = Path(settings.MEMORY_DIR) / f"{embedder.name}-{embedder.dim}"
+            _memory = VectorIndex(str(path), embedder.dim, probes=settings.MEMORY_IVF_PROBES)
+    return _memory
+
+
+# The index does file I/O and takes an flock shared by all workers, so its calls
+# run in worker threads, never on the event loop (VectorIndex locks its own state)
+
+def _add(user_email: str, message_ids: List[int], vectors) -> VectorIndex:
+    index = get_memory_index()
+    index.add(user_email, message_ids, vectors)
+    return index
+
+
+def _search(user_email: str, vector, k: int) -> List[Tuple[int, float]]:
+    started = time.perf_counter()
+    hits = get_memory_index().search(user_email, vector, k)
+    MEMORY_SEARCH_LATENCY.observe(time.perf_counter() - started)
+    return hits
+
+
+async def _embed(texts: List[str]):
+    embedder = get_embedder()
+    if hasattr(embedder, "aembed"):
+        return await embedder.aembed(texts)
+    return embedder.embed(texts)
+
+
+async def _train(index: VectorIndex):
+    try:
+        await asyncio.to_thread(index.train)
+    except Exception as e:
+        logger.warning(f"Memory index training failed: {e}")
+
+
+async def remember(user_email: Optional[str], messages: Iterable[Tuple[int, str]]):
+    """Index (message id, content) pairs for the user. Best effort: never fails the turn."""
+    messages = [(message_id, content) for message_id, content in messages if content and content.strip()]
+    if not get_settings().MEMORY_ENABLED or not user_email or not messages:
+        return
+    try:
+        vectors = await _embed([content for _, content in messages])
+        index = await asyncio.to_thread(_add, user_email, [message_id for message_id, _ in messages], vectors)
+    except Exception as e:
+        logger.warning(f"Could not index messages for {user_email}: {e}")
+        return
+
+    global _training
+    if index.needs_training and (_training is None or _training.done()):
+        _training = asyncio.create_task(_train(index))
+
+
+async def recall(db: AsyncSession, user_email: Optional[str], query: str, exclude: Iterable[str] = ()) -> List[Dict]:
+    """
+    The user's earlier messages most similar to `query`, best first, as
+    {"thread_id", "thread_title", "role", "content", "score"}. Messages whose
+    content is in `exclude` (what the prompt already carries) are skipped.
+    """
+    settings = get_settings()
+    if not settings.MEMORY_ENABLED or not user_email or not query.strip():
+        return []
+    try:
+        vector = (await _embed([query]))[0]
+        # A few spare hits, as some are excluded or deleted
+        hits = await asyncio.to_thread(_search, user_email, vector, settings.MEMORY_TOP_K * 2 + 4)
+    except Exception as e:
+        logger.warning(f"Memory recall failed for {user_email}: {e}")
+        return []
+
+    hits = [(message_id, score) for message_id, score in hits if score >= settings.MEMORY_MIN_SCORE]
+    if not hits:
+        return []
+    result = await db.execute(
+        select(Message.id, Message.thread_id, Message.role, Message.content, Thread.title)
+        .join(Thread, Thread.id == Message.thread_id)
+        .where(Message.id.in_([message_id for message_id, _ in hits]), Thread.deleted_at.is_(None))
+    )
+    rows = {row.id: row for row in result}
+
+    excluded = set(exclude)
+    snippets = []
+    for message_id, score in hits:
+        row = rows.get(message_id)
+        if row is None or row.content in excluded:
+            continue
+        excluded.add(row.content)  # The same text said twice is one memory
+        snippets.append({
+            "thread_id": row.thread_id, "thread_title": row.title, "role": row.role,
+            "content": row.content, "score": round(score, 3),
+        })
+        if len(snippets) == settings.MEMORY_TOP_K:
+            break
+    return snippets
+
+
+def format_memories(snippets: List[Dict]) -> str:
+    """System prompt section for recalled snippets; empty when there are none."""
+    if not snippets:
+        return ""
+    limit = get_settings().MEMORY_SNIPPET_CHARS
+    lines = []
+    for s in snippets:
+        content = " ".join(s["content"].split())
+        if len(content) > limit:
+            content = content[:limit - 1] + "…"
+        lines.append(f'- [{s["thread_title"] or "Untitled"}] {s["role"]}: {content}')
+    return "\n\nPossibly relevant excerpts from the user's earlier conversations:\n" + "\n".join(lines)
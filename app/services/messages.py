@@ -0,0 +1,37 @@
+import re
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.models import Message, Thread
+
+PREVIEW_LENGTH = 120
+
+
+def message_preview(content: str) -> str:
+    """Single-line, truncated version of a message for the thread list."""
+    text = re.sub(r"\s+", " ", content or "").strip()
+    return text if len(text) <= PREVIEW_LENGTH else text[:PREVIEW_LENGTH - 1] + "…"
+
+
+async def record_message(db: AsyncSession, thread_id: str, role: str, content: str) -> Message:
+    """
+    Add a message and update the thread's denormalized counters in the same
+    transaction. The caller commits. The count is incremented in SQL, so
+    concurrent inserts into one thread don't lose updates.
+    """
+    message = Message(thread_id=thread_id, role=role, content=content)
+    db.add(message)
+    await db.execute(
+        update(Thread)
+        .where(Thread.id == thread_id)
+        .values(
+            message_count=Thread.message_count + 1,
+            last_message_preview=message_preview(content),
+            last_activity_at=func.now(),
+            updated_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return message
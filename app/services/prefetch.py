@@ -0,0 +1,180 @@
+"""
+Speculative context prefetch for agent turns.
+
+A calendar question used to cost two waits in a row: the model call that
+decides to use a tool, then the Google round trips the tool makes (building
+the Calendar service, then listing events). When the user's message
+obviously concerns their calendar or tasks, agent_node and timekeeper_node
+now start fetching that context at the same time as the model call:
+
+- calendar: the Calendar service, the user's calendar ids, and their merged
+  events from the start of today (UTC) for PREFETCH_CALENDAR_DAYS days
+- tasks: the pending task list, as list_tasks returns it by default
+
+Results live in a Prefetch for that turn only, and the tools ask it first.
+A calendar read whose window falls inside the prefetched one filters the
+prefetched events instead of calling Google again. Writes in the turn
+(create_event, task changes) drop the matching entries, so a later read in
+the same turn sees the change. Fetches still running when the turn ends are
+cancelled.
+
+The inbox is not prefetched: no agent tool reads Gmail yet (Scribe is a
+placeholder), so it would only spend quota.
+"""
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+from app.config import get_settings
+from app.core.metrics import PREFETCH_RESULTS
+from app.database import AsyncSessionLocal
+from app.services.calendar_svc import get_user_calendar_ids, list_merged_events, parse_window_bound
+from app.services.google_svc import get_google_service
+from app.services.recurrence import event_end, event_start
+
+logger = logging.getLogger(__name__)
+
+_CALENDAR = re.compile(
+    r"\b(calendar|schedul\w*|free|busy|availab\w*|meetings?|events?|appointments?|agenda|"
+    r"today|tomorrow|tonight|this week|next week|weekend|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|\d{1,2}(:\d{2})?\s?(am|pm))\b",
+    re.IGNORECASE,
+)
+_TASKS = re.compile(r"\b(tasks?|to-?dos?|to do|deadlines?|due|backlog)\b", re.IGNORECASE)
+
+
+def likely_context(text: str) -> Set[str]:
+    """Which context a message obviously needs: "calendar" and/or "tasks"."""
+    kinds = set()
+    if _CALENDAR.search(text):
+        kinds.add("calendar")
+    if _TASKS.search(text):
+        kinds.add("tasks")
+    return kinds
+
+
+def last_user_text(messages: Sequence[Any]) -> str:
+    content = next((m.content for m in reversed(messages) if getattr(m, "type", "") == "human"), "")
+    return content if isinstance(content, str) else str(content)
+
+
+def _overlaps(event: dict, start: datetime, end: datetime) -> bool:
+    if "start" not in event or "end" not in event:
+        return True  # Cancelled occurrences; callers already skip them
+    return event_start(event) < end and event_end(event) > start
+
+
+class Prefetch:
+    def __init__(self, user_email: Optional[str], calendar_service=None):
+        self.user_email = user_email
+        self._calendar_service = calendar_service  # WebSocket sessions bring their own
+        self._fetchers: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._used: Set[str] = set()
+        self._window = None
+
+    def register(self, kind: str, fetch: Callable[[], Awaitable[Any]]):
+        """Make `fetch` available for prefetching as `kind` (e.g. the default task listing)."""
+        self._fetchers[kind] = fetch
+
+    def start(self, text: str) -> Set[str]:
+        """Start fetching what `text` is likely to need; returns the kinds started."""
+        if not self.user_email or not get_settings().PREFETCH_ENABLED:
+            return set()
+        kinds = likely_context(text)
+        if "calendar" in kinds:
+            self.start_calendar()
+        for kind in kinds - {"calendar"}:
+            if kind in self._fetchers:
+                self._spawn(kind, self._fetchers[kind])
+        if kinds:
+            logger.debug(f"Prefetching {sorted(kinds)}")
+        return kinds
+
+    def start_calendar(self):
+        if not self.user_email or not get_settings().PREFETCH_ENABLED:
+            return
+        if self._calendar_service is None:
+            self._spawn("calendar_service", self._build_calendar_service)
+        self._spawn("calendar_ids", self._load_calendar_ids)
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._window = (today, today + timedelta(days=get_settings().PREFETCH_CALENDAR_DAYS))
+        self._spawn("calendar_events", self._fetch_window)
+
+    def _spawn(self, kind: str, fetch: Callable[[], Awaitable[Any]]):
+        if kind not in self._tasks:
+            self._tasks[kind] = asyncio.create_task(fetch())
+
+    async def _take(self, kind: str):
+        """(True, value) if `kind` was prefetched successfully, else (False, None)."""
+        task = self._tasks.get(kind)
+        if task is None:
+            PREFETCH_RESULTS.labels(kind, "miss").inc()
+            return False, None
+        self._used.add(kind)
+        try:
+            value = await task
+        except Exception as e:
+            logger.debug(f"Prefetch of {kind} failed, fetching again: {e}")
+            PREFETCH_RESULTS.labels(kind, "failed").inc()
+            return False, None
+        PREFETCH_RESULTS.labels(kind, "hit").inc()
+        return True, value
+
+    async def get(self, kind: str, fetch: Callable[[], Awaitable[Any]]):
+        """The prefetched `kind` if there is one, else the result of `fetch()`."""
+        found, value = await self._take(kind)
+        return value if found else await fetch()
+
+    def invalidate(self, kind: str):
+        """Forget `kind` after a write, so later reads in this turn fetch fresh."""
+        task = self._tasks.pop(kind, None)
+        if task is not None and not task.done():
+            task.cancel()
+        self._used.add(kind)
+        if kind == "calendar_events":
+            self._window = None
+
+    async def close(self):
+        for kind, task in self._tasks.items():
+            if not task.done():
+                task.cancel()
+            if kind not in self._used:
+                PREFETCH_RESULTS.labels(kind, "wasted").inc()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    # Calendar
+
+    async def _build_calendar_service(self):
+        async with AsyncSessionLocal() as db:
+            return await get_google_service(self.user_email, db, "calendar", "v3")
+
+    async def _load_calendar_ids(self) -> List[str]:
+        async with AsyncSessionLocal() as db:
+            return await get_user_calendar_ids(self.user_email, db)
+
+    async def _fetch_window(self) -> List[dict]:
+        self._used.update(("calendar_service", "calendar_ids"))
+        service = self._calendar_service or await self._tasks["calendar_service"]
+        calendar_ids = await self._tasks["calendar_ids"]
+        start, end = (bound.isoformat().replace("+00:00", "Z") for bound in self._window)
+        return await list_merged_events(service, calendar_ids, start, end, self.user_email)
+
+    async def calendar_service(self):
+        if self._calendar_service is None:
+            self._calendar_service = await self.get("calendar_service", self._build_calendar_service)
+        return self._calendar_service
+
+    async def calendar_events(self, time_min: str, time_max: str) -> List[dict]:
+        """The user's merged events for the window, from the prefetched window when it covers it."""
+        start, end = parse_window_bound(time_min), parse_window_bound(time_max)
+        if self._window and start and end and self._window[0] <= start and end <= self._window[1]:
+            found, events = await self._take("calendar_events")
+            if found:
+                return [e for e in events if _overlaps(e, start, end)]
+        service = await self.calendar_service()
+        calendar_ids = await self.get("calendar_ids", self._load_calendar_ids)
+        return await list_merged_events(service, calendar_ids, time_min, time_max, self.user_email)
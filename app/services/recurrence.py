@@ -0,0 +1,256 @@
+"""
+Local expansion of recurring Google Calendar events.
+
+Listing with `singleEvents=False` returns one payload per series (the master,
+carrying RRULE/EXDATE lines) plus the individual exceptions, instead of one
+payload per occurrence. The helpers here turn that compact form back into the
+same start-ordered instance list `singleEvents=True` would have produced, but
+only for the requested window and only as the caller consumes it.
+"""
+import heapq
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from zoneinfo import ZoneInfo
+
+from dateutil.rrule import rruleset, rrulestr
+
+
+def parse_event_time(value: dict) -> datetime:
+    """Parse a Google `start`/`end` object into an aware UTC datetime."""
+    if "dateTime" in value:
+        parsed = datetime.fromisoformat(value["dateTime"])
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+    # All-day events only carry a date; treat them as starting at UTC midnight
+    return datetime.fromisoformat(value["date"]).replace(tzinfo=timezone.utc)
+
+
+def event_start(event: dict) -> datetime:
+    return parse_event_time(event["start"])
+
+
+def event_end(event: dict) -> datetime:
+    return parse_event_time(event["end"])
+
+
+def _is_all_day(event: dict) -> bool:
+    return "date" in event["start"]
+
+
+def _to_utc(value: datetime) -> datetime:
+    # All-day occurrences are naive; they share parse_event_time's UTC-midnight convention
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _series_dtstart(master: dict) -> datetime:
+    start = master["start"]
+    if "date" in start:
+        return datetime.combine(date.fromisoformat(start["date"]), datetime.min.time())
+
+    dtstart = datetime.fromisoformat(start["dateTime"])
+    if dtstart.tzinfo is None:
+        dtstart = dtstart.replace(tzinfo=timezone.utc)
+    # Expand in the series' own zone so occurrences keep their wall-clock time across DST
+    if start.get("timeZone"):
+        dtstart = dtstart.astimezone(ZoneInfo(start["timeZone"]))
+    return dtstart
+
+
+def _parse_date_list(line: str, dtstart: datetime) -> List[datetime]:
+    """Parse an EXDATE/RDATE content line into datetimes comparable with the series."""
+    params, _, values = line.partition(":")
+    params = params.split(";")[1:]
+    tzid = next((p.split("=", 1)[1] for p in params if p.startswith("TZID=")), None)
+    is_date = "VALUE=DATE" in params
+
+    parsed = []
+    for raw in values.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        if is_date or len(raw) == 8:
+            value = datetime.strptime(raw[:8], "%Y%m%d")
+            if dtstart.tzinfo is not None:
+                value = value.replace(tzinfo=dtstart.tzinfo)
+        else:
+            value = datetime.strptime(raw.rstrip("Z"), "%Y%m%dT%H%M%S")
+            if raw.endswith("Z"):
+                value = value.replace(tzinfo=timezone.utc)
+            elif tzid:
+                value = value.replace(tzinfo=ZoneInfo(tzid))
+            elif dtstart.tzinfo is not None:
+                value = value.replace(tzinfo=dtstart.tzinfo)
+        if dtstart.tzinfo is None:
+            value = value.replace(tzinfo=None)
+        parsed.append(value)
+    return parsed
+
+
+def _normalize_rrule(line: str, dtstart: datetime) -> str:
+    """dateutil insists on a UTC UNTIL for aware series; Google occasionally sends a floating one."""
+    if "UNTIL=" not in line:
+        return line
+    if dtstart.tzinfo is None:
+        # ...and a floating one for all-day series, which get a UTC one just as often
+        return re.sub(r"(UNTIL=\d{8}(T\d{6})?)Z", r"\1", line)
+
+    parts = line.split(";")
+    for i, part in enumerate(parts):
+        if not part.startswith("UNTIL=") or part.endswith("Z"):
+            continue
+        raw = part[len("UNTIL="):]
+        if len(raw) == 8:
+            # Date-only UNTIL: the series runs through the end of that local day
+            local = datetime.strptime(raw, "%Y%m%d").replace(tzinfo=dtstart.tzinfo) + timedelta(days=1, seconds=-1)
+        else:
+            local = datetime.strptime(raw, "%Y%m%dT%H%M%S").replace(tzinfo=dtstart.tzinfo)
+        parts[i] = "UNTIL=" + local.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return ";".join(parts)
+
+
+_PERIOD_DAYS = {"DAILY": 1, "WEEKLY": 7}
+_PERIOD_MONTHS = {"MONTHLY": 1, "YEARLY": 12}
+
+
+def _fast_forward(line: str, dtstart: datetime, not_before: datetime) -> datetime:
+    """
+    A later DTSTART from which `line` generates the same occurrences on or after
+    `not_before`: a whole number of rule periods after the real one (less one,
+    to keep the period `not_before` falls in), in the series' wall-clock time.
+    dateutil always iterates from DTSTART, so without this an old daily series
+    costs one step per day of its age. COUNT rules, and monthly/yearly ones
+    anchored past the 28th, depend on the real start and keep it.
+    """
+    params = dict(p.split("=", 1) for p in line.partition(":")[2].split(";") if "=" in p)
+    if "COUNT" in params:
+        return dtstart
+    freq = params.get("FREQ")
+    interval = int(params.get("INTERVAL", "1"))
+    if dtstart.tzinfo is None:
+        begin = _to_utc(not_before).replace(tzinfo=None)
+    else:
+        begin = not_before.astimezone(dtstart.tzinfo)
+
+    if freq in _PERIOD_DAYS:
+        step = interval * _PERIOD_DAYS[freq]
+        periods = (begin.replace(tzinfo=None) - dtstart.replace(tzinfo=None)).days // step - 1
+        if periods > 0:
+            return dtstart + timedelta(days=periods * step)
+    elif freq in _PERIOD_MONTHS and dtstart.day <= 28:
+        step = interval * _PERIOD_MONTHS[freq]
+        periods = ((begin.year - dtstart.year) * 12 + begin.month - dtstart.month) // step - 1
+        if periods > 0:
+            month = dtstart.month - 1 + periods * step
+            return dtstart.replace(year=dtstart.year + month // 12, month=month % 12 + 1)
+    return dtstart
+
+
+def build_rruleset(master: dict, not_before: Optional[datetime] = None) -> rruleset:
+    """The series' occurrences; with `not_before`, ones before it may be left out."""
+    dtstart = _series_dtstart(master)
+    rules = rruleset()
+    for line in master.get("recurrence", []):
+        if line.startswith("RRULE"):
+            line = _normalize_rrule(line, dtstart)
+            rule_start = _fast_forward(line, dtstart, not_before) if not_before else dtstart
+            rules.rrule(rrulestr(line, dtstart=rule_start))
+        elif line.startswith("RDATE"):
+            for value in _parse_date_list(line, dtstart):
+                rules.rdate(value)
+        elif line.startswith("EXDATE"):
+            for value in _parse_date_list(line, dtstart):
+                rules.exdate(value)
+    # The first instance is always DTSTART, even if the rule itself would skip it
+    rules.rdate(dtstart)
+    return rules
+
+
+def _instance_id(master: dict, original: datetime) -> str:
+    # Matches the ids Google assigns to server-expanded instances
+    if _is_all_day(master):
+        return f"{master['id']}_{original.strftime('%Y%m%d')}"
+    return f"{master['id']}_{_to_utc(original).strftime('%Y%m%dT%H%M%SZ')}"
+
+
+def _make_instance(master: dict, occurrence: datetime, duration: timedelta) -> dict:
+    instance = {k: v for k, v in master.items() if k != "recurrence"}
+    instance["id"] = _instance_id(master, occurrence)
+    instance["recurringEventId"] = master["id"]
+
+    if _is_all_day(master):
+        start = {"date": occurrence.date().isoformat()}
+        end = {"date": (occurrence + duration).date().isoformat()}
+    else:
+        time_zone = master["start"].get("timeZone")
+        start = {"dateTime": occurrence.isoformat()}
+        end = {"dateTime": (occurrence + duration).isoformat()}
+        if time_zone:
+            start["timeZone"] = end["timeZone"] = time_zone
+    instance["start"] = start
+    instance["end"] = end
+    instance["originalStartTime"] = dict(start)
+    return instance
+
+
+def expand_series(
+    master: dict,
+    window_start: datetime,
+    window_end: datetime,
+    overridden: Optional[Set[datetime]] = None
+) -> Iterator[dict]:
+    """
+    Lazily yield the occurrences of one series that overlap [window_start, window_end),
+    in start order. Occurrences whose original start is in `overridden` (UTC) are
+    skipped because an exception replaces or cancels them.
+    """
+    overridden = overridden or set()
+    duration = parse_event_time(master["end"]) - parse_event_time(master["start"])
+
+    for occurrence in build_rruleset(master, not_before=window_start - duration):
+        start_utc = _to_utc(occurrence)
+        if start_utc >= window_end:
+            return
+        if start_utc + duration <= window_start:
+            continue
+        if start_utc in overridden:
+            continue
+        yield _make_instance(master, occurrence, duration)
+
+
+def _overlaps(event: dict, window_start: datetime, window_end: datetime) -> bool:
+    return event_start(event) < window_end and event_end(event) > window_start
+
+
+def expand_events(items: Iterable[dict], window_start: datetime, window_end: datetime) -> Iterator[dict]:
+    """
+    Turn a `singleEvents=False` listing (series masters, exceptions and one-off
+    events) into a start-ordered stream of concrete events for the window.
+    """
+    singles: List[dict] = []
+    masters: List[dict] = []
+    overridden: Dict[str, Set[datetime]] = {}
+
+    for item in items:
+        if item.get("recurrence"):
+            masters.append(item)
+            continue
+        if item.get("recurringEventId") and item.get("originalStartTime"):
+            # Exception: it replaces (or, when cancelled, removes) one generated occurrence
+            original = parse_event_time(item["originalStartTime"])
+            overridden.setdefault(item["recurringEventId"], set()).add(original)
+        if item.get("status") == "cancelled":
+            continue
+        if _overlaps(item, window_start, window_end):
+            singles.append(item)
+
+    singles.sort(key=event_start)
+    streams = [singles] + [
+        expand_series(master, window_start, window_end, overridden.get(master["id"]))
+        for master in masters
+        if master.get("status") != "cancelled"
+    ]
+    return heapq.merge(*streams, key=event_start)
@@ -0,0 +1,230 @@
+"""
+Deterministic task-to-calendar scheduler used by the Strategist.
+
+Tasks are placed greedily in earliest-deadline-first order (ties broken by
+priority, then by length) into the earliest free slot that fits. Free slots
+are working hours minus calendar busy time and recurring personal blocks
+such as the gym. No LLM is involved, so a few hundred tasks plan in
+milliseconds; a time budget caps the worst case.
+"""
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, time as dtime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+Interval = Tuple[datetime, datetime]
+
+DEFAULT_DURATION_MINUTES = 30
+WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+
+@dataclass
+class SchedulableTask:
+    id: int
+    title: str
+    duration: timedelta
+    due: Optional[datetime] = None  # aware UTC
+    priority: int = 0  # higher is more important
+
+
+@dataclass
+class RecurringBlock:
+    weekdays: List[int]
+    start: dtime
+    duration: timedelta
+
+
+@dataclass
+class Preferences:
+    tz: ZoneInfo = field(default_factory=lambda: ZoneInfo("UTC"))
+    work_start: dtime = dtime(9, 0)
+    work_end: dtime = dtime(18, 0)
+    work_days: List[int] = field(default_factory=lambda: [0, 1, 2, 3, 4])
+    blocks: List[RecurringBlock] = field(default_factory=list)
+
+
+def _parse_clock(value: str) -> dtime:
+    value = value.strip().upper()
+    for fmt in ("%I:%M %p", "%I %p", "%I:%M%p", "%I%p", "%H:%M"):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised time: {value}")
+
+
+def _parse_weekdays(value: str) -> List[int]:
+    tokens = re.split(r"[,\s/&]+|\band\b", value.lower())
+    if "daily" in tokens or "everyday" in tokens:
+        return list(range(7))
+    if "weekdays" in tokens:
+        return [0, 1, 2, 3, 4]
+    return sorted({WEEKDAYS[t[:3]] for t in tokens if t[:3] in WEEKDAYS})
+
+
+def parse_recurring_block(spec: str, duration_minutes: int = 60) -> Optional[RecurringBlock]:
+    """Parse strings like 'Mon, Wed, Fri at 7:00 AM' from user_preferences."""
+    if not spec or " at " not in spec:
+        return None
+    days, _, clock = spec.partition(" at ")
+    weekdays = _parse_weekdays(days)
+    if not weekdays:
+        return None
+    return RecurringBlock(weekdays, _parse_clock(clock), timedelta(minutes=duration_minutes))
+
+
+def parse_preferences(user_preferences: Dict[str, Any]) -> Preferences:
+    """Build scheduling constraints from the `user_preferences` section of config.yaml."""
+    prefs = Preferences()
+    if user_preferences.get("timezone"):
+        prefs.tz = ZoneInfo(user_preferences["timezone"])
+    if user_preferences.get("work_hours"):
+        start, _, end = str(user_preferences["work_hours"]).partition("-")
+        prefs.work_start, prefs.work_end = _parse_clock(start), _parse_clock(end)
+    if user_preferences.get("work_days"):
+        prefs.work_days = _parse_weekdays(str(user_preferences["work_days"]))
+
+    gym = parse_recurring_block(
+        user_preferences.get("gym_schedule", ""),
+        int(user_preferences.get("gym_duration_minutes", 60))
+    )
+    if gym:
+        prefs.blocks.append(gym)
+    return prefs
+
+
+def _local_interval(day, start: dtime, end: dtime, tz: ZoneInfo) -> Interval:
+    local_start = datetime.combine(day, start, tzinfo=tz)
+    local_end = datetime.combine(day, end, tzinfo=tz)
+    return local_start.astimezone(timezone.utc), local_end.astimezone(timezone.utc)
+
+
+def _merge(intervals: List[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def build_free_slots(
+    window_start: datetime,
+    window_end: datetime,
+    busy: Sequence[Interval],
+    prefs: Preferences,
+    min_minutes: int = 15
+) -> List[Interval]:
+    """Working hours within the window, minus busy time and personal blocks."""
+    working: List[Interval] = []
+    blocked: List[Interval] = list(busy)
+
+    day = window_start.astimezone(prefs.tz).date()
+    last_day = window_end.astimezone(prefs.tz).date()
+    while day <= last_day:
+        weekday = day.weekday()
+        if weekday in prefs.work_days:
+            working.append(_local_interval(day, prefs.work_start, prefs.work_end, prefs.tz))
+        for block in prefs.blocks:
+            if weekday in block.weekdays:
+                start = datetime.combine(day, block.start, tzinfo=prefs.tz).astimezone(timezone.utc)
+                blocked.append((start, start + block.duration))
+        day += timedelta(days=1)
+
+    blocked = _merge(blocked)
+    minimum = timedelta(minutes=min_minutes)
+    slots: List[Interval] = []
+    b = 0
+    for work_start, work_end in working:
+        cursor = max(work_start, window_start)
+        work_end = min(work_end, window_end)
+        # Blocked intervals are sorted, so skip those that end before this day
+        while b < len(blocked) and blocked[b][1] <= cursor:
+            b += 1
+        i = b
+        while i < len(blocked) and blocked[i][0] < work_end:
+            if blocked[i][0] - cursor >= minimum:
+                slots.append((cursor, blocked[i][0]))
+            cursor = max(cursor, blocked[i][1])
+            i += 1
+        if work_end - cursor >= minimum:
+            slots.append((cursor, work_end))
+    return slots
+
+
+def _task_order(task: SchedulableTask):
+    due = task.due.timestamp() if task.due else float("inf")
+    return (due, -task.priority, -task.duration.total_seconds(), task.id)
+
+
+def schedule_tasks(
+    tasks: Sequence[SchedulableTask],
+    busy: Sequence[Interval],
+    window_start: datetime,
+    window_end: datetime,
+    prefs: Optional[Preferences] = None,
+    time_budget_ms: float = 50.0
+) -> Dict[str, Any]:
+    """
+    Produce a time-blocked plan. Returns a JSON-serialisable dict suitable for
+    `AgentState.proposed_plan`. Tasks that cannot meet their due date are still
+    placed if possible, flagged as `late`.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    prefs = prefs or Preferences()
+
+    slots = build_free_slots(window_start, window_end, busy, prefs)
+    blocks, unscheduled = [], []
+    budget_exhausted = False
+
+    ordered = sorted(tasks, key=_task_order)
+    for n, task in enumerate(ordered):
+        if time.perf_counter() > deadline:
+            budget_exhausted = True
+            unscheduled.extend(
+                {"task_id": t.id, "title": t.title, "reason": "time_budget"} for t in ordered[n:]
+            )
+            break
+
+        # First fit: slots are in time order, so the first one that is long
+        # enough finishes earliest; if it misses the due date, every other would too
+        index = next((i for i, (s, e) in enumerate(slots) if e - s >= task.duration), None)
+        if index is None:
+            unscheduled.append({"task_id": task.id, "title": task.title, "reason": "no_slot"})
+            continue
+
+        slot_start, slot_end = slots[index]
+        end = slot_start + task.duration
+        late = task.due is not None and end > task.due
+        blocks.append({
+            "task_id": task.id,
+            "title": task.title,
+            "start": slot_start.isoformat(),
+            "end": end.isoformat(),
+            "late": late,
+        })
+        # Shrink the slot from the front; drop it once too small to be useful
+        if slot_end - end >= timedelta(minutes=15):
+            slots[index] = (end, slot_end)
+        else:
+            del slots[index]
+
+    blocks.sort(key=lambda b: b["start"])
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "window": {"start": window_start.isoformat(), "end": window_end.isoformat()},
+        "blocks": blocks,
+        "unscheduled": unscheduled,
+        "stats": {
+            "tasks": len(tasks),
+            "scheduled": len(blocks),
+            "late": sum(1 for b in blocks if b["late"]),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+            "budget_exhausted": budget_exhausted,
+        },
+    }
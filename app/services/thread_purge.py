@@ -0,0 +1,99 @@
+"""
+Background removal of soft-deleted threads.
+
+Deleting a thread with many messages in one statement holds locks and can
+run for a long time, so large deletes only set `threads.deleted_at` and the
+ThreadPurger removes the messages in small batches, then the thread row.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import delete, select
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import Message, Thread
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_thread(thread_id: str, batch_size: int) -> int:
+    """Delete a thread's messages `batch_size` at a time, then the thread. Returns messages removed."""
+    removed = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            batch = select(Message.id).where(Message.thread_id == thread_id).limit(batch_size)
+            result = await db.execute(delete(Message).where(Message.id.in_(batch)))
+            await db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            break
+        await asyncio.sleep(0)  # Let request handlers in between batches
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Thread).where(Thread.id == thread_id))
+        await db.commit()
+    return removed
+
+
+async def purge_deleted_threads(batch_size: int) -> int:
+    """Purge every soft-deleted thread. Returns the number of threads removed."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Thread.id).where(Thread.deleted_at.is_not(None)))
+        thread_ids = result.scalars().all()
+
+    for thread_id in thread_ids:
+        removed = await purge_thread(thread_id, batch_size)
+        logger.info(f"Purged thread {thread_id} ({removed} messages)")
+    return len(thread_ids)
+
+
+class ThreadPurger:
+    """Runs purge_deleted_threads every `interval_seconds`, or right away after wake()."""
+
+    def __init__(self, batch_size: int = 1000, interval_seconds: float = 300.0):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self):
+        self._wake.set()
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await purge_deleted_threads(self.batch_size)
+            except Exception as e:
+                logger.error(f"Thread purge failed, will retry: {type(e).__name__}: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="thread-purger")
+            self.wake()  # Finish anything left over from before a restart
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_purger: Optional[ThreadPurger] = None
+
+
+def get_thread_purger() -> ThreadPurger:
+    global _purger
+    if _purger is None:
+        settings = get_settings()
+        _purger = ThreadPurger(settings.THREAD_PURGE_BATCH_SIZE, settings.THREAD_PURGE_INTERVAL_SECONDS)
+    return _purger
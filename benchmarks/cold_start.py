@@ -0,0 +1,118 @@
+"""
+Cold-start benchmark: how long a fresh worker takes to import the app and to
+serve its first request. Exits non-zero when a threshold is exceeded or a
+heavy SDK is imported eagerly again, so it can gate CI.
+
+    python -m benchmarks.cold_start --runs 5 --max-import-ms 1500 --max-first-request-ms 3000
+
+Each run is a fresh interpreter. The first-request measurement starts
+uvicorn and polls /healthz, so it includes the lifespan but not the
+background health probes.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Must only be imported on first use (see app/agents/graph.py, app/services/google_svc.py)
+LAZY_MODULES = [
+    "langchain_google_genai",
+    "langgraph",
+    "googleapiclient.discovery",
+    "google_auth_oauthlib",
+]
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+eager = [m for m in {modules!r} if m in sys.modules]
+print(f"{{elapsed:.1f}}|{{','.join(eager)}}")
+"""
+
+
+def _env():
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    # Fail database probes fast instead of waiting on DNS for the compose host name
+    env.setdefault("POSTGRES_SERVER", "127.0.0.1")
+    return env
+
+
+def measure_import():
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(modules=LAZY_MODULES)],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    elapsed, _, eager = out.partition("|")
+    return float(elapsed), [m for m in eager.split(",") if m]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_request(timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as r:
+                    if r.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No response from /healthz within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=1500.0)
+    parser.add_argument("--max-first-request-ms", type=float, default=3000.0)
+    args = parser.parse_args()
+
+    imports, first_requests, eager = [], [], set()
+    for _ in range(args.runs):
+        elapsed, loaded = measure_import()
+        imports.append(elapsed)
+        eager.update(loaded)
+        first_requests.append(measure_first_request())
+
+    import_p50 = statistics.median(imports)
+    first_p50 = statistics.median(first_requests)
+    print(f"import app.main      p50 {import_p50:8.1f} ms   max {max(imports):8.1f} ms")
+    print(f"first /healthz 200   p50 {first_p50:8.1f} ms   max {max(first_requests):8.1f} ms")
+
+    failures = []
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(sorted(eager))}")
+    if import_p50 > args.max_import_ms:
+        failures.append(f"import p50 {import_p50:.0f} ms > {args.max_import_ms:.0f} ms")
+    if first_p50 > args.max_first_request_ms:
+        failures.append(f"first request p50 {first_p50:.0f} ms > {args.max_first_request_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
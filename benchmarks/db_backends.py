@@ -0,0 +1,96 @@
+"""
+Chat-turn persistence latency on SQLite vs PostgreSQL.
+
+A turn mirrors the /chat endpoint's database work: record the user message
+and commit, load the thread history, record the assistant reply and commit.
+
+    python -m benchmarks.db_backends --turns 200 --backends sqlite sqlite-untuned postgres
+
+`sqlite` uses a scratch file with the app's pragmas (WAL etc.), `sqlite-untuned`
+the same file layout with SQLite defaults. `postgres` uses the configured
+POSTGRES_* database, which must be migrated; its rows are removed afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, SQLALCHEMY_DATABASE_URL, _postgres_url, _sqlite_url, make_engine, settings
+from app.models import Message, Thread
+from app.services.messages import record_message
+
+
+async def run_turns(engine, turns: int, create_schema: bool):
+    if create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    thread_id = str(uuid.uuid4())
+    async with Session() as db:
+        db.add(Thread(id=thread_id, title="benchmark"))
+        await db.commit()
+
+    samples = []
+    try:
+        for i in range(turns):
+            started = time.perf_counter()
+            async with Session() as db:
+                await record_message(db, thread_id, "user", f"question {i}")
+                await db.commit()
+                result = await db.execute(
+                    select(Message).where(Message.thread_id == thread_id).order_by(Message.created_at.asc())
+                )
+                result.scalars().all()
+                await record_message(db, thread_id, "assistant", f"answer {i} " * 20)
+                await db.commit()
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        async with Session() as db:
+            await db.execute(delete(Message).where(Message.thread_id == thread_id))
+            await db.execute(delete(Thread).where(Thread.id == thread_id))
+            await db.commit()
+        await engine.dispose()
+    return samples
+
+
+def report(name: str, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<16}{statistics.median(samples):>10.2f}{p95:>10.2f}{samples[-1]:>10.2f}")
+
+
+async def main_async(args):
+    print(f"{'backend':<16}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}   ({args.turns} turns)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            if backend == "sqlite":
+                engine = make_engine(_sqlite_url(Path(tmp, "tuned.db")))
+                samples = await run_turns(engine, args.turns, create_schema=True)
+            elif backend == "sqlite-untuned":
+                engine = create_async_engine(_sqlite_url(Path(tmp, "untuned.db")))
+                samples = await run_turns(engine, args.turns, create_schema=True)
+            elif backend == "postgres":
+                url = SQLALCHEMY_DATABASE_URL if settings.DB_BACKEND == "postgres" else _postgres_url(settings.POSTGRES_SERVER)
+                samples = await run_turns(make_engine(url), args.turns, create_schema=False)
+            else:
+                raise SystemExit(f"Unknown backend: {backend}")
+            report(backend, samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=["sqlite", "sqlite-untuned"])
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
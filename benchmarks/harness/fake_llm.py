@@ -0,0 +1,169 @@
+"""
+Offline stand-in for ChatGoogleGenerativeAI.
+
+Enable it in the app with CHAT_MODEL_CLASS=benchmarks.harness.fake_llm:FakeChatModel.
+Behaviour is configured through environment variables so a server started
+by the load driver can be tuned from its command line:
+
+    FAKE_LLM_LATENCY_MS         time to first token (default 300)
+    FAKE_LLM_TOKENS_PER_SECOND  generation speed after the first token (default 80)
+    FAKE_LLM_RESPONSE_TOKENS    length of plain-text answers (default 60)
+    FAKE_LLM_ERROR_RATE         fraction of calls failing with 429 ResourceExhausted (default 0)
+    FAKE_LLM_TOOL_CALL_RATE     chance of calling a bound tool before answering (default 0.5)
+    FAKE_LLM_TOOL_CALLS         JSON {tool name: args}; "{now}" / "{now+7d}" expand to ISO times
+    FAKE_LLM_ROUTE              worker a forced routing choice picks first (default Timekeeper)
+
+Forced tool choice (with_structured_output) is answered from the schema, so
+the Supervisor routes to FAKE_LLM_ROUTE once and then to FINISH.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional
+
+from google.api_core.exceptions import ResourceExhausted
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+DEFAULT_TOOL_CALLS = {
+    "check_availability": {"time_min": "{now}", "time_max": "{now+7d}"},
+    "list_tasks": {},
+}
+WORDS = "the quick brown fox schedules a focused block before lunch and then reviews the inbox".split()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _expand(value: Any) -> Any:
+    """Resolve "{now}" and "{now+Nd}" placeholders in tool call arguments."""
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    if isinstance(value, str):
+        match = re.fullmatch(r"\{now(?:\+(\d+)d)?\}", value)
+        if match:
+            moment = datetime.now(timezone.utc) + timedelta(days=int(match.group(1) or 0))
+            return moment.isoformat().replace("+00:00", "Z")
+    return value
+
+
+class FakeChatModel(BaseChatModel):
+    # Accepted for signature compatibility with ChatGoogleGenerativeAI
+    model: str = "fake"
+    google_api_key: Optional[str] = None
+    temperature: float = 0.0
+    max_retries: int = 0
+
+    latency_ms: float = Field(default_factory=lambda: _env_float("FAKE_LLM_LATENCY_MS", 300))
+    tokens_per_second: float = Field(default_factory=lambda: _env_float("FAKE_LLM_TOKENS_PER_SECOND", 80))
+    response_tokens: int = Field(default_factory=lambda: int(_env_float("FAKE_LLM_RESPONSE_TOKENS", 60)))
+    error_rate: float = Field(default_factory=lambda: _env_float("FAKE_LLM_ERROR_RATE", 0))
+    tool_call_rate: float = Field(default_factory=lambda: _env_float("FAKE_LLM_TOOL_CALL_RATE", 0.5))
+    tool_calls: Dict[str, Dict[str, Any]] = Field(
+        default_factory=lambda: json.loads(os.getenv("FAKE_LLM_TOOL_CALLS", "null")) or DEFAULT_TOOL_CALLS
+    )
+    route: str = Field(default_factory=lambda: os.getenv("FAKE_LLM_ROUTE", "Timekeeper"))
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], tool_choice=tool_choice, **kwargs)
+
+    # Response construction
+
+    def _maybe_fail(self):
+        if self.error_rate and random.random() < self.error_rate:
+            raise ResourceExhausted("Resource has been exhausted (e.g. check quota). [fake]")
+
+    def _forced_args(self, schema: Dict[str, Any], messages: List[BaseMessage]) -> Dict[str, Any]:
+        answered = any(isinstance(m, AIMessage) for m in messages)
+        args = {}
+        for name, prop in schema.get("properties", {}).items():
+            if "enum" in prop:
+                options = prop["enum"]
+                if answered and "FINISH" in options:
+                    args[name] = "FINISH"
+                else:
+                    args[name] = self.route if self.route in options else options[0]
+            else:
+                args[name] = {"string": "fake", "integer": 0, "number": 0, "boolean": False,
+                              "array": [], "object": {}}.get(prop.get("type"), None)
+        return args
+
+    def _respond(self, messages: List[BaseMessage], tools=None, tool_choice=None, **kwargs) -> AIMessage:
+        tools = tools or []
+        by_name = {t["function"]["name"]: t["function"] for t in tools}
+
+        if tool_choice and by_name:
+            # Structured output: exactly one call to the (only) schema tool
+            name = tool_choice if tool_choice in by_name else next(iter(by_name))
+            args = self._forced_args(by_name[name].get("parameters", {}), messages)
+            return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:8]}"}])
+
+        already_called = any(isinstance(m, ToolMessage) for m in messages)
+        candidates = [name for name in self.tool_calls if name in by_name]
+        if candidates and not already_called and random.random() < self.tool_call_rate:
+            name = random.choice(candidates)
+            return AIMessage(content="", tool_calls=[{
+                "name": name, "args": _expand(self.tool_calls[name]), "id": f"call_{uuid.uuid4().hex[:8]}"
+            }])
+
+        return AIMessage(content=" ".join(random.choice(WORDS) for _ in range(self.response_tokens)))
+
+    def _duration(self, message: AIMessage) -> float:
+        tokens = len(message.content.split()) if message.content else 8
+        return self.latency_ms / 1000 + tokens / self.tokens_per_second
+
+    # BaseChatModel interface
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._maybe_fail()
+        message = self._respond(messages, **kwargs)
+        time.sleep(self._duration(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._maybe_fail()
+        message = self._respond(messages, **kwargs)
+        await asyncio.sleep(self._duration(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _tool_call_chunk(message: AIMessage) -> ChatGenerationChunk:
+        return ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+            {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+            for i, c in enumerate(message.tool_calls)
+        ]))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        message = self._respond(messages, **kwargs)
+        time.sleep(self._duration(message))
+        if message.tool_calls:
+            yield self._tool_call_chunk(message)
+        else:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=message.content))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        message = self._respond(messages, **kwargs)
+        await asyncio.sleep(self.latency_ms / 1000)
+        if message.tool_calls:
+            yield self._tool_call_chunk(message)
+            return
+        delay = 1 / self.tokens_per_second
+        for i, word in enumerate(message.content.split()):
+            if i:
+                await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
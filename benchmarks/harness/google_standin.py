@@ -0,0 +1,137 @@
+"""
+Local HTTP stand-in for the Calendar v3 and Gmail v1 endpoints the app uses.
+
+Point the app at it with GOOGLE_API_ENDPOINT=http://127.0.0.1:<port>/ and
+serve it with the command below. The endpoint replaces each API's base URL,
+so Calendar paths are served at the root (/calendars/..., /users/me/...) and
+Gmail paths under /gmail/v1/, as the client library builds them.
+
+    uvicorn benchmarks.harness.google_standin:app --port 8900
+
+Events are generated deterministically per calendar and day, including a
+weekly recurring series, so listings look like real singleEvents=False
+responses. Tunables (environment):
+
+    STANDIN_LATENCY_MS       added to every response (default 80)
+    STANDIN_ERROR_RATE       fraction of requests answered with 429 (default 0)
+    STANDIN_EVENTS_PER_DAY   one-off events per calendar per day (default 4)
+    STANDIN_CALENDARS        number of calendars in calendarList (default 3)
+"""
+import asyncio
+import hashlib
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+LATENCY_MS = float(os.getenv("STANDIN_LATENCY_MS", "80"))
+ERROR_RATE = float(os.getenv("STANDIN_ERROR_RATE", "0"))
+EVENTS_PER_DAY = int(os.getenv("STANDIN_EVENTS_PER_DAY", "4"))
+CALENDARS = int(os.getenv("STANDIN_CALENDARS", "3"))
+
+app = FastAPI(title="Google API stand-in")
+
+
+@app.middleware("http")
+async def latency_and_errors(request: Request, call_next):
+    await asyncio.sleep(LATENCY_MS / 1000)
+    if ERROR_RATE and random.random() < ERROR_RATE:
+        return JSONResponse(status_code=429, content={"error": {
+            "code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Rate limit exceeded [stand-in]"
+        }})
+    return await call_next(request)
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _event(calendar_id: str, event_id: str, summary: str, start: datetime, minutes: int, **extra) -> dict:
+    return {
+        "kind": "calendar#event",
+        "id": event_id,
+        "iCalUID": f"{event_id}@standin",
+        "status": "confirmed",
+        "summary": summary,
+        "start": {"dateTime": _iso(start)},
+        "end": {"dateTime": _iso(start + timedelta(minutes=minutes))},
+        "organizer": {"email": calendar_id},
+        "htmlLink": f"https://calendar.google.com/event?eid={event_id}",
+        **extra,
+    }
+
+
+def _events_for_day(calendar_id: str, day: datetime) -> list:
+    events = []
+    for i in range(EVENTS_PER_DAY):
+        seed = int(hashlib.md5(f"{calendar_id}{day.date()}{i}".encode()).hexdigest()[:8], 16)
+        start = day.replace(hour=8 + seed % 10, minute=(seed // 10) % 4 * 15)
+        events.append(_event(calendar_id, f"e{seed:x}", f"Meeting {i}", start, 30 + 30 * (seed % 2)))
+    return events
+
+
+@app.get("/users/me/calendarList")
+async def calendar_list():
+    items = [{"id": "primary", "summary": "Primary", "primary": True, "accessRole": "owner"}]
+    items += [{"id": f"team{i}@standin", "summary": f"Team {i}", "accessRole": "reader"} for i in range(1, CALENDARS)]
+    return {"kind": "calendar#calendarList", "items": items}
+
+
+@app.get("/calendars/{calendar_id}/events")
+async def list_events(calendar_id: str, timeMin: str = None, timeMax: str = None):
+    now = datetime.now(timezone.utc)
+    window_start = _parse(timeMin) if timeMin else now
+    window_end = _parse(timeMax) if timeMax else window_start + timedelta(days=7)
+
+    day = window_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    items = []
+    while day < window_end:
+        items.extend(e for e in _events_for_day(calendar_id, day) if window_start <= _parse(e["start"]["dateTime"]) < window_end)
+        day += timedelta(days=1)
+
+    # One weekly series that started well before the window
+    series_start = (window_start - timedelta(days=28)).replace(hour=9, minute=0, second=0, microsecond=0)
+    items.append(_event(
+        calendar_id, "weekly" + hashlib.md5(calendar_id.encode()).hexdigest()[:8], "Weekly sync", series_start, 30,
+        recurrence=["RRULE:FREQ=WEEKLY"]
+    ))
+    return {"kind": "calendar#events", "summary": calendar_id, "timeZone": "UTC", "items": items}
+
+
+@app.post("/calendars/{calendar_id}/events")
+async def insert_event(calendar_id: str, request: Request):
+    body = await request.json()
+    event_id = uuid.uuid4().hex
+    return {**body, "id": event_id, "status": "confirmed", "htmlLink": f"https://calendar.google.com/event?eid={event_id}"}
+
+
+@app.delete("/calendars/{calendar_id}/events/{event_id}")
+async def delete_event(calendar_id: str, event_id: str):
+    return Response(status_code=204)
+
+
+@app.get("/gmail/v1/users/{user_id}/messages")
+async def list_messages(user_id: str, maxResults: int = 5, q: str = None):
+    return {"messages": [{"id": f"m{i}", "threadId": f"t{i}"} for i in range(maxResults)], "resultSizeEstimate": maxResults}
+
+
+@app.get("/gmail/v1/users/{user_id}/messages/{message_id}")
+async def get_message(user_id: str, message_id: str):
+    return {
+        "id": message_id,
+        "threadId": message_id.replace("m", "t"),
+        "labelIds": ["UNREAD", "INBOX"],
+        "snippet": "Quick question about tomorrow's plan",
+        "payload": {"headers": [
+            {"name": "Subject", "value": f"Status update {message_id}"},
+            {"name": "From", "value": "colleague@example.com"},
+            {"name": "Date", "value": datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000")},
+        ]},
+    }
@@ -0,0 +1,85 @@
+"""
+Benchmark the get_thread response path and response compression.
+
+Compares, for threads of N messages:
+  pydantic  ORM-style objects -> ThreadDetailSchema (from_attributes) -> JSON,
+            what get_thread did before
+  orjson    row mappings -> orjson (FastJSONResponse), what it does now
+and reports the body size raw, gzip'd and brotli'd at the middleware's levels.
+
+    python -m benchmarks.json_responses --messages 100 1000 5000
+"""
+import argparse
+import gzip
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import brotli
+import orjson
+
+from app.api.threads import ThreadDetailSchema
+from app.core.responses import BROTLI_QUALITY, GZIP_LEVEL, ORJSON_OPTIONS
+
+
+def synthetic_thread(n: int):
+    now = datetime.now(timezone.utc)
+    thread = {
+        "id": "bench-thread", "title": "Benchmark", "created_at": now, "updated_at": now,
+        "message_count": n, "last_message_preview": "...", "last_activity_at": now,
+    }
+    messages = [
+        {
+            "id": i, "thread_id": "bench-thread", "role": "user" if i % 2 else "assistant",
+            "content": f"Message {i}: " + "Let's move the design review to Thursday afternoon. " * 4,
+            "created_at": now + timedelta(seconds=i),
+        }
+        for i in range(n)
+    ]
+    return thread, messages
+
+
+def time_ms(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'messages':>9}{'pydantic ms':>13}{'orjson ms':>11}{'speedup':>9}"
+        f"{'raw KB':>9}{'gzip KB':>9}{'gzip ms':>9}{'br KB':>8}{'br ms':>8}"
+    )
+    for n in args.messages:
+        thread, messages = synthetic_thread(n)
+        orm_thread = SimpleNamespace(**thread, messages=[SimpleNamespace(**m) for m in messages])
+
+        def old_path():
+            return ThreadDetailSchema.model_validate(orm_thread).model_dump_json().encode()
+
+        def new_path():
+            return orjson.dumps({**thread, "messages": messages}, option=ORJSON_OPTIONS)
+
+        body = new_path()
+        old_ms, new_ms = time_ms(old_path, args.runs), time_ms(new_path, args.runs)
+        gzip_ms = time_ms(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), args.runs)
+        br_ms = time_ms(lambda: brotli.compress(body, quality=BROTLI_QUALITY), args.runs)
+        gz_size = len(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        br_size = len(brotli.compress(body, quality=BROTLI_QUALITY))
+        print(
+            f"{n:>9}{old_ms:>13.2f}{new_ms:>11.2f}{old_ms / new_ms:>8.1f}x"
+            f"{len(body) / 1024:>9.1f}{gz_size / 1024:>9.1f}{gzip_ms:>9.2f}{br_size / 1024:>8.1f}{br_ms:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Offline load test for the chat, agent and calendar endpoints, plus
+chat-ws: the same chat turns over one WebSocket session per client.
+
+Starts the Google API stand-in and the app (SQLite in a scratch directory,
+FakeChatModel instead of Gemini), then drives each scenario with a closed
+loop of N concurrent clients per level and reports RPS and latency
+percentiles. Nothing leaves the machine.
+
+    python -m benchmarks.load_test --concurrency 1 4 16 --duration 10
+    python -m benchmarks.load_test --scenarios chat --llm-latency-ms 800 --llm-error-rate 0.05
+
+Exits non-zero if --max-p95-ms or --max-error-rate is exceeded at any level.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import websockets
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+USER_EMAIL = "bench@example.com"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"{url} did not become ready within {timeout}s")
+
+
+def _window():
+    # Minute-aligned like a calendar view, so concurrent clients can share reads
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    return now.isoformat().replace("+00:00", "Z"), (now + timedelta(days=7)).isoformat().replace("+00:00", "Z")
+
+
+SCENARIOS = {
+    "chat": lambda i: ("POST", "/api/v1/chat", {"json": {"message": f"What's on my plate today? ({i})", "user_email": USER_EMAIL}}),
+    "agent": lambda i: ("POST", "/api/v1/agent/run", {"json": {"query": f"Am I free tomorrow at 3pm? ({i})", "user_context": {"email": USER_EMAIL}}}),
+    "calendar": lambda i: ("GET", "/api/v1/calendar/events", {"params": {"user_email": USER_EMAIL, "time_min": _window()[0], "time_max": _window()[1]}}),
+}
+
+
+class Stack:
+    """The stand-in and the app as subprocesses, sharing a scratch directory."""
+
+    def __init__(self, args):
+        self.args = args
+        self.tmp = tempfile.TemporaryDirectory()
+        self.procs = []
+
+    def _env(self, **extra):
+        env = dict(os.environ, PYTHONPATH=str(ROOT), **{k: str(v) for k, v in extra.items()})
+        return env
+
+    def _prepare(self, db_path: Path):
+        # Settings with one fake key/model; the app reads config.yaml from its working directory
+        config = {
+            "active_settings": {"active_model_id": "fake", "active_api_key_id": "bench", "system_prompt": "You are Aura."},
+            "api_keys": [{"id": "bench", "name": "Bench", "key": "fake-key", "provider": "google", "created_at": "2024-01-01"}],
+            "models": [{"id": "fake", "name": "Fake", "model_id": "models/fake"}],
+        }
+        with open(Path(self.tmp.name, "config.yaml"), "w") as f:
+            yaml.dump(config, f)
+
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "-c", str(ROOT / "alembic.ini"), "upgrade", "head"],
+            cwd=self.tmp.name, env=self._env(DB_BACKEND="sqlite", SQLITE_PATH=db_path),
+            check=True, capture_output=True
+        )
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO users (email, full_name, google_access_token, google_refresh_token) VALUES (?, ?, ?, ?)",
+                (USER_EMAIL, "Bench User", "fake-token", "fake-refresh")
+            )
+
+    def _spawn(self, module_app: str, port: int, env: dict, cwd: str):
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", module_app, "--port", str(port), "--log-level", "warning"],
+            cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=None if self.args.verbose else subprocess.DEVNULL
+        )
+        self.procs.append(proc)
+
+    def __enter__(self):
+        a = self.args
+        db_path = Path(self.tmp.name, "aura.db")
+        self._prepare(db_path)
+
+        standin_port = _free_port()
+        self._spawn("benchmarks.harness.google_standin:app", standin_port, self._env(
+            STANDIN_LATENCY_MS=a.google_latency_ms, STANDIN_ERROR_RATE=a.google_error_rate
+        ), str(ROOT))
+
+        app_port = _free_port()
+        self._spawn("app.main:app", app_port, self._env(
+            DB_BACKEND="sqlite",
+            SQLITE_PATH=db_path,
+            CHAT_MODEL_CLASS="benchmarks.harness.fake_llm:FakeChatModel",
+            GOOGLE_API_KEY="fake-key",
+            GOOGLE_API_ENDPOINT=f"http://127.0.0.1:{standin_port}/",
+            FAKE_LLM_LATENCY_MS=a.llm_latency_ms,
+            FAKE_LLM_TOKENS_PER_SECOND=a.llm_tokens_per_second,
+            FAKE_LLM_ERROR_RATE=a.llm_error_rate,
+            FAKE_LLM_TOOL_CALL_RATE=a.llm_tool_call_rate,
+            # Every client is the one seeded user; its rate limit would cap the whole run
+            LLM_USER_RATE_PER_MINUTE=os.getenv("LLM_USER_RATE_PER_MINUTE", "0"),
+        ), self.tmp.name)
+
+        self.base_url = f"http://127.0.0.1:{app_port}"
+        _wait_for(f"http://127.0.0.1:{standin_port}/users/me/calendarList")
+        _wait_for(f"{self.base_url}/readyz")
+        return self
+
+    def __exit__(self, *exc):
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            proc.wait()
+        self.tmp.cleanup()
+
+
+async def _ws_chat_worker(base_url: str, worker_id: int, deadline: float, latencies: list, statuses: Counter):
+    # One long-lived session per client; a turn is "message sent" -> "done" received
+    url = base_url.replace("http://", "ws://") + f"/api/v1/chat/ws?user_email={USER_EMAIL}"
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.recv()  # session
+        i = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await ws.send(json.dumps({"type": "message", "content": f"What's on my plate today? ({worker_id}-{i})"}))
+            while True:
+                frame = json.loads(await ws.recv())
+                if frame["type"] in ("done", "error"):
+                    break
+            statuses[200 if frame["type"] == "done" else frame.get("detail", "error")[:40]] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+            i += 1
+
+
+async def run_level(base_url: str, scenario: str, concurrency: int, duration: float):
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+    if scenario == "chat-ws":
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _ws_chat_worker(base_url, w, deadline, latencies, statuses) for w in range(concurrency)
+        ))
+        return _summarize(latencies, statuses, time.perf_counter() - started)
+    make_request = SCENARIOS[scenario]
+
+    async def worker(client: httpx.AsyncClient, worker_id: int):
+        i = 0
+        while time.perf_counter() < deadline:
+            method, path, kwargs = make_request(f"{worker_id}-{i}")
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+            i += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, w) for w in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return _summarize(latencies, statuses, elapsed)
+
+
+def _summarize(latencies: list, statuses: Counter, elapsed: float):
+    latencies.sort()
+    total = len(latencies)
+    errors = total - statuses.get(200, 0)
+    pct = lambda p: latencies[min(total - 1, int(total * p))] if total else float("nan")
+    return {
+        "requests": total,
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) if total else float("nan"),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "error_rate": errors / total if total else 0.0,
+        "statuses": dict(statuses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    scenarios = [*SCENARIOS, "chat-ws"]
+    parser.add_argument("--scenarios", nargs="+", default=scenarios, choices=scenarios)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=80)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-tool-call-rate", type=float, default=0.5)
+    parser.add_argument("--google-latency-ms", type=float, default=80)
+    parser.add_argument("--google-error-rate", type=float, default=0.0)
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--max-error-rate", type=float, default=None)
+    parser.add_argument("--verbose", action="store_true", help="show server logs")
+    parser.add_argument("--metrics", action="store_true", help="print the app's /metrics counters after the run")
+    args = parser.parse_args()
+
+    failures = []
+    with Stack(args) as stack:
+        print(f"{'scenario':<10}{'conc':>5}{'reqs':>7}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}  statuses")
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                r = asyncio.run(run_level(stack.base_url, scenario, concurrency, args.duration))
+                print(
+                    f"{scenario:<10}{concurrency:>5}{r['requests']:>7}{r['rps']:>9.1f}{r['p50']:>10.1f}"
+                    f"{r['p95']:>10.1f}{r['p99']:>10.1f}{r['error_rate']:>8.1%}  {r['statuses']}"
+                )
+                if args.max_p95_ms is not None and r["p95"] > args.max_p95_ms:
+                    failures.append(f"{scenario} x{concurrency}: p95 {r['p95']:.0f} ms > {args.max_p95_ms:.0f} ms")
+                if args.max_error_rate is not None and r["error_rate"] > args.max_error_rate:
+                    failures.append(f"{scenario} x{concurrency}: error rate {r['error_rate']:.1%} > {args.max_error_rate:.1%}")
+
+        if args.metrics:
+            print()
+            for line in httpx.get(f"{stack.base_url}/metrics").text.splitlines():
+                if line.startswith("aura_") and ("_count{" in line or "_total{" in line):
+                    print(line)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Query-plan regression check for the hot queries.
+
+Runs against the migrated database the app is configured for (DB_BACKEND):
+
+- PostgreSQL: EXPLAIN with `enable_seqscan = off`, so the planner uses an
+  index whenever one can serve the query, even on tiny tables. Any remaining
+  Seq Scan means the query has no usable index.
+- SQLite: EXPLAIN QUERY PLAN. A bare `SCAN <table>` (not `USING INDEX`) means
+  the same. A temp B-tree for ORDER BY is reported but not a failure.
+
+Failing queries are listed and the script exits non-zero.
+
+    alembic upgrade head && python -m benchmarks.query_plans
+    DB_BACKEND=sqlite SQLITE_PATH=/tmp/plans.db sh -c 'alembic upgrade head && python -m benchmarks.query_plans'
+"""
+import asyncio
+import json
+import re
+import sys
+from typing import Iterator, List
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.database import engine
+from app.models import Message, Task, Thread, User
+
+# Mirrors of the statements the routes and agents issue
+HOT_QUERIES = {
+    "thread history": select(Message).where(Message.thread_id == "t").order_by(Message.created_at.asc()),
+    "thread messages (selectinload)": select(Message).where(Message.thread_id.in_(["t1", "t2"])),
+    "thread list": (
+        select(Thread).where(Thread.deleted_at.is_(None)).order_by(Thread.last_activity_at.desc()).offset(0).limit(50)
+    ),
+    "task list": (
+        select(Task)
+        .where(Task.owner_id == 1, Task.status == "pending")
+        .order_by(Task.due_date.asc().nulls_last(), Task.id.asc())
+        .limit(51)
+    ),
+    "user by email": select(User).where(User.email == "user@example.com"),
+    "user by gmail history id": select(User).where(User.gmail_history_id == "12345"),
+}
+
+
+def _nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def _check_postgres(conn, name: str, query) -> List[str]:
+    """Tables the query reads with a sequential scan."""
+    sql = str(query.compile(dialect=postgresql.asyncpg.dialect(), compile_kwargs={"literal_binds": True}))
+    plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = list(_nodes(plan[0]["Plan"]))
+    seq_scans = [n.get("Relation Name", "?") for n in nodes if n["Node Type"] == "Seq Scan"]
+    access = ", ".join(
+        f"{n['Node Type']} on {n.get('Index Name') or n.get('Relation Name')}"
+        for n in nodes if "Relation Name" in n
+    )
+    print(f"{'FAIL' if seq_scans else 'ok':<5}{name:<34}{access}")
+    return seq_scans
+
+
+async def _check_sqlite(conn, name: str, query) -> List[str]:
+    sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    details = [row[-1] for row in (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()]
+    # "SCAN t" reads every row; "SCAN t USING INDEX ix" walks an index in order, "SEARCH t ..." seeks
+    seq_scans = [m.group(1) for d in details if (m := re.fullmatch(r"SCAN (\w+)", d))]
+    print(f"{'FAIL' if seq_scans else 'ok':<5}{name:<34}{'; '.join(details)}")
+    return seq_scans
+
+
+async def check() -> List[str]:
+    failures = []
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("SET enable_seqscan = off"))
+            explain = _check_postgres
+        elif engine.dialect.name == "sqlite":
+            explain = _check_sqlite
+        else:
+            raise SystemExit(f"No query plan check for {engine.dialect.name}")
+        for name, query in HOT_QUERIES.items():
+            seq_scans = await explain(conn, name, query)
+            if seq_scans:
+                failures.append(f"{name}: sequential scan on {', '.join(seq_scans)}")
+    await engine.dispose()
+    return failures
+
+
+def main():
+    failures = asyncio.run(check())
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Compare server-side expansion (singleEvents=True) with listing series masters
+and expanding them locally (app.services.recurrence).
+
+Runs offline on a synthetic calendar shaped like Google's payloads: each series
+is rendered both as the instance list Google would send and as master +
+exceptions. Transfer time is estimated from payload size and --bandwidth-mbps.
+
+The singleEvents=True payload is not from Google: it is produced with the
+local expander itself, so this compares payload size and client-side cost
+only, and says nothing about whether local expansion matches Google's.
+--age-days sets how long before the window the series started; expansion
+cost should not grow with it.
+
+    python -m benchmarks.recurrence_expansion --series 40 --window-days 30 --age-days 90 3650
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.services.recurrence import expand_events
+
+RULES = [
+    "RRULE:FREQ=DAILY",
+    "RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "RRULE:FREQ=WEEKLY;BYDAY=TU,TH",
+    "RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO",
+    "RRULE:FREQ=DAILY;INTERVAL=1;BYDAY=MO,TU,WE,TH,FR",
+]
+
+
+def _event_body(event_id: str, summary: str, start: datetime, minutes: int) -> dict:
+    # Roughly the field set Google returns for a typical meeting
+    return {
+        "kind": "calendar#event",
+        "etag": f"\"{random.getrandbits(48)}\"",
+        "id": event_id,
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid={event_id}",
+        "created": "2024-01-01T00:00:00.000Z",
+        "updated": "2024-01-01T00:00:00.000Z",
+        "summary": summary,
+        "description": "Agenda: status updates, blockers, next steps.",
+        "creator": {"email": "owner@example.com", "self": True},
+        "organizer": {"email": "owner@example.com", "self": True},
+        "start": {"dateTime": start.isoformat(), "timeZone": "UTC"},
+        "end": {"dateTime": (start + timedelta(minutes=minutes)).isoformat(), "timeZone": "UTC"},
+        "iCalUID": f"{event_id}@google.com",
+        "sequence": 0,
+        "attendees": [
+            {"email": f"person{i}@example.com", "responseStatus": "accepted"} for i in range(4)
+        ],
+        "reminders": {"useDefault": True},
+        "eventType": "default",
+    }
+
+
+def build_calendar(series: int, singles: int, window_start: datetime, window_end: datetime, age_days: int = 90):
+    items = []
+    for i in range(series):
+        start = window_start.replace(hour=8 + i % 9, minute=0, second=0, microsecond=0) - timedelta(days=age_days)
+        master = _event_body(f"series{i}", f"Recurring {i}", start, 30)
+        master["recurrence"] = [RULES[i % len(RULES)]]
+        items.append(master)
+
+    for i in range(singles):
+        offset = random.random() * (window_end - window_start).total_seconds()
+        items.append(_event_body(f"single{i}", f"One-off {i}", window_start + timedelta(seconds=offset), 60))
+
+    # A couple of exceptions per series: one moved, one cancelled
+    expanded = list(expand_events(items, window_start, window_end))
+    by_series = {}
+    for event in expanded:
+        if event.get("recurringEventId"):
+            by_series.setdefault(event["recurringEventId"], []).append(event)
+    for instances in by_series.values():
+        if len(instances) < 3:
+            continue
+        moved = dict(instances[1])
+        moved["start"] = {"dateTime": (datetime.fromisoformat(moved["start"]["dateTime"]) + timedelta(hours=1)).isoformat(), "timeZone": "UTC"}
+        moved["end"] = {"dateTime": (datetime.fromisoformat(moved["end"]["dateTime"]) + timedelta(hours=1)).isoformat(), "timeZone": "UTC"}
+        cancelled = {k: instances[2][k] for k in ("id", "recurringEventId", "originalStartTime", "start", "end")}
+        cancelled["status"] = "cancelled"
+        items.extend([moved, cancelled])
+
+    # Stand-in for what singleEvents=True would have sent (see the module docstring)
+    server_expanded = list(expand_events(items, window_start, window_end))
+    return items, server_expanded
+
+
+def _time(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=40)
+    parser.add_argument("--singles", type=int, default=60)
+    parser.add_argument("--window-days", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--bandwidth-mbps", type=float, default=20.0)
+    parser.add_argument("--age-days", type=int, nargs="+", default=[90], help="How long ago the series started")
+    args = parser.parse_args()
+
+    window_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    window_end = window_start + timedelta(days=args.window_days)
+    for age_days in args.age_days:
+        random.seed(7)
+        compact, expanded = build_calendar(args.series, args.singles, window_start, window_end, age_days)
+        report(args, compact, expanded, window_start, window_end, age_days)
+
+
+def report(args, compact, expanded, window_start, window_end, age_days):
+    compact_payload = json.dumps({"items": compact}).encode()
+    expanded_payload = json.dumps({"items": expanded}).encode()
+
+    def server_side():
+        json.loads(expanded_payload)["items"]
+
+    def local():
+        list(expand_events(json.loads(compact_payload)["items"], window_start, window_end))
+
+    server_ms = _time(server_side, args.runs)
+    local_ms = _time(local, args.runs)
+    bytes_per_ms = args.bandwidth_mbps * 1_000_000 / 8 / 1000
+
+    rows = [
+        ("singleEvents=True*", len(expanded), len(expanded_payload), server_ms, len(expanded_payload) / bytes_per_ms),
+        ("local expansion", len(compact), len(compact_payload), local_ms, len(compact_payload) / bytes_per_ms),
+    ]
+    print(
+        f"{args.series} series (started {age_days} days ago) + {args.singles} one-offs "
+        f"over {args.window_days} days -> {len(expanded)} instances"
+    )
+    print(f"{'mode':<20}{'items':>8}{'bytes':>12}{'cpu ms':>10}{'xfer ms':>10}{'total ms':>10}")
+    for name, items, size, cpu, xfer in rows:
+        print(f"{name:<20}{items:>8}{size:>12}{cpu:>10.2f}{xfer:>10.2f}{cpu + xfer:>10.2f}")
+    print(f"payload reduction: {1 - len(compact_payload) / len(expanded_payload):.1%}")
+    print("* synthesized with the local expander, not fetched from Google\n")
+
+
+if __name__ == "__main__":
+    main()
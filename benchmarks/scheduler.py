@@ -0,0 +1,78 @@
+"""
+Benchmark the Strategist's scheduler on synthetic workloads.
+
+Generates N pending tasks (random durations, due dates and priorities) and a
+busy calendar, then times `schedule_tasks` over a one-week horizon.
+
+    python -m benchmarks.scheduler --tasks 100 500 1000 --runs 20
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.services.scheduler import SchedulableTask, schedule_tasks, parse_preferences
+
+
+def synthetic_tasks(n: int, now: datetime, horizon_days: int):
+    tasks = []
+    for i in range(n):
+        due = None
+        if random.random() < 0.7:
+            due = now + timedelta(hours=random.uniform(4, horizon_days * 24))
+        tasks.append(SchedulableTask(
+            id=i,
+            title=f"Task {i}",
+            duration=timedelta(minutes=random.choice([15, 30, 30, 45, 60, 90, 120])),
+            due=due,
+            priority=random.randint(0, 3),
+        ))
+    return tasks
+
+
+def synthetic_busy(now: datetime, horizon_days: int, meetings_per_day: int):
+    busy = []
+    for day in range(horizon_days + 1):
+        base = (now + timedelta(days=day)).replace(hour=9, minute=0, second=0, microsecond=0)
+        for _ in range(meetings_per_day):
+            start = base + timedelta(minutes=15 * random.randint(0, 35))
+            busy.append((start, start + timedelta(minutes=random.choice([30, 60]))))
+    return sorted(busy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[50, 100, 500, 1000])
+    parser.add_argument("--meetings-per-day", type=int, default=6)
+    parser.add_argument("--horizon-days", type=int, default=7)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+    end = now + timedelta(days=args.horizon_days)
+    prefs = parse_preferences({"gym_schedule": "Mon, Wed, Fri at 7:00 AM", "work_hours": "08:00-20:00"})
+    busy = synthetic_busy(now, args.horizon_days, args.meetings_per_day)
+
+    print(f"{'tasks':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'scheduled':>11}{'late':>6}{'budget hit':>12}")
+    for n in args.tasks:
+        tasks = synthetic_tasks(n, now, args.horizon_days)
+        samples = []
+        plan = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            plan = schedule_tasks(tasks, busy, now, end, prefs, time_budget_ms=args.budget_ms)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        stats = plan["stats"]
+        print(
+            f"{n:>6}{statistics.median(samples):>10.2f}{p95:>10.2f}{samples[-1]:>10.2f}"
+            f"{stats['scheduled']:>11}{stats['late']:>6}{str(stats['budget_exhausted']):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmarks for the settings lookups on the request path.
+
+Compares the previous linear scans (and the `.dict()` + full re-validation
+update) against the precomputed ConfigSnapshot. Runs in memory only; nothing
+is written to config.yaml.
+
+    python -m benchmarks.settings_lookup --keys 20 --models 20
+"""
+import argparse
+import timeit
+
+from app.core.settings_manager import AppConfig, ApiKeyConfig, ModelConfig, ConfigSnapshot, apply_updates
+
+
+def make_config(n_keys: int, n_models: int) -> AppConfig:
+    keys = [ApiKeyConfig(id=f"k{i}", name=f"Key {i}", key=f"AIza-{i:04d}", created_at="2024-01-01") for i in range(n_keys)]
+    models = [ModelConfig(id=f"m{i}", name=f"Model {i}", model_id=f"models/gemini-{i}") for i in range(n_models)]
+    # Worst case for the scans: the active entries are last
+    return AppConfig(
+        active_model_id=f"m{n_models - 1}",
+        active_api_key_id=f"k{n_keys - 1}",
+        api_keys=keys,
+        models=models
+    )
+
+
+# Previous implementations, kept here for comparison
+def scan_active_key(config: AppConfig):
+    if config.active_api_key_id:
+        for k in config.api_keys:
+            if k.id == config.active_api_key_id:
+                return k.key
+    if config.api_keys:
+        return config.api_keys[0].key
+    return None
+
+
+def scan_all_keys(config: AppConfig):
+    keys = []
+    active = scan_active_key(config)
+    if active:
+        keys.append(active)
+    for k in config.api_keys:
+        if k.key != active:
+            keys.append(k.key)
+    return keys
+
+
+def scan_resolved_model(config: AppConfig):
+    for m in config.models:
+        if m.id == config.active_model_id:
+            return m.model_id
+    return config.active_model_id
+
+
+def dict_roundtrip_update(config: AppConfig, updates: dict):
+    data = config.model_dump()
+    data.update(updates)
+    return AppConfig(**data)
+
+
+def bench(label: str, fn, number: int):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{label:<42}{best / number * 1e9:>12.0f} ns/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--models", type=int, default=20)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    config = make_config(args.keys, args.models)
+    snapshot = ConfigSnapshot.build(1, config, {})
+    n = args.number
+
+    print(f"{args.keys} keys, {args.models} models")
+    bench("get_active_key (scan)", lambda: scan_active_key(config), n)
+    bench("get_active_key (snapshot)", lambda: snapshot.active_key, n)
+    bench("get_all_api_keys (scan)", lambda: scan_all_keys(config), n)
+    bench("get_all_api_keys (snapshot)", lambda: snapshot.key_candidates, n)
+    bench("get_active_model_resolved_id (scan)", lambda: scan_resolved_model(config), n)
+    bench("get_active_model_resolved_id (snapshot)", lambda: snapshot.active_model_resolved_id, n)
+
+    updates = {"system_instruction": "You are Aura, v2."}
+    bench("update_config (dict round trip)", lambda: dict_roundtrip_update(config, updates), n // 20)
+    bench("update_config (apply_updates + build)", lambda: ConfigSnapshot.build(2, apply_updates(config, updates), {}), n // 20)
+
+
+if __name__ == "__main__":
+    main()
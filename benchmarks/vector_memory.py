@@ -0,0 +1,97 @@
+"""
+Benchmark long-term memory search (app/core/vector_index.py).
+
+Builds an index of N synthetic chat messages embedded with the hashing
+embedder, spread over --users owners, in a temporary directory, then times
+searches for one of the owners and reports recall@k against an exact scan.
+The first owner is given --hot-share of all rows, the worst case for a
+per-owner search.
+
+    python -m benchmarks.vector_memory --rows 10000 100000 --users 50
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.vector_index import VectorIndex
+from app.services.embeddings import HashingEmbedder
+
+TOPICS = [
+    "dentist appointment reschedule tuesday morning", "quarterly planning review with the design team",
+    "flight to berlin conference hotel booking", "gym workout routine and rest days",
+    "grocery list for the weekend dinner party", "tax documents and accountant meeting",
+    "birthday gift ideas for my sister", "project deadline status report to manager",
+    "car service oil change reminder", "weekly one on one agenda topics",
+    "reading list science fiction novels", "kids school pickup schedule wednesday",
+]
+FILLER = "please could you also remind me about it later maybe next week thanks again for that".split()
+
+
+def synthetic_messages(n: int, rng) -> list:
+    topics = rng.integers(len(TOPICS), size=n)
+    messages = []
+    for t in topics:
+        words = TOPICS[t].split()
+        picked = rng.choice(words, size=rng.integers(3, len(words) + 1), replace=False)
+        messages.append(" ".join([*picked, *rng.choice(FILLER, size=4)]))
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--hot-share", type=float, default=0.5, help="Share of rows owned by the searched user")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--probes", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embedder = HashingEmbedder(args.dim)
+    print(f"{'rows':>8}{'owner rows':>12}{'build s':>9}{'p50 ms':>9}{'p99 ms':>9}{'exact ms':>10}{'recall@k':>10}")
+    for n in args.rows:
+        vectors = embedder.embed(synthetic_messages(n, rng))
+        owners = np.where(rng.random(n) < args.hot_share, 0, rng.integers(1, max(args.users, 2), size=n))
+        with tempfile.TemporaryDirectory() as path:
+            index = VectorIndex(path, args.dim, probes=args.probes)
+            started = time.perf_counter()
+            for owner in np.unique(owners):
+                rows = np.flatnonzero(owners == owner)
+                for chunk in np.array_split(rows, max(1, len(rows) // 5000)):
+                    index.add(f"user{owner}", chunk, vectors[chunk])
+                    if index.needs_training:
+                        index.train()  # In a worker thread in the app (memory.remember)
+            build_s = time.perf_counter() - started
+
+            hot = np.flatnonzero(owners == 0)
+            hot_vectors = vectors[hot] / np.maximum(np.linalg.norm(vectors[hot], axis=1, keepdims=True), 1e-12)
+            queries = embedder.embed(synthetic_messages(args.queries, rng))
+            timings, exact_timings, recalls = [], [], []
+            for q in queries:
+                started = time.perf_counter()
+                hits = index.search("user0", q, args.k)
+                timings.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                scores = hot_vectors @ (q / max(np.linalg.norm(q), 1e-12))
+                exact = hot[np.argsort(-scores)[:args.k]]
+                exact_timings.append((time.perf_counter() - started) * 1000)
+                # Ties are common with short texts: count a hit if it scores as well as the k-th exact one
+                kth = np.sort(scores)[-args.k]
+                found = sum(1 for _, score in hits if score >= kth - 1e-6)
+                recalls.append(found / len(exact))
+
+            p99 = statistics.quantiles(timings, n=100)[98]
+            print(
+                f"{n:>8}{len(hot):>12}{build_s:>9.1f}{statistics.median(timings):>9.3f}{p99:>9.3f}"
+                f"{statistics.median(exact_timings):>10.3f}{statistics.mean(recalls):>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
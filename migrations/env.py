@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import inspect, pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import Base, SQLALCHEMY_DATABASE_URL
+from app import models  # noqa: F401 - registers the tables on Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+logger = logging.getLogger("alembic.env")
+
+
+# SQLite can't ALTER most things in place; batch mode rebuilds the table instead
+RENDER_AS_BATCH = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of running it (`alembic upgrade head --sql`)."""
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        render_as_batch=RENDER_AS_BATCH,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+# Databases from before migrations existed had their tables made at startup
+BASELINE_REVISION = "0001_baseline"
+
+
+def is_unversioned(connection: Connection) -> bool:
+    """True when the app's tables exist but alembic has never recorded a revision."""
+    tables = set(inspect(connection).get_table_names())
+    return "alembic_version" not in tables and "users" in tables
+
+
+def do_run_migrations(connection: Connection):
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=RENDER_AS_BATCH)
+    with context.begin_transaction():
+        if is_unversioned(connection):
+            logger.info(f"Existing tables without alembic_version; stamping {BASELINE_REVISION}")
+            context.get_context().stamp(context.script, BASELINE_REVISION)
+        context.run_migrations()
+
+
+async def run_migrations_online():
+    connectable = create_async_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool.NullPool)
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,57 @@
+"""Calendar selection, task scheduling columns and hot-path indexes
+
+Columns added to the models since the baseline, plus indexes for:
+- messages by thread, in order (thread history)
+- threads by updated_at (thread list)
+- tasks by owner/status, keyset on due_date (task list, strategist)
+- users by gmail_history_id
+
+Databases that ran create_all after the columns were added may already have
+some of them, so every step is IF NOT EXISTS. On PostgreSQL indexes are built
+CONCURRENTLY to avoid locking writes on large tables.
+
+Revision ID: 0002_scheduling_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_scheduling_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ("users", sa.Column("calendar_ids", sa.JSON(), nullable=True)),
+    ("tasks", sa.Column("duration_minutes", sa.Integer(), nullable=True)),
+    ("tasks", sa.Column("priority", sa.Integer(), nullable=True)),
+]
+
+INDEXES = [
+    ("ix_messages_thread_id_created_at", "messages", ["thread_id", "created_at"]),
+    ("ix_threads_updated_at", "threads", ["updated_at"]),
+    ("ix_tasks_owner_status_due", "tasks", ["owner_id", "status", "due_date"]),
+    ("ix_users_gmail_history_id", "users", ["gmail_history_id"]),
+]
+
+
+def upgrade():
+    # SQLite has no ADD COLUMN IF NOT EXISTS, and SQLite databases were never
+    # created by create_all, so the columns can't already be there
+    if_not_exists = op.get_context().dialect.name != "sqlite"
+    for table, column in COLUMNS:
+        op.add_column(table, column, if_not_exists=if_not_exists or None)
+
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    for table, column in reversed(COLUMNS):
+        op.drop_column(table, column.name)
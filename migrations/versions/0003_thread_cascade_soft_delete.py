@@ -0,0 +1,47 @@
+"""Cascade message deletes in the database; soft delete for threads
+
+- messages.thread_id gets ON DELETE CASCADE, so deleting a thread no longer
+  requires loading its messages
+- threads.deleted_at marks threads waiting for the background purge
+
+Revision ID: 0003_thread_soft_delete
+Revises: 0002_scheduling_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_thread_soft_delete"
+down_revision = "0002_scheduling_indexes"
+branch_labels = None
+depends_on = None
+
+# PostgreSQL's name for the unnamed constraint created in 0001
+PG_FK_NAME = "messages_thread_id_fkey"
+# SQLite constraints are unnamed; batch mode finds them through this convention
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+SQLITE_FK_NAME = "fk_messages_thread_id_threads"
+
+
+def _replace_thread_fk(ondelete):
+    if op.get_context().dialect.name == "sqlite":
+        with op.batch_alter_table("messages", naming_convention=SQLITE_NAMING, recreate="always") as batch_op:
+            batch_op.drop_constraint(SQLITE_FK_NAME, type_="foreignkey")
+            batch_op.create_foreign_key(SQLITE_FK_NAME, "threads", ["thread_id"], ["id"], ondelete=ondelete)
+    else:
+        op.drop_constraint(PG_FK_NAME, "messages", type_="foreignkey")
+        op.create_foreign_key(PG_FK_NAME, "messages", "threads", ["thread_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_thread_fk("CASCADE")
+    with op.batch_alter_table("threads") as batch_op:
+        batch_op.add_column(sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_index("ix_threads_deleted_at", ["deleted_at"])
+
+
+def downgrade():
+    with op.batch_alter_table("threads") as batch_op:
+        batch_op.drop_index("ix_threads_deleted_at")
+        batch_op.drop_column("deleted_at")
+    _replace_thread_fk(None)
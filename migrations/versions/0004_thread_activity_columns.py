@@ -0,0 +1,53 @@
+"""Denormalized thread activity: message_count, last_message_preview, last_activity_at
+
+Backfills existing threads from their messages, then indexes
+(deleted_at, last_activity_at) for the thread list.
+
+Revision ID: 0004_thread_activity
+Revises: 0003_thread_soft_delete
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_thread_activity"
+down_revision = "0003_thread_soft_delete"
+branch_labels = None
+depends_on = None
+
+# Matches app.services.messages.PREVIEW_LENGTH (backfilled previews skip whitespace folding)
+PREVIEW_LENGTH = 120
+
+
+def upgrade():
+    with op.batch_alter_table("threads") as batch_op:
+        batch_op.add_column(sa.Column("message_count", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("last_message_preview", sa.String(), nullable=True))
+        batch_op.add_column(
+            sa.Column("last_activity_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True)
+        )
+
+    op.execute(f"""
+        UPDATE threads SET
+            message_count = (SELECT COUNT(*) FROM messages WHERE messages.thread_id = threads.id),
+            last_message_preview = (
+                SELECT SUBSTR(content, 1, {PREVIEW_LENGTH}) FROM messages
+                WHERE messages.thread_id = threads.id
+                ORDER BY created_at DESC, id DESC LIMIT 1
+            ),
+            last_activity_at = COALESCE(
+                (SELECT MAX(created_at) FROM messages WHERE messages.thread_id = threads.id),
+                updated_at,
+                created_at
+            )
+    """)
+
+    op.create_index("ix_threads_deleted_at_last_activity_at", "threads", ["deleted_at", "last_activity_at"])
+
+
+def downgrade():
+    op.drop_index("ix_threads_deleted_at_last_activity_at", table_name="threads")
+    with op.batch_alter_table("threads") as batch_op:
+        batch_op.drop_column("last_activity_at")
+        batch_op.drop_column("last_message_preview")
+        batch_op.drop_column("message_count")